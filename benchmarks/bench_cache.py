@@ -0,0 +1,48 @@
+"""
+load the same report again, parsed vs cached
+
+    python benchmarks/bench_cache.py
+"""
+
+import pathlib
+import sys
+import tempfile
+import time
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from cobertura_parser.cache import ReportCache
+from cobertura_parser.loader import CoberturaLoader
+from synthetic import cobertura_xml
+
+
+def measure(name: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    print(f"{name}: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as d:
+        path = pathlib.Path(d) / "cobertura.xml"
+        path.write_text(cobertura_xml(packages=20, classes=50))
+        for columnar in (None, True):
+            for fast in (None, True):
+                cache = ReportCache(pathlib.Path(d) / "cache", fast=fast)
+                suffix = f"columnar={columnar}, fast={fast}"
+                measure(
+                    f"parse, {suffix}",
+                    CoberturaLoader.slim_from_report,
+                    path,
+                    columnar,
+                )
+                # the first one parses and writes the entry
+                CoberturaLoader.slim_from_report(path, columnar, cache=cache)
+                measure(
+                    f"cached, {suffix}",
+                    CoberturaLoader.slim_from_report,
+                    path,
+                    columnar,
+                    cache=cache,
+                )
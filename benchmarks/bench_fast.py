@@ -0,0 +1,62 @@
+"""
+compare slim pydantic models with `__slots__` models of `models.fast`
+
+    python benchmarks/bench_fast.py
+"""
+
+import gc
+import pathlib
+import sys
+import time
+import tracemalloc
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from cobertura_parser.loader import CoberturaLoader
+from cobertura_parser.processor import CoberturaProcessor
+from synthetic import cobertura_xml
+
+
+def measure(name: str, func, *args):
+    gc.collect()
+    start = time.process_time()
+    result = func(*args)
+    print(f"{name}: {time.process_time() - start:.3f}s cpu")
+    return result
+
+
+def memory(name: str, func, *args):
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name}: {size / 1024 / 1024:.1f} MB")
+    return result
+
+
+def coverage(structure):
+    result = CoberturaProcessor.get_coverage(structure)
+    result.lazy_calc()
+    return result
+
+
+if __name__ == "__main__":
+    raw = cobertura_xml().encode()
+    print(f"report size: {len(raw) / 1024 / 1024:.1f} MB")
+    slim = measure("slim_from_source", CoberturaLoader.slim_from_source, raw)
+    fast = measure(
+        "slim_from_source(fast)",
+        CoberturaLoader.slim_from_source,
+        raw,
+        None,
+        None,
+        True,
+    )
+    measure("get_coverage(slim)", coverage, slim)
+    measure("get_coverage(fast)", coverage, fast)
+    measure("to_pydantic()", fast.to_pydantic)
+    del slim, fast
+    memory("memory of slim", CoberturaLoader.slim_from_source, raw)
+    memory("memory of fast", CoberturaLoader.slim_from_source, raw, None, None, True)
@@ -0,0 +1,49 @@
+"""
+jacoco to cobertura conversion
+
+    python benchmarks/bench_jacoco.py
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from cobertura_parser.ext.jacoco import jacoco2cobertura, jacoco2cobertura_file
+from cobertura_parser.loader import CoberturaLoader
+from synthetic import jacoco_xml
+
+
+def measure(name: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    print(f"{name}: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "jacoco.xml")
+        with open(path, "w") as f:
+            f.write(jacoco_xml())
+        print(f"report size: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+        measure("jacoco2cobertura", jacoco2cobertura, path)
+        with open(os.path.join(d, "cobertura.xml"), "wb") as f:
+            measure("jacoco2cobertura_file", jacoco2cobertura_file, path, f)
+        measure(
+            "from_jacoco_file().slim()",
+            lambda: CoberturaLoader.from_jacoco_file(path).slim(),
+        )
+        measure(
+            "from_jacoco_file(direct=True)",
+            CoberturaLoader.from_jacoco_file,
+            path,
+            direct=True,
+        )
+        for workers in (2, 4):
+            measure(
+                f"jacoco2cobertura(workers={workers})", jacoco2cobertura, path, workers
+            )
@@ -0,0 +1,66 @@
+"""
+write coverage/snapshot json, pydantic `.json(exclude=...)` vs `serializer`
+
+    python benchmarks/bench_json.py
+"""
+
+import io
+import pathlib
+import sys
+import tempfile
+import time
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from cobertura_parser.loader import CoberturaLoader
+from cobertura_parser.processor import CoberturaProcessor
+from cobertura_parser.serializer import dump_coverage, dump_snapshot, orjson
+from synthetic import cobertura_xml
+
+RATES = {"line_rate": ..., "branch_rate": ..., "complexity": ...}
+METHODS = {"methods": {"__all__": RATES}}
+COVERAGE_EXCLUDE = {
+    **RATES,
+    **{k: ... for k in ("sources", "line_covered", "line_valid", "version")},
+    **{k: ... for k in ("branches_covered", "branches_valid")},
+    "packages": {
+        "__all__": {
+            **RATES,
+            "classes": {"__all__": {**RATES, **METHODS, "lines": ...}},
+        }
+    },
+}
+SNAPSHOT_EXCLUDE = {
+    "data": {
+        "sources": ...,
+        "packages": {
+            "__all__": {**RATES, "classes": {"__all__": {**RATES, **METHODS}}}
+        },
+    }
+}
+
+
+def measure(name: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    print(f"{name}: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as d:
+        path = pathlib.Path(d) / "cobertura.xml"
+        path.write_text(cobertura_xml(packages=20, classes=50))
+        structure = CoberturaLoader.slim_from_file(path)
+    coverage = CoberturaProcessor.get_coverage(structure)
+    coverage.lazy_calc()
+    snapshot = CoberturaProcessor.get_code_snapshot_fat(structure)
+
+    measure("coverage, pydantic", coverage.json, exclude=COVERAGE_EXCLUDE)
+    measure("coverage, stdlib", dump_coverage, coverage, io.BytesIO(), False)
+    if orjson is not None:
+        measure("coverage, orjson", dump_coverage, coverage, io.BytesIO(), True)
+    measure("snapshot, pydantic", snapshot.json, exclude=SNAPSHOT_EXCLUDE)
+    measure("snapshot, stdlib", dump_snapshot, snapshot, io.BytesIO(), False)
+    if orjson is not None:
+        measure("snapshot, orjson", dump_snapshot, snapshot, io.BytesIO(), True)
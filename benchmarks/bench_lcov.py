@@ -0,0 +1,44 @@
+"""
+lcov to dict/models, with and without the cobertura xml round trip
+
+    python benchmarks/bench_lcov.py
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from cobertura_parser.ext.lcov import lcov2cobertura
+from cobertura_parser.loader import CoberturaLoader
+from synthetic import lcov_info
+
+
+def measure(name: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    print(f"{name}: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as d:
+        path = pathlib.Path(d) / "lcov.info"
+        path.write_text(lcov_info())
+        print(f"tracefile size: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+        measure(
+            "dict via xml",
+            lambda: CoberturaLoader.from_str(lcov2cobertura(path), to_dict=True),
+        )
+        measure("dict direct", CoberturaLoader.from_lcov_file, path, to_dict=True)
+        measure(
+            "slim via xml",
+            lambda: CoberturaLoader.from_str(lcov2cobertura(path)).slim(),
+        )
+        measure("slim direct", CoberturaLoader.from_lcov_file, path)
+        measure(
+            "slim direct, 4 workers", CoberturaLoader.from_lcov_file, path, workers=4
+        )
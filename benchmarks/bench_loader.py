@@ -0,0 +1,44 @@
+"""
+compare the legacy gzip round trip with direct parsing
+
+    python benchmarks/bench_loader.py
+"""
+
+import gzip
+import io
+import pathlib
+import sys
+import time
+
+import xmltodict
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from cobertura_parser.loader import CoberturaLoader
+from synthetic import cobertura_xml
+
+
+def legacy(xml_content: str):
+    return xmltodict.parse(
+        gzip.GzipFile(fileobj=io.BytesIO(gzip.compress(xml_content.encode())))
+    )
+
+
+def measure(name: str, func, *args):
+    start = time.process_time()
+    func(*args)
+    print(f"{name}: {time.process_time() - start:.3f}s cpu")
+
+
+if __name__ == "__main__":
+    content = cobertura_xml()
+    raw = content.encode()
+    print(f"report size: {len(raw) / 1024 / 1024:.1f} MB")
+    measure("legacy gzip round trip", legacy, content)
+    measure("from_str(str)", CoberturaLoader.from_str, content, True)
+    measure("from_str(bytes)", CoberturaLoader.from_str, raw, True)
+    measure("from_str(memoryview)", CoberturaLoader.from_str, memoryview(raw), True)
+    measure("from_str(gzip bytes)", CoberturaLoader.from_str, gzip.compress(raw), True)
+    measure("from_str(bytes).slim()", lambda: CoberturaLoader.from_str(raw).slim())
+    measure("slim_from_source(bytes)", CoberturaLoader.slim_from_source, raw)
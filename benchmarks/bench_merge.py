@@ -0,0 +1,45 @@
+"""
+merge sharded reports, loaded lazily one by one
+
+    python benchmarks/bench_merge.py
+"""
+
+import pathlib
+import sys
+import tempfile
+import time
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from cobertura_parser.loader import CoberturaLoader
+from cobertura_parser.processor import CoberturaProcessor
+from synthetic import cobertura_xml
+
+SHARDS = 20
+
+
+def measure(name: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    print(f"{name}: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as d:
+        path = pathlib.Path(d) / "cobertura.xml"
+        path.write_text(cobertura_xml(packages=10, classes=20))
+        files = [path] * SHARDS
+        measure(
+            f"merge {SHARDS} reports",
+            lambda: CoberturaProcessor.merge(
+                CoberturaLoader.slim_from_report(each) for each in files
+            ),
+        )
+        measure(
+            f"merge {SHARDS} reports, columnar",
+            lambda: CoberturaProcessor.merge(
+                (CoberturaLoader.slim_from_report(each, True) for each in files),
+                columnar=True,
+            ),
+        )
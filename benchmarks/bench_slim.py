@@ -0,0 +1,68 @@
+"""
+count line copies made by slim -> coverage -> snapshot
+
+    python benchmarks/bench_slim.py
+"""
+
+import gc
+import pathlib
+import sys
+import time
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from cobertura_parser.loader import CoberturaLoader
+from cobertura_parser.models.builtin import (
+    CoberturaCoverage,
+    CoberturaLine,
+    CoberturaStructureSlim,
+)
+from cobertura_parser.models.coverage import Coverage
+from cobertura_parser.models.snapshot import CodeSnapshot
+from synthetic import cobertura_xml
+
+
+def legacy_slim(self: CoberturaCoverage) -> CoberturaStructureSlim:
+    data = CoberturaCoverage(**self.dict())
+    for each_pkg in data.get_package_list():
+        for each_kls in each_pkg.get_class_list():
+            for each_method in each_kls.get_method_list():
+                each_method.lines = each_method.get_line_list()
+            each_kls.methods = each_kls.get_method_list()
+            each_kls.lines = each_kls.get_line_list()
+        each_pkg.classes = each_pkg.get_class_list()
+    data.packages = data.get_package_list()
+    return CoberturaStructureSlim(**data.dict())
+
+
+def legacy(coverage: CoberturaCoverage):
+    slim = legacy_slim(coverage)
+    return slim, Coverage(**slim.dict()), CodeSnapshot(**slim.dict())
+
+
+def current(coverage: CoberturaCoverage):
+    slim = coverage.slim()
+    return slim, Coverage.from_slim(slim), CodeSnapshot.from_slim(slim)
+
+
+def line_objects() -> int:
+    return len([each for each in gc.get_objects() if isinstance(each, CoberturaLine)])
+
+
+def measure(name: str, func, coverage: CoberturaCoverage):
+    gc.collect()
+    before = line_objects()
+    start = time.process_time()
+    result = func(coverage)
+    cost = time.process_time() - start
+    gc.collect()
+    print(f"{name}: {cost:.3f}s cpu, {line_objects() - before} new line objects")
+    return result
+
+
+if __name__ == "__main__":
+    structure = CoberturaLoader.from_str(cobertura_xml(packages=5, classes=20))
+    print(f"line objects of origin data: {line_objects()}")
+    measure("legacy", legacy, structure.coverage)
+    measure("current", current, structure.coverage)
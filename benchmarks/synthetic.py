@@ -0,0 +1,120 @@
+"""
+synthetic reports for benchmarks
+"""
+
+import random
+
+
+def cobertura_xml(
+    packages: int = 20, classes: int = 50, methods: int = 10, lines: int = 20
+) -> str:
+    rnd = random.Random(0)
+    out = [
+        '<?xml version="1.0" ?>',
+        '<coverage line-rate="0.5" branch-rate="0.5" version="1.9" timestamp="0">',
+        "<sources><source>.</source></sources><packages>",
+    ]
+    for p in range(packages):
+        out.append(
+            f'<package name="pkg{p}" line-rate="0.5" branch-rate="0.5" complexity="1.0">'
+            "<classes>"
+        )
+        for c in range(classes):
+            out.append(
+                f'<class name="pkg{p}.C{c}" filename="pkg{p}/C{c}.java" '
+                'line-rate="0.5" branch-rate="0.5" complexity="1.0"><methods>'
+            )
+            all_lines = []
+            for m in range(methods):
+                method_lines = []
+                for n in range(lines):
+                    number = m * lines + n + 1
+                    hits = rnd.choice((0, 0, 1, 3))
+                    if n % 5 == 0:
+                        line = (
+                            f'<line number="{number}" hits="{hits}" branch="true" '
+                            'condition-coverage="50% (1/2)"><conditions>'
+                            '<condition number="0" type="jump" coverage="50%"/>'
+                            "</conditions></line>"
+                        )
+                    else:
+                        line = f'<line number="{number}" hits="{hits}" branch="false"/>'
+                    method_lines.append(line)
+                all_lines.extend(method_lines)
+                out.append(
+                    f'<method name="m{m}" signature="()V" line-rate="0.5" '
+                    'branch-rate="0.5"><lines>'
+                )
+                out.extend(method_lines)
+                out.append("</lines></method>")
+            out.append("</methods><lines>")
+            out.extend(all_lines)
+            out.append("</lines></class>")
+        out.append("</classes></package>")
+    out.append("</packages></coverage>")
+    return "".join(out)
+
+
+def jacoco_xml(
+    packages: int = 20, classes: int = 50, methods: int = 10, lines: int = 20
+) -> str:
+    rnd = random.Random(0)
+
+    def counters(missed: int, covered: int) -> str:
+        return "".join(
+            f'<counter type="{each}" missed="{missed}" covered="{covered}"/>'
+            for each in ("INSTRUCTION", "BRANCH", "LINE", "COMPLEXITY", "METHOD")
+        )
+
+    out = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+        '<report name="synthetic">',
+        '<sessioninfo id="s" start="1600000000000" dump="1600000005000"/>',
+    ]
+    for p in range(packages):
+        out.append(f'<package name="pkg{p}">')
+        sourcefiles = []
+        for c in range(classes):
+            out.append(f'<class name="pkg{p}/C{c}" sourcefilename="C{c}.java">')
+            source_lines = []
+            for m in range(methods):
+                start = m * lines + 1
+                out.append(f'<method name="m{m}" desc="()V" line="{start}">')
+                out.append(counters(1, 1))
+                out.append("</method>")
+                for n in range(lines):
+                    ci = rnd.choice((0, 0, 1, 3))
+                    mb, cb = (1, 1) if n % 5 == 0 else (0, 0)
+                    source_lines.append(
+                        f'<line nr="{start + n}" mi="1" ci="{ci}" mb="{mb}" cb="{cb}"/>'
+                    )
+            out.append(counters(1, 1))
+            out.append("</class>")
+            sourcefiles.append(
+                f'<sourcefile name="C{c}.java">{"".join(source_lines)}'
+                f"{counters(1, 1)}</sourcefile>"
+            )
+        out.extend(sourcefiles)
+        out.append(counters(1, 1))
+        out.append("</package>")
+    out.append(counters(1, 1))
+    out.append("</report>")
+    return "".join(out)
+
+
+def lcov_info(files: int = 2000, functions: int = 10, lines: int = 100) -> str:
+    rnd = random.Random(0)
+    out = []
+    for f in range(files):
+        out.append("TN:")
+        out.append(f"SF:/src/mod{f % 40}/sub{f % 7}/file{f}.cpp")
+        for m in range(functions):
+            out.append(f"FN:{m * lines // functions + 1},_Z4funcv{m}")
+            out.append(f"FNDA:{rnd.choice((0, 1, 4))},_Z4funcv{m}")
+        for n in range(1, lines + 1):
+            out.append(f"DA:{n},{rnd.choice((0, 0, 1, 7))}")
+            if n % 7 == 0:
+                out.append(f"BRDA:{n},0,0,{rnd.choice(('-', '0', '2'))}")
+                out.append(f"BRDA:{n},0,1,{rnd.choice(('-', '0', '2'))}")
+        out.append("end_of_record")
+    return "\n".join(out) + "\n"
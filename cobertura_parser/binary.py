@@ -0,0 +1,324 @@
+"""
+compact binary format of code snapshots, and a memory-mapped reader
+
+all integers are little endian. layout of version 1:
+
+    header      magic, version, counts and offsets of sections
+    strings     u32 offsets (count + 1) into a utf-8 blob, then the blob
+    packages    (name, first class, class count) of u32
+    classes     (name, filename, package, first method, method count) of u32,
+                then (lines offset) u64 and (lines count) u32
+    methods     (name, signature) of u32, (lines offset) u64, (lines count) u32
+    class order u32 indexes of classes, sorted by class name
+    lines       line numbers of each class/method: the first one, then deltas,
+                zigzag varints
+
+names are indexes of the string table, so repeated names are stored once.
+the reader decodes only what is asked, e.g. lines of one class are found by
+a binary search of class order, and decoded from their own bytes.
+"""
+
+import mmap
+import pathlib
+import struct
+import typing
+
+from cobertura_parser.models.snapshot import CodeSnapshot, CodeSnapshotFat
+
+MAGIC = b"CPSN"
+VERSION = 1
+ALIGN = 8
+
+HEADER = struct.Struct("<4sHH4I7Q")
+PACKAGE = struct.Struct("<3I")
+KLASS = struct.Struct("<5IQI")
+METHOD = struct.Struct("<2IQI")
+U32 = struct.Struct("<I")
+
+
+class SnapshotFormatError(ValueError):
+    pass
+
+
+def encode_lines(numbers: typing.Iterable[int], out: bytearray) -> int:
+    """append delta encoded zigzag varints of line numbers, return the count"""
+    count = 0
+    previous = 0
+    for number in numbers:
+        delta = number - previous
+        previous = number
+        value = (delta << 1) ^ (delta >> 63)
+        while value > 0x7F:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+        count += 1
+    return count
+
+
+def decode_lines(data, offset: int, count: int) -> typing.List[int]:
+    result = []
+    previous = 0
+    for _ in range(count):
+        value = 0
+        shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        previous += (value >> 1) ^ -(value & 1)
+        result.append(previous)
+    return result
+
+
+class _StringTable(object):
+    def __init__(self):
+        self.index: typing.Dict[str, int] = dict()
+        self.values: typing.List[str] = []
+
+    def add(self, value: str) -> int:
+        value = value or ""
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def dump(self) -> bytes:
+        blob = bytearray()
+        offsets = bytearray()
+        for each in self.values:
+            offsets += U32.pack(len(blob))
+            blob += each.encode("utf-8")
+        offsets += U32.pack(len(blob))
+        return bytes(offsets + blob)
+
+
+def _pad(out: bytearray):
+    out += b"\0" * (-len(out) % ALIGN)
+
+
+def dump_snapshot_bin(
+    snapshot: typing.Union[CodeSnapshot, CodeSnapshotFat], f: typing.BinaryIO
+):
+    """write the same data as snapshot json (names and line numbers)"""
+    if isinstance(snapshot, CodeSnapshotFat):
+        snapshot = snapshot.data
+    strings = _StringTable()
+    packages = bytearray()
+    klasses = bytearray()
+    methods = bytearray()
+    lines = bytearray()
+    klass_names: typing.List[str] = []
+    method_count = 0
+
+    for package_index, package in enumerate(snapshot.packages or []):
+        classes = package.classes or []
+        packages += PACKAGE.pack(
+            strings.add(package.name), len(klass_names), len(classes)
+        )
+        for klass in classes:
+            klass_methods = klass.methods or []
+            for method in klass_methods:
+                offset = len(lines)
+                count = encode_lines(method.lines or [], lines)
+                methods += METHOD.pack(
+                    strings.add(method.name),
+                    strings.add(method.signature),
+                    offset,
+                    count,
+                )
+            offset = len(lines)
+            count = encode_lines(klass.lines or [], lines)
+            klasses += KLASS.pack(
+                strings.add(klass.name),
+                strings.add(klass.filename),
+                package_index,
+                method_count,
+                len(klass_methods),
+                offset,
+                count,
+            )
+            method_count += len(klass_methods)
+            klass_names.append(klass.name or "")
+
+    order = sorted(range(len(klass_names)), key=klass_names.__getitem__)
+    sections = [
+        strings.dump(),
+        bytes(packages),
+        bytes(klasses),
+        bytes(methods),
+        b"".join(U32.pack(each) for each in order),
+        bytes(lines),
+    ]
+    body = bytearray()
+    offsets = []
+    for each in sections:
+        offsets.append(HEADER.size + len(body))
+        body += each
+        _pad(body)
+    f.write(
+        HEADER.pack(
+            MAGIC,
+            VERSION,
+            0,
+            len(strings.values),
+            len(snapshot.packages or []),
+            len(klass_names),
+            method_count,
+            *offsets,
+            HEADER.size + len(body),
+        )
+    )
+    f.write(body)
+
+
+class SnapshotReader(object):
+    """
+    read a binary snapshot lazily with mmap
+
+    >>> with SnapshotReader(path) as reader:
+    ...     reader.class_lines("com.example.Main")
+    """
+
+    def __init__(self, path: typing.Union[str, pathlib.Path]):
+        self._file = open(path, "rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file can not be mapped
+            self._file.close()
+            raise SnapshotFormatError("empty snapshot")
+        if len(self._data) < HEADER.size:
+            self.close()
+            raise SnapshotFormatError("broken snapshot")
+        (
+            magic,
+            version,
+            _,
+            self.string_count,
+            self.package_count,
+            self.klass_count,
+            self.method_count,
+            self._strings_offset,
+            self._packages_offset,
+            self._klasses_offset,
+            self._methods_offset,
+            self._order_offset,
+            self._lines_offset,
+            size,
+        ) = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            self.close()
+            raise SnapshotFormatError("not a snapshot")
+        if version != VERSION:
+            self.close()
+            raise SnapshotFormatError(f"unsupported version: {version}")
+        if size != len(self._data):
+            self.close()
+            raise SnapshotFormatError("truncated snapshot")
+        self._blob = self._strings_offset + (self.string_count + 1) * U32.size
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def string(self, index: int) -> str:
+        start, end = struct.unpack_from(
+            "<2I", self._data, self._strings_offset + index * U32.size
+        )
+        return self._data[self._blob + start : self._blob + end].decode("utf-8")
+
+    def _lines(self, offset: int, count: int) -> typing.List[int]:
+        return decode_lines(self._data, self._lines_offset + offset, count)
+
+    def package(self, index: int) -> typing.Tuple[str, range]:
+        """name and indexes of classes"""
+        name, first, count = PACKAGE.unpack_from(
+            self._data, self._packages_offset + index * PACKAGE.size
+        )
+        return self.string(name), range(first, first + count)
+
+    def _klass(self, index: int) -> tuple:
+        return KLASS.unpack_from(self._data, self._klasses_offset + index * KLASS.size)
+
+    def klass_name(self, index: int) -> str:
+        return self.string(self._klass(index)[0])
+
+    def _order_at(self, position: int) -> int:
+        return U32.unpack_from(self._data, self._order_offset + position * U32.size)[0]
+
+    def find_classes(self, name: str, filename: str = None) -> typing.List[int]:
+        """indexes of classes by name (and filename), by a binary search"""
+        low, high = 0, self.klass_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.klass_name(self._order_at(middle)) < name:
+                low = middle + 1
+            else:
+                high = middle
+        result = []
+        for position in range(low, self.klass_count):
+            index = self._order_at(position)
+            klass_name, klass_filename, *_ = self._klass(index)
+            if self.string(klass_name) != name:
+                break
+            if filename is None or self.string(klass_filename) == filename:
+                result.append(index)
+        return sorted(result)
+
+    def class_lines(self, name: str, filename: str = None) -> typing.List[int]:
+        """lines of classes named `name`, only their bytes will be decoded"""
+        result = []
+        for index in self.find_classes(name, filename):
+            *_, offset, count = self._klass(index)
+            result.extend(self._lines(offset, count))
+        return result
+
+    def klass(self, index: int) -> dict:
+        """same as a class of snapshot json"""
+        name, filename, _, first, count, offset, line_count = self._klass(index)
+        methods = []
+        for method_index in range(first, first + count):
+            m_name, m_signature, m_offset, m_count = METHOD.unpack_from(
+                self._data, self._methods_offset + method_index * METHOD.size
+            )
+            methods.append(
+                {
+                    "name": self.string(m_name),
+                    "signature": self.string(m_signature),
+                    "lines": self._lines(m_offset, m_count),
+                }
+            )
+        return {
+            "name": self.string(name),
+            "filename": self.string(filename),
+            "methods": methods,
+            "lines": self._lines(offset, line_count),
+        }
+
+    def iter_classes(self) -> typing.Iterator[typing.Tuple[str, dict]]:
+        """(package name, class) one by one"""
+        for index in range(self.package_count):
+            package_name, klasses = self.package(index)
+            for each in klasses:
+                yield package_name, self.klass(each)
+
+    def to_dict(self) -> dict:
+        """the whole snapshot, same as `data` of snapshot json"""
+        packages = []
+        for index in range(self.package_count):
+            name, klasses = self.package(index)
+            packages.append(
+                {"name": name, "classes": [self.klass(each) for each in klasses]}
+            )
+        return {"packages": packages}
@@ -0,0 +1,183 @@
+"""
+build slim models from lxml elements directly
+
+without xmltodict and the alias-dict layer, and without validation:
+values are converted here, and models are created by `construct()`
+
+with `fast`, `__slots__` classes of `models.fast` are created instead
+"""
+
+import typing
+
+from cobertura_parser.models.builtin import (
+    CoberturaCondition,
+    CoberturaLineSlim,
+    CoberturaMethodSlim,
+    CoberturaKlassSlim,
+    CoberturaPackageSlim,
+    CoberturaStructureSlim,
+)
+from cobertura_parser.models.columnar import LineTable, parse_condition_coverage
+from cobertura_parser.models.fast import (
+    FastCondition,
+    FastLine,
+    FastMethod,
+    FastKlass,
+    FastPackage,
+    FastStructure,
+)
+
+
+def _children(element, container_tag: str, child_tag: str) -> list:
+    container = element.find(container_tag)
+    if container is None:
+        return []
+    return container.findall(child_tag)
+
+
+def _float(
+    value: typing.Optional[str], default: float = None
+) -> typing.Optional[float]:
+    if value is None:
+        return default
+    return float(value)
+
+
+def _int(value: typing.Optional[str]) -> typing.Optional[int]:
+    if value is None:
+        return None
+    return int(value)
+
+
+def _unwrap(items: list):
+    # keep the same shape as xmltodict: single element will not be wrapped
+    if len(items) == 1:
+        return items[0]
+    return items
+
+
+def build_conditions(element, fast: bool = None) -> typing.Optional[dict]:
+    model = FastCondition if fast else CoberturaCondition
+    conditions = [
+        model.construct(
+            number=int(each.get("number")),
+            type=each.get("type"),
+            coverage=each.get("coverage"),
+        )
+        for each in _children(element, "conditions", "condition")
+    ]
+    if not conditions:
+        return None
+    return {"condition": _unwrap(conditions)}
+
+
+def build_line(element, fast: bool = None) -> CoberturaLineSlim:
+    model = FastLine if fast else CoberturaLineSlim
+    return model.construct(
+        number=int(element.get("number")),
+        hits=int(element.get("hits")),
+        branch=element.get("branch"),
+        condition_coverage=element.get("condition-coverage"),
+        conditions=build_conditions(element, fast),
+    )
+
+
+def build_line_table(elements: typing.Iterable) -> LineTable:
+    """lines in columns, no object will be created for each line"""
+    table = LineTable()
+    for element in elements:
+        covered, total = parse_condition_coverage(element.get("condition-coverage"))
+        table.append(
+            int(element.get("number")),
+            int(element.get("hits")),
+            element.get("branch") == "true",
+            covered,
+            total,
+        )
+    return table
+
+
+def build_lines(
+    element, columnar: bool = None, fast: bool = None
+) -> typing.Union[list, LineTable]:
+    lines = _children(element, "lines", "line")
+    if columnar:
+        return build_line_table(lines)
+    return [build_line(each, fast) for each in lines]
+
+
+def build_method(
+    element, columnar: bool = None, fast: bool = None
+) -> CoberturaMethodSlim:
+    model = FastMethod if fast else CoberturaMethodSlim
+    return model.construct(
+        name=element.get("name"),
+        signature=element.get("signature"),
+        line_rate=float(element.get("line-rate")),
+        branch_rate=float(element.get("branch-rate")),
+        complexity=_float(element.get("complexity")),
+        lines=build_lines(element, columnar, fast),
+    )
+
+
+def build_klass(
+    element, columnar: bool = None, fast: bool = None
+) -> CoberturaKlassSlim:
+    model = FastKlass if fast else CoberturaKlassSlim
+    return model.construct(
+        name=element.get("name"),
+        filename=element.get("filename"),
+        line_rate=float(element.get("line-rate")),
+        branch_rate=float(element.get("branch-rate")),
+        complexity=_float(element.get("complexity")),
+        methods=[
+            build_method(each, columnar, fast)
+            for each in _children(element, "methods", "method")
+        ],
+        lines=build_lines(element, columnar, fast),
+    )
+
+
+def build_package(
+    element, columnar: bool = None, fast: bool = None
+) -> CoberturaPackageSlim:
+    model = FastPackage if fast else CoberturaPackageSlim
+    return model.construct(
+        name=element.get("name"),
+        line_rate=float(element.get("line-rate")),
+        branch_rate=float(element.get("branch-rate")),
+        complexity=_float(element.get("complexity")),
+        classes=[
+            build_klass(each, columnar, fast)
+            for each in _children(element, "classes", "class")
+        ],
+    )
+
+
+def build_sources(element) -> typing.Optional[dict]:
+    sources = [each.text for each in _children(element, "sources", "source")]
+    if not sources:
+        return None
+    return {"source": _unwrap(sources)}
+
+
+def build_coverage(
+    element, columnar: bool = None, fast: bool = None
+) -> typing.Union[CoberturaStructureSlim, FastStructure]:
+    model = FastStructure if fast else CoberturaStructureSlim
+    return model.construct(
+        sources=build_sources(element),
+        packages=[
+            build_package(each, columnar, fast)
+            for each in _children(element, "packages", "package")
+        ],
+        line_rate=float(element.get("line-rate")),
+        branch_rate=float(element.get("branch-rate")),
+        line_covered=_int(element.get("lines-covered")),
+        line_valid=_int(element.get("lines-valid")),
+        branches_covered=_int(element.get("branches-covered")),
+        branches_valid=_int(element.get("branches-valid")),
+        complexity=_float(element.get("complexity")),
+        version=_float(element.get("version"), -1.0),
+        timestamp=_float(element.get("timestamp"), -1.0),
+    )
@@ -0,0 +1,222 @@
+"""
+on-disk cache of parsed reports
+
+slim structures are stored by the hash of report content (or path, mtime
+and size with `fast`), so loading the same report again is one read of a
+memory-mapped file instead of parsing xml.
+
+entries are pickled with protocol 5, and columns of `LineTable` are written
+out-of-band, right after the pickle stream. size of the cache directory is
+bounded, and the least recently used entries are evicted first.
+"""
+
+import hashlib
+import mmap
+import os
+import pathlib
+import pickle
+import struct
+import tempfile
+import typing
+
+from cobertura_parser.models.builtin import CoberturaStructureSlim
+
+CACHE_DIR_ENV = "COBERTURA_PARSER_CACHE"
+DEFAULT_CACHE_DIR = pathlib.Path.home() / ".cache" / "cobertura_parser"
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+SUFFIX = ".bin"
+
+# bump it when models change, old entries will never be hit
+FORMAT_VERSION = 1
+MAGIC = b"CPC" + bytes([FORMAT_VERSION])
+PROTOCOL = min(5, pickle.HIGHEST_PROTOCOL)
+# buffers are aligned, so columns can be read without unaligned copies
+ALIGN = 8
+LENGTH = struct.Struct("<Q")
+HASH_CHUNK = 1024 * 1024
+
+
+class CacheEntry(typing.NamedTuple):
+    key: str
+    path: pathlib.Path
+    size: int
+    # timestamp of the last hit (or write)
+    last_used: float
+
+
+def _padding(size: int) -> int:
+    return -size % ALIGN
+
+
+def dump_entry(structure: CoberturaStructureSlim, f: typing.BinaryIO):
+    """
+    layout: magic, length of pickle, pickle, count of buffers,
+    then (length, aligned bytes) of each buffer
+    """
+    buffers = []
+    if PROTOCOL >= 5:
+        data = pickle.dumps(structure, PROTOCOL, buffer_callback=buffers.append)
+    else:
+        data = pickle.dumps(structure, PROTOCOL)
+    f.write(MAGIC)
+    f.write(LENGTH.pack(len(data)))
+    f.write(data)
+    f.write(b"\0" * _padding(len(data)))
+    f.write(LENGTH.pack(len(buffers)))
+    for each in buffers:
+        raw = each.raw()
+        f.write(LENGTH.pack(raw.nbytes))
+        f.write(raw)
+        f.write(b"\0" * _padding(raw.nbytes))
+
+
+def load_entry(data: typing.Union[bytes, mmap.mmap]) -> CoberturaStructureSlim:
+    """read the layout of `dump_entry`, buffers are slices of `data`"""
+    if data[: len(MAGIC)] != MAGIC:
+        raise ValueError("not a cache entry of this version")
+    view = memoryview(data)
+    stream = None
+    buffers = []
+    try:
+        pos = len(MAGIC)
+        (size,) = LENGTH.unpack_from(view, pos)
+        pos += LENGTH.size
+        stream = view[pos : pos + size]
+        pos += size + _padding(size)
+        (count,) = LENGTH.unpack_from(view, pos)
+        pos += LENGTH.size
+        for _ in range(count):
+            (size,) = LENGTH.unpack_from(view, pos)
+            pos += LENGTH.size
+            buffers.append(view[pos : pos + size])
+            pos += size + _padding(size)
+        # columns are copied into arrays here, nothing refers to `data` later
+        if buffers:
+            return pickle.loads(stream, buffers=buffers)
+        return pickle.loads(stream)
+    finally:
+        # an mmap can not be closed while any view of it is alive
+        for each in buffers:
+            each.release()
+        if stream is not None:
+            stream.release()
+        view.release()
+
+
+class ReportCache(object):
+    """
+    parsed reports in a directory, one file for each entry
+
+    :param directory: `$COBERTURA_PARSER_CACHE` or `~/.cache/cobertura_parser`
+    :param max_size: bytes of all entries, LRU entries will be evicted
+    :param fast: use path, mtime and size instead of hashing the content
+    """
+
+    def __init__(
+        self,
+        directory: typing.Union[str, pathlib.Path] = None,
+        max_size: int = None,
+        fast: bool = None,
+    ):
+        if directory is None:
+            directory = os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+        self.directory = pathlib.Path(directory)
+        self.max_size = DEFAULT_MAX_SIZE if max_size is None else max_size
+        self.fast = fast
+
+    def key(self, file_path: typing.Union[str, pathlib.Path], *options) -> str:
+        """options (e.g. `columnar`) are parts of the key too"""
+        h = hashlib.sha256(MAGIC)
+        h.update(repr(options).encode())
+        if self.fast:
+            stat = os.stat(file_path)
+            h.update(os.fsencode(os.path.abspath(file_path)))
+            h.update(f"{stat.st_mtime_ns}:{stat.st_size}".encode())
+        else:
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                    h.update(chunk)
+        return h.hexdigest()[:32]
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / (key + SUFFIX)
+
+    def get(self, key: str) -> typing.Optional[CoberturaStructureSlim]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    result = load_entry(data)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            # missing, empty, broken or outdated
+            return None
+        # mtime works as the last used time of LRU, atime is often disabled
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key: str, structure: CoberturaStructureSlim):
+        """write to a temp file and rename, so readers never see half entries"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                dump_entry(structure, f)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.prune()
+
+    def load(
+        self,
+        file_path: typing.Union[str, pathlib.Path],
+        loader: typing.Callable[[], CoberturaStructureSlim],
+        *options,
+    ) -> CoberturaStructureSlim:
+        """cached result, or result of `loader` which will be cached"""
+        key = self.key(file_path, *options)
+        result = self.get(key)
+        if result is None:
+            result = loader()
+            self.put(key, result)
+        return result
+
+    def entries(self) -> typing.List[CacheEntry]:
+        """most recently used first"""
+        result = []
+        if not self.directory.is_dir():
+            return result
+        for path in self.directory.glob("*" + SUFFIX):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            result.append(CacheEntry(path.stem, path, stat.st_size, stat.st_mtime))
+        result.sort(key=lambda each: each.last_used, reverse=True)
+        return result
+
+    def prune(self, max_size: int = None) -> typing.List[CacheEntry]:
+        """evict LRU entries until the total size fits, return evicted ones"""
+        if max_size is None:
+            max_size = self.max_size
+        total = 0
+        full = False
+        evicted = []
+        for each in self.entries():
+            # once an entry does not fit, all older ones go too
+            full = full or total + each.size > max_size
+            if not full:
+                total += each.size
+                continue
+            try:
+                each.path.unlink()
+            except OSError:
+                continue
+            evicted.append(each)
+        return evicted
+
+    def clear(self) -> typing.List[CacheEntry]:
+        return self.prune(0)
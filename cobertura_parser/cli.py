@@ -1,147 +1,389 @@
 import fire
 import json
+import time
+import typing
 
-from cobertura_parser.ext.lcov import lcov2cobertura
+from cobertura_parser.binary import dump_snapshot_bin
+from cobertura_parser.cache import ReportCache
 from cobertura_parser.loader import CoberturaLoader
-from cobertura_parser.models.builtin import CoberturaStructure
+from cobertura_parser.models.builtin import CoberturaStructure, CoberturaStructureSlim
+from cobertura_parser.export import export_lines
+from cobertura_parser.filters import ReportFilter
+from cobertura_parser.patch import PatchIndex
 from cobertura_parser.processor import CoberturaProcessor
+from cobertura_parser.serializer import (
+    dump_coverage,
+    dump_coverage_ndjson,
+    dump_snapshot,
+    dump_snapshot_ndjson,
+)
 from cobertura_parser.utils import time_measure
-from cobertura_parser.ext.jacoco import jacoco2cobertura
+from cobertura_parser.writer import write_cobertura
+from cobertura_parser.ext.jacoco import jacoco2cobertura, jacoco2cobertura_file
+
+FORMAT_JSON = "json"
+FORMAT_NDJSON = "ndjson"
+FORMAT_BIN = "bin"
+COV_FORMATS = (FORMAT_JSON, FORMAT_NDJSON)
+SNAPSHOT_FORMATS = (FORMAT_JSON, FORMAT_NDJSON, FORMAT_BIN)
 
 
 class TerminalCli(object):
-    def _cov(self, structure: CoberturaStructure) -> str:
+    """
+    all commands accept `--include` and `--exclude`, globs (comma separated)
+    of package names and class file names, applied while parsing
+
+    cov and snapshot commands accept `--format ndjson`: one json line for each
+    class (with its package name), and reports are parsed incrementally.
+    jacoco is always converted directly (as `--direct`) in one process, so
+    `--workers` can not be used. lcov is loaded as a whole before the first
+    line is written, see `CoberturaLoader.iter_report_classes`
+    snapshot commands also accept `--format bin`, see `SnapshotReader`
+    """
+
+    def _filter(self, include: str = None, exclude: str = None):
+        return ReportFilter.create(include, exclude)
+
+    def _check_format(self, format: str, allowed: typing.Tuple[str, ...]):
+        if format not in allowed:
+            raise ValueError(f"unknown format: {format}")
+
+    def _dump_cov_ndjson(
+        self, from_file: str, to_file: str, report_filter, workers: int = None
+    ):
+        # lines are written with their conditions, which columns do not keep
+        classes = CoberturaLoader.iter_report_classes(
+            from_file, report_filter=report_filter, workers=workers
+        )
+        with open(to_file, "wb") as f:
+            dump_coverage_ndjson(CoberturaProcessor.iter_coverage(classes), f)
+
+    def _dump_snapshot_ndjson(
+        self, from_file: str, to_file: str, report_filter, workers: int = None
+    ):
+        classes = CoberturaLoader.iter_report_classes(
+            from_file, columnar=True, report_filter=report_filter, workers=workers
+        )
+        with open(to_file, "wb") as f:
+            dump_snapshot_ndjson(CoberturaProcessor.iter_code_snapshot(classes), f)
+
+    def _dump_cov(
+        self,
+        structure: typing.Union[CoberturaStructure, CoberturaStructureSlim],
+        to_file: str,
+    ):
         result = CoberturaProcessor.get_coverage(structure)
         result.lazy_calc()
-        return result.json(
-            exclude={
-                "sources": ...,
-                "line_rate": ...,
-                "branch_rate": ...,
-                "line_covered": ...,
-                "line_valid": ...,
-                "branches_covered": ...,
-                "branches_valid": ...,
-                "complexity": ...,
-                "version": ...,
-                "packages": {
-                    "__all__": {
-                        "classes": {
-                            "__all__": {
-                                "methods": {
-                                    "__all__": {
-                                        "branch_rate",
-                                        "line_rate",
-                                        "complexity",
-                                    }
-                                },
-                                "branch_rate": ...,
-                                "line_rate": ...,
-                                "complexity": ...,
-                                "lines": ...,
-                            }
-                        },
-                        "branch_rate": ...,
-                        "line_rate": ...,
-                        "complexity": ...,
-                    }
-                },
-            }
-        )
+        with open(to_file, "wb") as f:
+            dump_coverage(result, f)
 
-    def _snapshot(self, structure: CoberturaStructure) -> str:
+    def _dump_snapshot(
+        self,
+        structure: typing.Union[CoberturaStructure, CoberturaStructureSlim],
+        to_file: str,
+        format: str = FORMAT_JSON,
+    ):
         result = CoberturaProcessor.get_code_snapshot_fat(structure)
-        return result.json(
-            exclude={
-                "data": {
-                    "sources": ...,
-                    "line_rate": ...,
-                    "branch_rate": ...,
-                    "line_covered": ...,
-                    "line_valid": ...,
-                    "branches_covered": ...,
-                    "branches_valid": ...,
-                    "complexity": ...,
-                    "version": ...,
-                    "packages": {
-                        "__all__": {
-                            "classes": {
-                                "__all__": {
-                                    "methods": {
-                                        "__all__": {
-                                            "branch_rate",
-                                            "line_rate",
-                                            "complexity",
-                                        }
-                                    },
-                                    "branch_rate": ...,
-                                    "line_rate": ...,
-                                    "complexity": ...,
-                                }
-                            },
-                            "branch_rate": ...,
-                            "line_rate": ...,
-                            "complexity": ...,
-                        }
-                    },
-                }
-            }
-        )
+        with open(to_file, "wb") as f:
+            if format == FORMAT_BIN:
+                dump_snapshot_bin(result, f)
+            else:
+                dump_snapshot(result, f)
 
-    def cov(self, from_file: str, to_file: str, dev: bool = None):
+    def cov(
+        self,
+        from_file: str,
+        to_file: str,
+        dev: bool = None,
+        include: str = None,
+        exclude: str = None,
+        format: str = FORMAT_JSON,
+    ):
         with time_measure("cov", dev):
-            structure: CoberturaStructure = CoberturaLoader.from_file(from_file)
-            with open(to_file, "w") as f:
-                f.write(self._cov(structure))
+            self._check_format(format, COV_FORMATS)
+            if format == FORMAT_NDJSON:
+                self._dump_cov_ndjson(
+                    from_file, to_file, self._filter(include, exclude)
+                )
+                return
+            structure: CoberturaStructure = CoberturaLoader.from_file(
+                from_file, report_filter=self._filter(include, exclude)
+            )
+            self._dump_cov(structure, to_file)
 
-    def cov_from_jacoco(self, from_file: str, to_file: str, dev: bool = None):
+    def cov_from_jacoco(
+        self,
+        from_file: str,
+        to_file: str,
+        dev: bool = None,
+        workers: int = None,
+        direct: bool = None,
+        include: str = None,
+        exclude: str = None,
+        format: str = FORMAT_JSON,
+    ):
         with time_measure("cov_from_jacoco", dev):
-            structure: CoberturaStructure = CoberturaLoader.from_jacoco_file(from_file)
-            with open(to_file, "w") as f:
-                f.write(self._cov(structure))
+            self._check_format(format, COV_FORMATS)
+            if format == FORMAT_NDJSON:
+                self._dump_cov_ndjson(
+                    from_file, to_file, self._filter(include, exclude), workers
+                )
+                return
+            structure: CoberturaStructure = CoberturaLoader.from_jacoco_file(
+                from_file,
+                workers=workers,
+                direct=direct,
+                report_filter=self._filter(include, exclude),
+            )
+            self._dump_cov(structure, to_file)
 
-    def snapshot(self, from_file: str, to_file: str, dev: bool = None):
+    def snapshot(
+        self,
+        from_file: str,
+        to_file: str,
+        dev: bool = None,
+        include: str = None,
+        exclude: str = None,
+        format: str = FORMAT_JSON,
+    ):
         with time_measure("snapshot", dev):
-            structure: CoberturaStructure = CoberturaLoader.from_file(from_file)
-            with open(to_file, "w") as f:
-                f.write(self._snapshot(structure))
+            self._check_format(format, SNAPSHOT_FORMATS)
+            if format == FORMAT_NDJSON:
+                self._dump_snapshot_ndjson(
+                    from_file, to_file, self._filter(include, exclude)
+                )
+                return
+            structure: CoberturaStructure = CoberturaLoader.from_file(
+                from_file, report_filter=self._filter(include, exclude)
+            )
+            self._dump_snapshot(structure, to_file, format)
 
-    def snapshot_from_jacoco(self, from_file: str, to_file: str, dev: bool = None):
+    def snapshot_from_jacoco(
+        self,
+        from_file: str,
+        to_file: str,
+        dev: bool = None,
+        workers: int = None,
+        direct: bool = None,
+        include: str = None,
+        exclude: str = None,
+        format: str = FORMAT_JSON,
+    ):
         with time_measure("snapshot_from_jacoco", dev):
-            structure: CoberturaStructure = CoberturaLoader.from_jacoco_file(from_file)
+            self._check_format(format, SNAPSHOT_FORMATS)
+            if format == FORMAT_NDJSON:
+                self._dump_snapshot_ndjson(
+                    from_file, to_file, self._filter(include, exclude), workers
+                )
+                return
+            structure: CoberturaStructure = CoberturaLoader.from_jacoco_file(
+                from_file,
+                workers=workers,
+                direct=direct,
+                report_filter=self._filter(include, exclude),
+            )
+            self._dump_snapshot(structure, to_file, format)
+
+    def merge(
+        self,
+        to_file: str,
+        *from_files: str,
+        dev: bool = None,
+        columnar: bool = None,
+        include: str = None,
+        exclude: str = None,
+        cache: bool = None,
+    ):
+        """
+        merge cobertura/jacoco reports into one cobertura xml
+        with `columnar`, it will be much faster but details of conditions are dropped
+        with `cache`, parsed reports will be reused, see `cache` command
+        """
+        with time_measure("merge", dev):
+            report_filter = self._filter(include, exclude)
+            report_cache = ReportCache() if cache else None
+            reports = (
+                CoberturaLoader.slim_from_report(
+                    each, columnar, report_filter, report_cache
+                )
+                for each in from_files
+            )
+            structure = CoberturaProcessor.merge(reports, columnar)
+            with open(to_file, "wb") as f:
+                write_cobertura(structure, f)
+
+    def diff(
+        self,
+        base_file: str,
+        head_file: str,
+        to_file: str,
+        dev: bool = None,
+        include: str = None,
+        exclude: str = None,
+    ):
+        """
+        coverage changes between two reports, cobertura, jacoco or lcov
+        cobertura and jacoco xml are parsed incrementally
+        """
+        with time_measure("diff", dev):
+            report_filter = self._filter(include, exclude)
+            result = CoberturaProcessor.diff(
+                CoberturaLoader.iter_report_classes(
+                    base_file, columnar=True, report_filter=report_filter
+                ),
+                CoberturaLoader.iter_report_classes(
+                    head_file, columnar=True, report_filter=report_filter
+                ),
+            )
             with open(to_file, "w") as f:
-                f.write(self._snapshot(structure))
+                f.write(result.json())
 
-    def xml_from_jacoco(self, from_file: str, to_file: str, dev: bool = None):
+    def diff_cov(
+        self,
+        patch_file: str,
+        report_file: str,
+        to_file: str,
+        dev: bool = None,
+        include: str = None,
+        exclude: str = None,
+    ):
+        """
+        coverage of changed lines in a unified diff
+        report can be cobertura, jacoco or lcov, only changed files will be loaded
+        """
+        with time_measure("diff_cov", dev):
+            patch = PatchIndex.from_file(patch_file)
+            classes = CoberturaLoader.iter_report_classes(
+                report_file,
+                columnar=True,
+                report_filter=ReportFilter(include, exclude, patch.accepts),
+            )
+            result = CoberturaProcessor.diff_cov(patch, classes)
+            with open(to_file, "w") as f:
+                f.write(result.json())
+
+    def cache(self, action: str = "list", cache_dir: str = None, max_size: int = None):
+        """
+        inspect or prune the cache of parsed reports
+        action: list, prune (LRU entries beyond `max_size` bytes) or clear
+        """
+        report_cache = ReportCache(cache_dir, max_size)
+        if action == "list":
+            entries = report_cache.entries()
+        elif action == "prune":
+            entries = report_cache.prune()
+        elif action == "clear":
+            entries = report_cache.clear()
+        else:
+            raise ValueError(f"unknown action: {action}")
+        for each in entries:
+            last_used = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(each.last_used)
+            )
+            print(f"{each.key}\t{each.size}\t{last_used}")
+        print(f"{action}: {len(entries)} entries, {report_cache.directory}")
+
+    def export(
+        self,
+        from_file: str,
+        to_file: str,
+        dev: bool = None,
+        format: str = None,
+        include: str = None,
+        exclude: str = None,
+    ):
+        """
+        line level table of any report, for analytics
+        format: arrow, parquet (both need pyarrow) or npz, detected by suffix
+        """
+        with time_measure("export", dev):
+            classes = CoberturaLoader.iter_report_classes(
+                from_file, columnar=True, report_filter=self._filter(include, exclude)
+            )
+            export_lines(classes, to_file, format)
+
+    def xml_from_jacoco(
+        self,
+        from_file: str,
+        to_file: str,
+        dev: bool = None,
+        workers: int = None,
+        stream: bool = None,
+        include: str = None,
+        exclude: str = None,
+    ):
+        """
+        with `stream`, packages are converted and written one by one in this
+        process, so it can not be used with `workers`
+        """
+        if stream and workers is not None:
+            raise ValueError("stream can not be used with workers")
         with time_measure("xml_from_jacoco", dev):
+            report_filter = self._filter(include, exclude)
+            if stream:
+                with open(to_file, "wb") as f:
+                    jacoco2cobertura_file(from_file, f, report_filter)
+                return
             with open(to_file, "w") as f:
-                f.write(jacoco2cobertura(from_file))
+                f.write(jacoco2cobertura(from_file, workers, report_filter))
 
-    def xml_from_jacoco_to_json(self, from_file: str, to_file: str, dev: bool = None):
+    def xml_from_jacoco_to_json(
+        self,
+        from_file: str,
+        to_file: str,
+        dev: bool = None,
+        workers: int = None,
+        include: str = None,
+        exclude: str = None,
+    ):
         with time_measure("xml_from_jacoco_to_json", dev):
             json_content: dict = CoberturaLoader.from_str(
-                jacoco2cobertura(from_file), to_dict=True
+                jacoco2cobertura(from_file, workers, self._filter(include, exclude)),
+                to_dict=True,
             )
             with open(to_file, "w") as f:
                 f.write(json.dumps(json_content))
 
-    def data_from_lcov_to_json(self, from_file: str, to_file: str, dev: bool = None):
+    def data_from_lcov_to_json(
+        self,
+        from_file: str,
+        to_file: str,
+        dev: bool = None,
+        workers: int = None,
+        include: str = None,
+        exclude: str = None,
+    ):
         with time_measure("data_from_lcov_to_json", dev):
-            with open(from_file) as f:
-                json_content: dict = CoberturaLoader.from_str(
-                    lcov2cobertura(f.read()), to_dict=True
-                )
+            json_content: dict = CoberturaLoader.from_lcov_file(
+                from_file,
+                to_dict=True,
+                workers=workers,
+                report_filter=self._filter(include, exclude),
+            )
             with open(to_file, "w") as f:
                 f.write(json.dumps(json_content))
 
-    def data_from_lcov_to_cov(self, from_file: str, to_file: str, dev: bool = None):
+    def data_from_lcov_to_cov(
+        self,
+        from_file: str,
+        to_file: str,
+        dev: bool = None,
+        workers: int = None,
+        include: str = None,
+        exclude: str = None,
+        format: str = FORMAT_JSON,
+    ):
         with time_measure("data_from_lcov_to_cov", dev):
-            with open(from_file) as f:
-                structure: CoberturaStructure = CoberturaLoader.from_str(
-                    lcov2cobertura(f.read())
+            self._check_format(format, COV_FORMATS)
+            if format == FORMAT_NDJSON:
+                self._dump_cov_ndjson(
+                    from_file, to_file, self._filter(include, exclude), workers
                 )
-            with open(to_file, "w") as f:
-                f.write(self._cov(structure))
+                return
+            structure: CoberturaStructureSlim = CoberturaLoader.from_lcov_file(
+                from_file, workers=workers, report_filter=self._filter(include, exclude)
+            )
+            self._dump_cov(structure, to_file)
 
 
 def main():
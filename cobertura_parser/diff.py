@@ -0,0 +1,207 @@
+"""
+coverage diff between two reports, e.g. the base commit and the head of a PR
+
+lines of base are indexed by (filename, line number) in a dict, and head is
+walked only once, so it takes O(base + head). both sides can be streams of
+classes (see `CoberturaLoader.iter_classes`), then only the index of base
+and one class of head will be kept in memory.
+
+diff coverage (coverage of changed lines of a patch) lives here too.
+"""
+
+import typing
+from collections import defaultdict
+
+from cobertura_parser.models.builtin import (
+    CoberturaKlassSlim,
+    CoberturaStructure,
+    CoberturaStructureSlim,
+)
+from cobertura_parser.models.columnar import LineTable, coverage_rate
+from cobertura_parser.models.fast import FastKlass, FastStructure
+from cobertura_parser.models.diff import (
+    CoverageDiff,
+    DiffCoverage,
+    FileDiffCoverage,
+    KlassDiff,
+    LineChanges,
+    MethodDiff,
+)
+from cobertura_parser.patch import PatchIndex
+
+TYPE_CLASSES = typing.Union[
+    CoberturaStructure,
+    CoberturaStructureSlim,
+    FastStructure,
+    typing.Iterable[
+        typing.Union[
+            CoberturaKlassSlim,
+            FastKlass,
+            typing.Tuple[str, typing.Union[CoberturaKlassSlim, FastKlass]],
+        ]
+    ],
+]
+TYPE_METHOD_KEY = typing.Tuple[str, str]
+
+
+def iter_klasses(data: TYPE_CLASSES) -> typing.Iterator[CoberturaKlassSlim]:
+    """classes of a structure, or a stream of classes / (package name, class)"""
+    if isinstance(data, CoberturaStructure):
+        data = data.slim()
+    if isinstance(data, (CoberturaStructureSlim, FastStructure)):
+        for each_pkg in data.packages or []:
+            yield from each_pkg.classes or []
+        return
+    for each in data:
+        if isinstance(each, tuple):
+            each = each[1]
+        yield each
+
+
+def _line_hits(lines) -> typing.Iterable[typing.Tuple[int, int]]:
+    if isinstance(lines, LineTable):
+        return zip(lines.numbers, lines.hits)
+    return ((each.number, each.hits) for each in lines or [])
+
+
+class BaseIndex(object):
+    """
+    lines: (filename, line number) -> hits
+    klasses: (class name, filename) -> line number -> method (name, signature)
+    """
+
+    def __init__(self, base: TYPE_CLASSES):
+        self.lines: typing.Dict[typing.Tuple[str, int], int] = dict()
+        self.klasses: typing.Dict[
+            typing.Tuple[str, str], typing.Dict[int, typing.Optional[TYPE_METHOD_KEY]]
+        ] = dict()
+        for klass in iter_klasses(base):
+            method_of = dict()
+            for method in klass.methods or []:
+                for number, _ in _line_hits(method.lines):
+                    method_of[number] = (method.name, method.signature)
+            klass_lines = self.klasses.setdefault((klass.name, klass.filename), {})
+            for number, hits in _line_hits(klass.lines):
+                self.lines[(klass.filename, number)] = hits
+                klass_lines[number] = method_of.get(number)
+
+
+def _classify(changes: LineChanges, base_hits: typing.Optional[int], hits, number):
+    if base_hits is None:
+        changes.added.append(number)
+    elif hits and not base_hits:
+        changes.newly_covered.append(number)
+    elif base_hits and not hits:
+        changes.newly_uncovered.append(number)
+
+
+def _removed_by_method(
+    removed: typing.List[int], base_lines: dict
+) -> typing.Dict[TYPE_METHOD_KEY, typing.List[int]]:
+    result = defaultdict(list)
+    for number in removed:
+        method_key = base_lines[number]
+        if method_key is not None:
+            result[method_key].append(number)
+    return result
+
+
+def _removed_methods(removed_by_method: dict) -> typing.List[MethodDiff]:
+    return [
+        MethodDiff(name=name, signature=signature, removed=numbers)
+        for (name, signature), numbers in removed_by_method.items()
+    ]
+
+
+def iter_diff(base: TYPE_CLASSES, head: TYPE_CLASSES) -> typing.Iterator[KlassDiff]:
+    """
+    yield changed classes of head one by one, then classes removed from base
+    lines are removed if they are not in the same class of head any more
+    """
+    index = BaseIndex(base)
+    for klass in iter_klasses(head):
+        base_lines = index.klasses.pop((klass.name, klass.filename), {})
+        result = KlassDiff(name=klass.name, filename=klass.filename)
+        numbers = set()
+        for number, hits in _line_hits(klass.lines):
+            numbers.add(number)
+            _classify(result, index.lines.get((klass.filename, number)), hits, number)
+        result.removed = [each for each in base_lines if each not in numbers]
+
+        removed_by_method = _removed_by_method(result.removed, base_lines)
+        for method in klass.methods or []:
+            method_result = MethodDiff(name=method.name, signature=method.signature)
+            for number, hits in _line_hits(method.lines):
+                _classify(
+                    method_result,
+                    index.lines.get((klass.filename, number)),
+                    hits,
+                    number,
+                )
+            method_result.removed = removed_by_method.pop(
+                (method.name, method.signature), []
+            )
+            if method_result.is_changed():
+                result.methods.append(method_result)
+        result.methods.extend(_removed_methods(removed_by_method))
+
+        if result.is_changed():
+            yield result
+
+    for (name, filename), base_lines in index.klasses.items():
+        removed = list(base_lines)
+        if not removed:
+            continue
+        yield KlassDiff(
+            name=name,
+            filename=filename,
+            removed=removed,
+            methods=_removed_methods(_removed_by_method(removed, base_lines)),
+        )
+
+
+def diff_reports(base: TYPE_CLASSES, head: TYPE_CLASSES) -> CoverageDiff:
+    result = CoverageDiff()
+    for each in iter_diff(base, head):
+        result.classes.append(each)
+        result.newly_covered += len(each.newly_covered)
+        result.newly_uncovered += len(each.newly_uncovered)
+        result.added += len(each.added)
+        result.removed += len(each.removed)
+    return result
+
+
+def diff_coverage(patch: PatchIndex, classes: TYPE_CLASSES) -> DiffCoverage:
+    """
+    coverage of changed lines only
+    lines of classes which are not in the patch will never be read, so
+    classes can be a stream filtered by `patch.accepts`
+    """
+    # path in the patch -> line number -> hit or not
+    files: typing.Dict[str, typing.Dict[int, bool]] = dict()
+    for klass in iter_klasses(classes):
+        path = patch.match(klass.filename)
+        if path is None:
+            continue
+        ranges = patch.files[path]
+        file_lines = files.setdefault(path, {})
+        for number, hits in _line_hits(klass.lines):
+            if number in ranges:
+                file_lines[number] = file_lines.get(number, False) or bool(hits)
+
+    result = DiffCoverage()
+    for path, file_lines in files.items():
+        covered = sum(file_lines.values())
+        result.files.append(
+            FileDiffCoverage(
+                filename=path,
+                changed=len(file_lines),
+                covered=covered,
+                rate=coverage_rate(covered, len(file_lines)),
+                uncovered_lines=sorted(k for k, v in file_lines.items() if not v),
+            )
+        )
+        result.changed += len(file_lines)
+        result.covered += covered
+    result.rate = coverage_rate(result.covered, result.changed)
+    return result
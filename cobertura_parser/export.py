@@ -0,0 +1,338 @@
+"""
+line level coverage as a columnar table, for analytics
+
+one row for each line of each class:
+package, class, filename, method, line, hits, branch, covered, total
+
+columns are built in batches from `LineTable` of slim classes (load them
+with `columnar`), never through one dict per row. string columns are
+dictionary encoded: int32 codes, and their values in a shared pool.
+
+with pyarrow, tables will be written as Arrow IPC or Parquet. without it,
+each column will be a `.npy` member of a `.npz` file, which is written with
+the stdlib only, and can be loaded by `numpy.load`.
+"""
+
+import ast
+import struct
+import sys
+import typing
+import zipfile
+from array import array
+
+from cobertura_parser.models.builtin import CoberturaKlassSlim
+from cobertura_parser.models.columnar import LineTable
+
+try:
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+try:
+    # pyarrow can be built without parquet
+    import pyarrow.parquet as parquet
+except ImportError:
+    parquet = None
+
+FORMAT_ARROW = "arrow"
+FORMAT_PARQUET = "parquet"
+FORMAT_NPZ = "npz"
+SUFFIX_FORMATS = {
+    ".arrow": FORMAT_ARROW,
+    ".feather": FORMAT_ARROW,
+    ".ipc": FORMAT_ARROW,
+    ".parquet": FORMAT_PARQUET,
+    ".npz": FORMAT_NPZ,
+}
+
+STRING_COLUMNS = ("package", "class", "filename", "method")
+NUMBER_COLUMNS = ("line", "hits", "branch", "covered", "total")
+COLUMNS = STRING_COLUMNS + NUMBER_COLUMNS
+# typecodes of `array`, same as `LineTable`
+TYPECODES = {
+    "package": "i",
+    "class": "i",
+    "filename": "i",
+    "method": "i",
+    "line": "q",
+    "hits": "q",
+    "branch": "b",
+    "covered": "i",
+    "total": "i",
+}
+# code of lines which are not in any method
+NO_METHOD = -1
+DEFAULT_BATCH_SIZE = 64 * 1024
+
+
+class StringPool(object):
+    """values of dictionary encoded columns, shared by all batches"""
+
+    def __init__(self):
+        self.codes: typing.Dict[str, int] = dict()
+        self.values: typing.List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class LineBatch(object):
+    """columns of some rows, see `TYPECODES`"""
+
+    def __init__(self):
+        self.columns: typing.Dict[str, array] = {
+            name: array(typecode) for name, typecode in TYPECODES.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.columns["line"])
+
+    def extend(self, other: "LineBatch"):
+        for name, column in self.columns.items():
+            column.extend(other.columns[name])
+
+    def add_klass(self, package_code: int, klass: CoberturaKlassSlim, pool: StringPool):
+        lines = klass.lines
+        if not isinstance(lines, LineTable):
+            lines = LineTable.from_lines(lines or [])
+        size = len(lines)
+        if not size:
+            return
+
+        method_of: typing.Dict[int, int] = dict()
+        for method in klass.methods or []:
+            code = pool.code(method.name)
+            numbers = method.lines
+            if isinstance(numbers, LineTable):
+                numbers = numbers.numbers
+            else:
+                numbers = [each.number for each in numbers or []]
+            for number in numbers:
+                method_of.setdefault(number, code)
+
+        columns = self.columns
+        # same value for all rows of a class, repeated by array ops
+        columns["package"].extend(array("i", [package_code]) * size)
+        columns["class"].extend(array("i", [pool.code(klass.name)]) * size)
+        columns["filename"].extend(array("i", [pool.code(klass.filename)]) * size)
+        columns["method"].extend(
+            array("i", [method_of.get(each, NO_METHOD) for each in lines.numbers])
+        )
+        columns["line"].extend(lines.numbers)
+        columns["hits"].extend(lines.hits)
+        columns["branch"].extend(lines.branches)
+        columns["covered"].extend(lines.covered)
+        columns["total"].extend(lines.total)
+
+
+def iter_batches(
+    classes: typing.Iterable[typing.Tuple[str, CoberturaKlassSlim]],
+    pool: StringPool,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> typing.Iterator[LineBatch]:
+    """
+    (package name, class), e.g. from `CoberturaLoader.iter_report_classes`,
+    to batches of about `batch_size` rows
+    """
+    batch = LineBatch()
+    for package_name, klass in classes:
+        batch.add_klass(pool.code(package_name), klass, pool)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = LineBatch()
+    if len(batch):
+        yield batch
+
+
+def detect_format(path: str) -> str:
+    """by suffix, or arrow if pyarrow is installed, else npz"""
+    for suffix, each in SUFFIX_FORMATS.items():
+        if str(path).endswith(suffix):
+            return each
+    return FORMAT_ARROW if pyarrow is not None else FORMAT_NPZ
+
+
+# arrow
+
+
+def _arrow_numbers(column: array, arrow_type):
+    # zero copy, arrays share the buffer of `column`
+    return pyarrow.Array.from_buffers(
+        arrow_type, len(column), [None, pyarrow.py_buffer(column)]
+    )
+
+
+def arrow_schema():
+    return pyarrow.schema(
+        [(name, pyarrow.string()) for name in STRING_COLUMNS]
+        + [
+            ("line", pyarrow.int64()),
+            ("hits", pyarrow.int64()),
+            ("branch", pyarrow.bool_()),
+            ("covered", pyarrow.int32()),
+            ("total", pyarrow.int32()),
+        ]
+    )
+
+
+def _arrow_strings(column: array, pool: StringPool, nullable: bool = False):
+    """
+    decode codes with a dictionary of the codes used in this batch only,
+    so each batch costs its own rows, not the size of the whole pool
+    """
+    codes = _arrow_numbers(column, pyarrow.int32())
+    if nullable:
+        # lines out of methods are nulls
+        codes = pyarrow.compute.if_else(
+            pyarrow.compute.equal(codes, NO_METHOD),
+            pyarrow.scalar(None, pyarrow.int32()),
+            codes,
+        )
+    used = pyarrow.compute.drop_null(pyarrow.compute.unique(codes))
+    dictionary = pyarrow.array(
+        [pool.values[each] for each in used.to_pylist()], type=pyarrow.string()
+    )
+    indices = pyarrow.compute.index_in(codes, value_set=used)
+    return pyarrow.compute.take(dictionary, indices)
+
+
+def to_arrow(batch: LineBatch, pool: StringPool):
+    """`pyarrow.RecordBatch` of a batch"""
+    arrays = [
+        _arrow_strings(batch.columns[name], pool, name == "method")
+        for name in STRING_COLUMNS
+    ]
+    arrays.append(_arrow_numbers(batch.columns["line"], pyarrow.int64()))
+    arrays.append(_arrow_numbers(batch.columns["hits"], pyarrow.int64()))
+    arrays.append(
+        _arrow_numbers(batch.columns["branch"], pyarrow.int8()).cast(pyarrow.bool_())
+    )
+    arrays.append(_arrow_numbers(batch.columns["covered"], pyarrow.int32()))
+    arrays.append(_arrow_numbers(batch.columns["total"], pyarrow.int32()))
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=arrow_schema())
+
+
+def write_arrow(
+    classes: typing.Iterable[typing.Tuple[str, CoberturaKlassSlim]],
+    path: str,
+    format: str = FORMAT_ARROW,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Arrow IPC file or Parquet (one row group per batch), return count of rows"""
+    if pyarrow is None:
+        raise ImportError("pyarrow is required for arrow and parquet export")
+    schema = arrow_schema()
+    if format == FORMAT_PARQUET:
+        if parquet is None:
+            raise ImportError("pyarrow with parquet is required for parquet export")
+        writer = parquet.ParquetWriter(path, schema)
+    else:
+        writer = pyarrow.ipc.new_file(path, schema)
+    pool = StringPool()
+    rows = 0
+    with writer:
+        for batch in iter_batches(classes, pool, batch_size):
+            record_batch = to_arrow(batch, pool)
+            if format == FORMAT_PARQUET:
+                writer.write_table(pyarrow.Table.from_batches([record_batch]))
+            else:
+                writer.write_batch(record_batch)
+            rows += len(batch)
+    return rows
+
+
+# npz
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_ALIGN = 64
+_ORDER = "<" if sys.byteorder == "little" else ">"
+NPY_DESCR = {"q": _ORDER + "i8", "i": _ORDER + "i4", "b": "|i1"}
+NPY_TYPECODES = {value: key for key, value in NPY_DESCR.items()}
+
+
+def _npy_header(descr: str, size: int) -> bytes:
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({size},), }}"
+    # magic, header length and header are aligned, ended with a newline
+    padding = -(len(NPY_MAGIC) + 2 + len(header) + 1) % NPY_ALIGN
+    header = (header + " " * padding + "\n").encode("latin1")
+    return NPY_MAGIC + struct.pack("<H", len(header)) + header
+
+
+def _npy_strings(values: typing.List[str]) -> bytes:
+    # fixed width unicode, utf-32 code units as numpy stores them
+    width = max([len(each) for each in values] + [1])
+    data = b"".join(each.ljust(width, "\0").encode("utf-32-le") for each in values)
+    return _npy_header(f"<U{width}", len(values)) + data
+
+
+def write_npz(
+    classes: typing.Iterable[typing.Tuple[str, CoberturaKlassSlim]],
+    path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    compress: bool = True,
+) -> int:
+    """
+    one member for each column, codes of string columns refer to `strings`
+    (`method` is -1 if the line is not in any method), return count of rows
+    """
+    pool = StringPool()
+    table = LineBatch()
+    for batch in iter_batches(classes, pool, batch_size):
+        table.extend(batch)
+
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(path, "w", compression=compression) as f:
+        for name in COLUMNS:
+            column = table.columns[name]
+            header = _npy_header(NPY_DESCR[column.typecode], len(column))
+            with f.open(f"{name}.npy", "w", force_zip64=True) as member:
+                member.write(header)
+                member.write(column.tobytes())
+        f.writestr("strings.npy", _npy_strings(pool.values))
+    return len(table)
+
+
+def read_npz(
+    path: str,
+) -> typing.Tuple[typing.Dict[str, array], typing.List[str]]:
+    """(columns, strings) of `write_npz`, without numpy"""
+    columns = dict()
+    strings = []
+    with zipfile.ZipFile(path) as f:
+        for name in f.namelist():
+            data = f.read(name)
+            (size,) = struct.unpack_from("<H", data, len(NPY_MAGIC))
+            start = len(NPY_MAGIC) + 2
+            header = ast.literal_eval(data[start : start + size].decode("latin1"))
+            body = data[start + size :]
+            if name == "strings.npy":
+                width = int(header["descr"][2:])
+                text = body.decode("utf-32-le")
+                strings = [
+                    text[i : i + width].rstrip("\0") for i in range(0, len(text), width)
+                ]
+            else:
+                column = array(NPY_TYPECODES[header["descr"]])
+                column.frombytes(body)
+                columns[name[: -len(".npy")]] = column
+    return columns, strings
+
+
+def export_lines(
+    classes: typing.Iterable[typing.Tuple[str, CoberturaKlassSlim]],
+    path: str,
+    format: str = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """write with `format` (default: `detect_format`), return count of rows"""
+    format = format or detect_format(path)
+    if format == FORMAT_NPZ:
+        return write_npz(classes, path, batch_size)
+    if format in (FORMAT_ARROW, FORMAT_PARQUET):
+        return write_arrow(classes, path, format, batch_size)
+    raise ValueError(f"unknown format: {format}")
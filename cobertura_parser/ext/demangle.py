@@ -0,0 +1,427 @@
+"""
+demangle c++ names (Itanium ABI) in batches
+
+names will be sent to `c++filt` in one pass and cached for the whole process.
+without `c++filt`, a pure python demangler which covers the common subset of
+the ABI will be used. names which can not be handled are returned as is.
+"""
+
+import shutil
+import subprocess
+import typing
+from collections import OrderedDict
+
+CPPFILT = "c++filt"
+CACHE_SIZE = 65536
+
+BUILTIN_TYPES = {
+    "v": "void",
+    "w": "wchar_t",
+    "b": "bool",
+    "c": "char",
+    "a": "signed char",
+    "h": "unsigned char",
+    "s": "short",
+    "t": "unsigned short",
+    "i": "int",
+    "j": "unsigned int",
+    "l": "long",
+    "m": "unsigned long",
+    "x": "long long",
+    "y": "unsigned long long",
+    "n": "__int128",
+    "o": "unsigned __int128",
+    "f": "float",
+    "d": "double",
+    "e": "long double",
+    "g": "__float128",
+    "z": "...",
+}
+
+STD_SUBSTITUTIONS = {
+    "St": "std",
+    "Sa": "std::allocator",
+    "Sb": "std::basic_string",
+    # c++filt prints these in full
+    "Ss": "std::basic_string<char, std::char_traits<char>, std::allocator<char> >",
+    "Si": "std::basic_istream<char, std::char_traits<char> >",
+    "So": "std::basic_ostream<char, std::char_traits<char> >",
+    "Sd": "std::basic_iostream<char, std::char_traits<char> >",
+}
+# names of constructors and destructors of the classes above
+STD_CLASS_NAMES = {
+    "Sa": "allocator",
+    "Sb": "basic_string",
+    "Ss": "basic_string",
+    "Si": "basic_istream",
+    "So": "basic_ostream",
+    "Sd": "basic_iostream",
+}
+ANONYMOUS_NAMESPACE_PREFIX = "_GLOBAL__N"
+
+OPERATORS = {
+    "nw": "new",
+    "na": "new[]",
+    "dl": "delete",
+    "da": "delete[]",
+    "ng": "-",
+    "ad": "&",
+    "de": "*",
+    "co": "~",
+    "pl": "+",
+    "mi": "-",
+    "ml": "*",
+    "dv": "/",
+    "rm": "%",
+    "an": "&",
+    "or": "|",
+    "eo": "^",
+    "aS": "=",
+    "pL": "+=",
+    "mI": "-=",
+    "mL": "*=",
+    "dV": "/=",
+    "rM": "%=",
+    "aN": "&=",
+    "oR": "|=",
+    "eO": "^=",
+    "ls": "<<",
+    "rs": ">>",
+    "lS": "<<=",
+    "rS": ">>=",
+    "eq": "==",
+    "ne": "!=",
+    "lt": "<",
+    "gt": ">",
+    "le": "<=",
+    "ge": ">=",
+    "nt": "!",
+    "aa": "&&",
+    "oo": "||",
+    "pp": "++",
+    "mm": "--",
+    "cm": ",",
+    "pm": "->*",
+    "pt": "->",
+    "cl": "()",
+    "ix": "[]",
+}
+
+
+class DemangleError(Exception):
+    pass
+
+
+class _Parser(object):
+    """recursive descent parser of a subset of the Itanium C++ ABI mangling"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pos = 0
+        self.substitutions = []
+        self.template_params = []
+        self.depth = 0
+
+    def peek(self, size: int = 1) -> str:
+        return self.name[self.pos : self.pos + size]
+
+    def consume(self, expected: str) -> bool:
+        if self.name.startswith(expected, self.pos):
+            self.pos += len(expected)
+            return True
+        return False
+
+    def number(self) -> int:
+        start = self.pos
+        while self.peek().isdigit():
+            self.pos += 1
+        if start == self.pos:
+            raise DemangleError(self.name)
+        return int(self.name[start : self.pos])
+
+    def source_name(self) -> str:
+        length = self.number()
+        result = self.name[self.pos : self.pos + length]
+        if len(result) != length:
+            raise DemangleError(self.name)
+        self.pos += length
+        if result.startswith(ANONYMOUS_NAMESPACE_PREFIX):
+            return "(anonymous namespace)"
+        return result
+
+    def substitution(self) -> str:
+        for key, value in STD_SUBSTITUTIONS.items():
+            if key != "St" and self.consume(key):
+                return value
+        if not self.consume("S"):
+            raise DemangleError(self.name)
+        index = 0
+        if not self.consume("_"):
+            seq = ""
+            while self.peek() and self.peek() != "_":
+                seq += self.peek()
+                self.pos += 1
+            if not self.consume("_"):
+                raise DemangleError(self.name)
+            index = int(seq, 36) + 1
+        if index >= len(self.substitutions):
+            raise DemangleError(self.name)
+        return self.substitutions[index]
+
+    def template_args(self) -> str:
+        if not self.consume("I"):
+            raise DemangleError(self.name)
+        args = []
+        self.depth += 1
+        while not self.consume("E"):
+            if self.consume("L"):
+                args.append(self.literal())
+            else:
+                args.append(self.type())
+        self.depth -= 1
+        if not self.depth:
+            # referenced by T_, T0_ ... in the signature
+            self.template_params = args
+        joined = ", ".join(args)
+        if joined.endswith(">"):
+            joined += " "
+        return "<" + joined + ">"
+
+    def literal(self) -> str:
+        kind = self.peek()
+        if kind not in BUILTIN_TYPES:
+            raise DemangleError(self.name)
+        self.pos += 1
+        negative = self.consume("n")
+        value = self.number()
+        if not self.consume("E"):
+            raise DemangleError(self.name)
+        if kind == "b":
+            return "true" if value else "false"
+        text = ("-" if negative else "") + str(value)
+        if kind == "i":
+            return text
+        return "(" + BUILTIN_TYPES[kind] + ")" + text
+
+    def template_param(self) -> str:
+        index = 0
+        if not self.consume("_"):
+            index = self.number() + 1
+            if not self.consume("_"):
+                raise DemangleError(self.name)
+        if index >= len(self.template_params):
+            raise DemangleError(self.name)
+        return self.template_params[index]
+
+    def unqualified_name(
+        self, class_name: typing.Optional[str]
+    ) -> typing.Tuple[str, bool, bool]:
+        """
+        return (name, is constructor or destructor, is a source name)
+        `class_name` is the last source name of the scope, for constructors
+        and destructors. without it, they can not be named
+        """
+        # internal linkage
+        self.consume("L")
+        if self.peek().isdigit():
+            return self.source_name(), False, True
+        if self.peek() == "C" and self.peek(2)[1:] in ("1", "2", "3", "4", "5"):
+            if not class_name:
+                raise DemangleError(self.name)
+            self.pos += 2
+            return class_name, True, False
+        if self.peek() == "D" and self.peek(2)[1:] in ("0", "1", "2", "4", "5"):
+            if not class_name:
+                raise DemangleError(self.name)
+            self.pos += 2
+            return "~" + class_name, True, False
+        if self.peek(2) in OPERATORS:
+            op = OPERATORS[self.peek(2)]
+            self.pos += 2
+            if op[0].isalpha():
+                # operator new, operator delete[]
+                op = " " + op
+            return "operator" + op, False, False
+        raise DemangleError(self.name)
+
+    def nested_name(self) -> typing.Tuple[str, str, bool, bool]:
+        """return (name, cv suffix, ends with template args, is ctor/dtor)"""
+        cv = ""
+        if self.consume("r"):
+            cv += " restrict"
+        if self.consume("V"):
+            cv += " volatile"
+        if self.consume("K"):
+            cv += " const"
+        result = ""
+        # last source name, template args do not change it
+        class_name = None
+        template = special = False
+        while not self.consume("E"):
+            template = False
+            if self.peek() == "I":
+                if not result:
+                    raise DemangleError(self.name)
+                result += self.template_args()
+                template = True
+            elif self.consume("St"):
+                result = "std"
+                class_name = None
+                continue
+            elif self.peek() == "S":
+                # unknown for substitutions of earlier components
+                class_name = STD_CLASS_NAMES.get(self.peek(2))
+                result = self.substitution()
+                continue
+            else:
+                part, special, source = self.unqualified_name(class_name)
+                class_name = part if source else None
+                result = result + "::" + part if result else part
+            if self.peek() != "E":
+                self.substitutions.append(result)
+        return result, cv, template, special
+
+    def name_(self) -> typing.Tuple[str, str, bool, bool]:
+        if self.consume("N"):
+            return self.nested_name()
+        special = False
+        if self.consume("St"):
+            part, special, _ = self.unqualified_name(None)
+            result = "std::" + part
+        elif self.peek() == "S":
+            result = self.substitution()
+            if self.peek() != "I":
+                return result, "", False, False
+        else:
+            result, special, _ = self.unqualified_name(None)
+        if self.peek() == "I":
+            self.substitutions.append(result)
+            result += self.template_args()
+            return result, "", True, special
+        return result, "", False, special
+
+    def type(self) -> str:
+        kind = self.peek()
+        if kind in BUILTIN_TYPES:
+            self.pos += 1
+            return BUILTIN_TYPES[kind]
+        if kind in "PROK":
+            self.pos += 1
+            inner = self.type()
+            if kind == "K":
+                result = inner + " const"
+            elif kind in "RO" and inner.endswith("&"):
+                # reference collapsing: only && of && stays &&
+                rvalue = kind == "O" and inner.endswith("&&")
+                result = inner.rstrip("&") + ("&&" if rvalue else "&")
+            else:
+                result = inner + {"P": "*", "R": "&", "O": "&&"}[kind]
+            self.substitutions.append(result)
+            return result
+        if kind == "T":
+            self.pos += 1
+            result = self.template_param()
+            self.substitutions.append(result)
+            return result
+        if kind == "S" and self.peek(2) != "St":
+            result = self.substitution()
+            if self.peek() == "I":
+                result += self.template_args()
+                self.substitutions.append(result)
+            return result
+        if kind == "N" or kind.isdigit() or self.peek(2) == "St":
+            result = self.name_()[0]
+            if not self.substitutions or self.substitutions[-1] != result:
+                self.substitutions.append(result)
+            return result
+        raise DemangleError(self.name)
+
+    def parse(self) -> str:
+        if not self.consume("_Z"):
+            raise DemangleError(self.name)
+        name, cv, template, special = self.name_()
+        if self.pos == len(self.name):
+            return name
+        # template functions encode their return type first
+        prefix = ""
+        if template and not special:
+            prefix = self.type() + " "
+        params = []
+        while self.pos < len(self.name):
+            params.append(self.type())
+        if params == ["void"]:
+            params = []
+        return prefix + name + "(" + ", ".join(params) + ")" + cv
+
+
+def demangle_python(name: str) -> str:
+    """pure python fallback, return name as is if it can not be handled"""
+    try:
+        return _Parser(name).parse()
+    except (DemangleError, ValueError, IndexError):
+        return name
+
+
+class Demangler(object):
+    """
+    demangle names in batches, with a LRU cache shared by the whole process
+    c++filt will be used if available, or the pure python fallback
+    """
+
+    _cache: "OrderedDict[str, str]" = OrderedDict()
+
+    def __init__(self, use_cppfilt: bool = None):
+        if use_cppfilt is None:
+            use_cppfilt = shutil.which(CPPFILT) is not None
+        self.use_cppfilt = use_cppfilt
+
+    def _remember(self, name: str, result: str):
+        self._cache[name] = result
+        self._cache.move_to_end(name)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _run_cppfilt(self, names: typing.List[str]) -> typing.List[str]:
+        try:
+            output = subprocess.run(
+                [CPPFILT],
+                input="\n".join(names) + "\n",
+                stdout=subprocess.PIPE,
+                universal_newlines=True,
+                check=True,
+            ).stdout.splitlines()
+        except (OSError, subprocess.CalledProcessError):
+            # missing or broken c++filt
+            return [demangle_python(each) for each in names]
+        if len(output) != len(names):
+            # unexpected output, do not trust the order
+            return [demangle_python(each) for each in names]
+        return output
+
+    def demangle_all(self, names: typing.Iterable[str]) -> typing.Dict[str, str]:
+        """demangle unique and uncached names in one pass"""
+        result = dict()
+        missing = []
+        for name in names:
+            if name in result:
+                continue
+            if name in self._cache:
+                self._cache.move_to_end(name)
+                result[name] = self._cache[name]
+            else:
+                result[name] = name
+                missing.append(name)
+        if not missing:
+            return result
+
+        if self.use_cppfilt:
+            demangled = self._run_cppfilt(missing)
+        else:
+            demangled = [demangle_python(each) for each in missing]
+        for name, each in zip(missing, demangled):
+            self._remember(name, each)
+            result[name] = each
+        return result
+
+    def demangle(self, name: str) -> str:
+        return self.demangle_all((name,))[name]
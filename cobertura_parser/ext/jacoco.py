@@ -1,61 +1,108 @@
 # from: https://github.com/rix0rrr/cover2cover/blob/master/cover2cover.py
+from concurrent.futures import ProcessPoolExecutor
 from lxml import etree as ET
+import bisect
+import copy
 import re
 import os.path
-
-
-def find_lines(j_package, filename):
-    """Return all <line> elements for a given source file in a package."""
-    lines = list()
+import typing
+
+from cobertura_parser.filters import ReportFilter
+from cobertura_parser.utils import release
+from cobertura_parser.models.builtin import (
+    CoberturaCondition,
+    CoberturaLineSlim,
+    CoberturaMethodSlim,
+    CoberturaKlassSlim,
+    CoberturaPackageSlim,
+    CoberturaStructureSlim,
+)
+
+
+class LineRecord(typing.NamedTuple):
+    """parsed <line> of a jacoco <sourcefile>"""
+
+    nr: int
+    mi: int
+    ci: int
+    mb: int
+    cb: int
+
+
+def source_key(filename: str) -> str:
+    return os.path.basename(filename).split(".")[0]
+
+
+def index_lines(
+    j_package, keys: typing.Container[str] = None
+) -> typing.Dict[str, typing.List[LineRecord]]:
+    """
+    parse <line> elements of all source files in a package, only once
+    key is the file name without suffix, which is how classes find their lines
+    with `keys`, other source files will be skipped
+    """
+    index = dict()
     for sourcefile in j_package.iterfind("sourcefile"):
-        if (
-                sourcefile.attrib.get("name").split(".")[0]
-                == os.path.basename(filename).split(".")[0]
-        ):
-            lines = lines + sourcefile.findall("line")
-    return lines
-
-
-def line_is_after(jm, start_line):
-    return int(jm.attrib.get("line", 0)) > start_line
-
-
-def method_lines(jmethod, jmethods, jlines):
-    """Filter the lines from the given set of jlines that apply to the given jmethod."""
-    start_line = int(jmethod.attrib.get("line", 0))
-    larger = list(
-        int(jm.attrib.get("line", 0))
-        for jm in jmethods
-        if line_is_after(jm, start_line)
-    )
-    end_line = min(larger) if len(larger) else 99999999
-
-    for jline in jlines:
-        if start_line <= int(jline.attrib["nr"]) < end_line:
-            yield jline
-
-
-def convert_lines(j_lines, into):
-    """Convert the JaCoCo <line> elements into Cobertura <line> elements, add them under the given element."""
+        key = source_key(sourcefile.attrib.get("name"))
+        if keys is not None and key not in keys:
+            continue
+        records = index.setdefault(key, [])
+        records.extend(
+            LineRecord(
+                int(each.attrib["nr"]),
+                int(each.attrib.get("mi", 0)),
+                int(each.attrib["ci"]),
+                int(each.attrib["mb"]),
+                int(each.attrib["cb"]),
+            )
+            for each in sourcefile.iterfind("line")
+        )
+    return index
+
+
+class MethodLineIndex(object):
+    """
+    assign lines to methods by intervals:
+    a method owns lines from its start line to the next method's start line
+    sort once and bisect, instead of scanning all methods and lines for each method
+    """
+
+    def __init__(self, jmethods, jlines):
+        self.starts = sorted({int(jm.attrib.get("line", 0)) for jm in jmethods})
+        self.jlines = jlines
+        # (line number, origin index), so origin order can be restored
+        self.numbers = sorted((jline.nr, index) for index, jline in enumerate(jlines))
+        self.keys = [each[0] for each in self.numbers]
+
+    def lines_of(self, jmethod) -> list:
+        start_line = int(jmethod.attrib.get("line", 0))
+        pos = bisect.bisect_right(self.starts, start_line)
+        end_line = self.starts[pos] if pos < len(self.starts) else 99999999
+
+        lo = bisect.bisect_left(self.keys, start_line)
+        hi = bisect.bisect_left(self.keys, end_line)
+        indexes = sorted(index for _, index in self.numbers[lo:hi])
+        return [self.jlines[index] for index in indexes]
+
+
+def convert_lines(j_lines: typing.Iterable[LineRecord], into):
+    """Convert the JaCoCo line records into Cobertura <line> elements, add them under the given element."""
     c_lines = ET.SubElement(into, "lines")
     for jline in j_lines:
-        mb = int(jline.attrib["mb"])
-        cb = int(jline.attrib["cb"])
-        ci = int(jline.attrib["ci"])
+        mb = jline.mb
+        cb = jline.cb
+        ci = jline.ci
 
         cline = ET.SubElement(c_lines, "line")
-        cline.set("number", jline.attrib["nr"])
+        cline.set("number", str(jline.nr))
         cline.set(
             "hits", "1" if ci > 0 else "0"
         )  # Probably not true but no way to know from JaCoCo XML file
 
         if mb + cb > 0:
-            percentage = str(int(100 * (float(cb) / (float(cb) + float(mb))))) + "%"
+            percentage, condition_coverage = branch_coverage(mb, cb)
             cline.set("branch", "true")
-            cline.set(
-                "condition-coverage",
-                percentage + " (" + str(cb) + "/" + str(cb + mb) + ")",
-            )
+            cline.set("condition-coverage", condition_coverage)
 
             cond = ET.SubElement(ET.SubElement(cline, "conditions"), "condition")
             cond.set("number", "0")
@@ -65,6 +112,12 @@ def convert_lines(j_lines, into):
             cline.set("branch", "false")
 
 
+def branch_coverage(mb: int, cb: int) -> typing.Tuple[str, str]:
+    """return (percentage, condition-coverage), such as ('50%', '50% (1/2)')"""
+    percentage = str(int(100 * (float(cb) / (float(cb) + float(mb))))) + "%"
+    return percentage, percentage + " (" + str(cb) + "/" + str(cb + mb) + ")"
+
+
 def guess_filename(path_to_class, src_file_name):
     if src_file_name.endswith(".kt"):
         suffix = ".kt"
@@ -89,6 +142,10 @@ def sum(covered, missed):
 
 
 def counter(source, type, operation=fraction):
+    return str(counter_value(source, type, operation))
+
+
+def counter_value(source, type, operation=fraction) -> float:
     cs = source.iterfind("counter")
     c = next((ct for ct in cs if ct.attrib.get("type") == type), None)
 
@@ -96,9 +153,9 @@ def counter(source, type, operation=fraction):
         covered = float(c.attrib["covered"])
         missed = float(c.attrib["missed"])
 
-        return str(operation(covered, missed))
+        return operation(covered, missed)
     else:
-        return "0.0"
+        return 0.0
 
 
 def convert_method(j_method, j_lines):
@@ -112,108 +169,282 @@ def convert_method(j_method, j_lines):
     return c_method
 
 
-def convert_class(j_class, j_package):
-    c_class = ET.Element("class")
-    c_class.set("name", j_class.attrib["name"].replace("/", "."))
-
+def class_filename(j_class) -> str:
     # source file name can be None
     try:
         source_file_name = j_class.attrib["sourcefilename"]
     except KeyError:
         source_file_name = ""
+    return guess_filename(j_class.attrib["name"], source_file_name)
 
-    c_class.set(
-        "filename",
-        guess_filename(j_class.attrib["name"], source_file_name),
-    )
 
-    all_j_lines = list(find_lines(j_package, c_class.attrib["filename"]))
+def convert_class(j_class, j_package, lines_index: dict = None):
+    c_class = ET.Element("class")
+    c_class.set("name", j_class.attrib["name"].replace("/", "."))
+    c_class.set("filename", class_filename(j_class))
 
-    # more than 8000 may causes mem issues
-    if len(all_j_lines) > 8000:
-        return c_class
+    if lines_index is None:
+        lines_index = index_lines(j_package)
+    all_j_lines = lines_index.get(source_key(c_class.attrib["filename"]), [])
 
     c_methods = ET.SubElement(c_class, "methods")
     all_j_methods = list(j_class.iterfind("method"))
-    str_list = []
+    line_index = MethodLineIndex(all_j_methods, all_j_lines)
     for j_method in all_j_methods:
-        j_method_lines = method_lines(j_method, all_j_methods, all_j_lines)
-        each_node = convert_method(j_method, j_method_lines)
-        str_list.append(ET.tostring(each_node, encoding="unicode"))
-
-    for each in str_list:
-        c_methods.append(ET.fromstring(each))
+        j_method_lines = line_index.lines_of(j_method)
+        c_methods.append(convert_method(j_method, j_method_lines))
 
     add_counters(j_class, c_class)
     convert_lines(all_j_lines, c_class)
     return c_class
 
 
-def convert_package(j_package):
+def accepted_classes(
+    j_package, report_filter: ReportFilter = None
+) -> typing.Tuple[list, typing.Optional[typing.Set[str]]]:
+    """
+    classes kept by `report_filter`, and keys of their source files
+    (None means all source files are needed)
+    """
+    j_classes = list(j_package.iterfind("class"))
+    if report_filter is None:
+        return j_classes, None
+    package_name = j_package.attrib["name"].replace("/", ".")
+    if not report_filter.accepts_package(package_name):
+        return [], set()
+    j_classes = [
+        each
+        for each in j_classes
+        if report_filter.accepts(package_name, class_filename(each))
+    ]
+    return j_classes, {source_key(class_filename(each)) for each in j_classes}
+
+
+def convert_package(j_package, report_filter: ReportFilter = None):
+    """None if all classes are rejected by `report_filter`"""
+    j_classes, keys = accepted_classes(j_package, report_filter)
+    if report_filter is not None and not j_classes:
+        return None
+
     c_package = ET.Element("package")
     c_package.attrib["name"] = j_package.attrib["name"].replace("/", ".")
 
     c_classes = ET.SubElement(c_package, "classes")
-    str_list = []
-    for j_class in j_package.iterfind("class"):
-        each_node = convert_class(j_class, j_package)
-        str_list.append(ET.tostring(each_node, encoding="unicode"))
-
-    for each in str_list:
-        c_classes.append(ET.fromstring(each))
+    lines_index = index_lines(j_package, keys)
+    for j_class in j_classes:
+        c_classes.append(convert_class(j_class, j_package, lines_index))
 
     add_counters(j_package, c_package)
 
     return c_package
 
 
-def convert_root(source, target):
+def convert_package_str(
+    j_package_str: bytes, report_filter: ReportFilter = None
+) -> typing.Optional[str]:
+    """works in sub process, so input and output are both serialized"""
+    c_package = convert_package(ET.fromstring(j_package_str), report_filter)
+    if c_package is None:
+        return None
+    return ET.tostring(c_package, encoding="unicode")
+
+
+def convert_timestamp(source, target):
     try:
         ts = int(source.find("sessioninfo").attrib["start"]) / 1000
     except AttributeError:
         ts = -1
     target.set("timestamp", str(ts))
 
-    packages = ET.SubElement(target, "packages")
-    str_list = []
-    for package in source.iterfind("package"):
-        each_node = convert_package(package)
-        str_list.append(ET.tostring(each_node, encoding="unicode"))
 
-    for each in str_list:
-        packages.append(ET.fromstring(each))
+def convert_root(
+    source, target, workers: int = None, report_filter: ReportFilter = None
+):
+    convert_timestamp(source, target)
+
+    packages = ET.SubElement(target, "packages")
+    if workers and workers > 1:
+        # packages are independent, map keeps the origin order
+        chunks = [ET.tostring(each) for each in source.iterfind("package")]
+        # a few batches per worker: less IPC than one package per task,
+        # still balanced when package sizes differ
+        chunksize = max(1, len(chunks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for each in pool.map(
+                convert_package_str,
+                chunks,
+                [report_filter] * len(chunks),
+                chunksize=chunksize,
+            ):
+                if each is not None:
+                    packages.append(ET.fromstring(each))
+    else:
+        for package in source.iterfind("package"):
+            c_package = convert_package(package, report_filter)
+            if c_package is not None:
+                packages.append(c_package)
 
     add_counters(source, target)
 
 
-def jacoco2cobertura(jacoco_string) -> str:
+def read_report_header(jacoco_path):
+    """
+    first pass of streaming mode
+    root attrs of cobertura come from the last elements of jacoco report,
+    so keep <sessioninfo> and root level <counter> only, and drop packages
+    """
+    header = ET.Element("report")
+    for _, element in ET.iterparse(
+        jacoco_path, tag=("sessioninfo", "counter", "package")
+    ):
+        if element.tag == "package":
+            release(element)
+        elif element.getparent().getparent() is None:
+            header.append(copy.copy(element))
+    return header
+
+
+def jacoco2cobertura(
+    jacoco_string, workers: int = None, report_filter: ReportFilter = None
+) -> str:
+    """
+    :param jacoco_string: path (or file object) of jacoco xml
+    :param workers: convert packages in a process pool with N workers
+    :param report_filter: rejected classes and packages will not be converted
+    """
     root = ET.parse(jacoco_string).getroot()
     into = ET.Element("coverage")
-    convert_root(root, into)
+    convert_root(root, into, workers, report_filter)
     output = f'<?xml version="1.0" ?>{ET.tostring(into, encoding="unicode")}'
     return output
 
 
-# mem leak in lxml
-# https://stackoverflow.com/a/49139904/10641498
-# https://www.reddit.com/r/Python/comments/j0gl8t/psa_pythonlxml_memory_leaks_and_a_solution/
-def destroy_tree(tree):
-    root = tree
-    node_tracker = {root: [0, None]}
+def jacoco2cobertura_file(
+    jacoco_path, output: typing.BinaryIO, report_filter: ReportFilter = None
+):
+    """
+    streaming mode: write cobertura xml to a binary file object incrementally
+    only one package (of input and output) will be kept in memory
+    input will be read twice, so it should be a path
+    """
+    header = read_report_header(jacoco_path)
+    into = ET.Element("coverage")
+    convert_timestamp(header, into)
+    add_counters(header, into)
+
+    with ET.xmlfile(output, encoding="utf-8") as xf:
+        xf.write_declaration()
+        with xf.element("coverage", into.attrib):
+            with xf.element("packages"):
+                for _, j_package in ET.iterparse(jacoco_path, tag="package"):
+                    c_package = convert_package(j_package, report_filter)
+                    if c_package is not None:
+                        xf.write(c_package)
+                    release(j_package)
+
+
+def build_line(jline: LineRecord) -> CoberturaLineSlim:
+    if jline.mb + jline.cb > 0:
+        percentage, condition_coverage = branch_coverage(jline.mb, jline.cb)
+        condition = CoberturaCondition.construct(
+            number=0, type="jump", coverage=percentage
+        )
+        return CoberturaLineSlim.construct(
+            number=jline.nr,
+            hits=1 if jline.ci > 0 else 0,
+            branch="true",
+            condition_coverage=condition_coverage,
+            conditions={"condition": condition},
+        )
+    return CoberturaLineSlim.construct(
+        number=jline.nr,
+        hits=1 if jline.ci > 0 else 0,
+        branch="false",
+        condition_coverage=None,
+        conditions=None,
+    )
+
+
+def _counters(source) -> dict:
+    return dict(
+        line_rate=counter_value(source, "LINE"),
+        branch_rate=counter_value(source, "BRANCH"),
+        complexity=counter_value(source, "COMPLEXITY", sum),
+    )
 
-    for node in root.iterdescendants():
-        parent = node.getparent()
-        node_tracker[node] = [node_tracker[parent][0] + 1, parent]
 
-    node_tracker = sorted(
-        [(depth, parent, child) for child, (depth, parent) in node_tracker.items()],
-        key=lambda x: x[0],
-        reverse=True,
+def build_class(j_class, lines_index: dict) -> CoberturaKlassSlim:
+    filename = class_filename(j_class)
+    all_j_lines = lines_index.get(source_key(filename), [])
+    all_j_methods = list(j_class.iterfind("method"))
+    line_index = MethodLineIndex(all_j_methods, all_j_lines)
+    methods = [
+        CoberturaMethodSlim.construct(
+            name=j_method.attrib["name"],
+            signature=j_method.attrib["desc"],
+            lines=[build_line(each) for each in line_index.lines_of(j_method)],
+            **_counters(j_method),
+        )
+        for j_method in all_j_methods
+    ]
+    return CoberturaKlassSlim.construct(
+        name=j_class.attrib["name"].replace("/", "."),
+        filename=filename,
+        methods=methods,
+        lines=[build_line(each) for each in all_j_lines],
+        **_counters(j_class),
     )
 
-    for _, parent, child in node_tracker:
-        if parent is None:
-            break
-        parent.remove(child)
 
-    del tree
+def build_package(
+    j_package, report_filter: ReportFilter = None
+) -> CoberturaPackageSlim:
+    j_classes, keys = accepted_classes(j_package, report_filter)
+    lines_index = index_lines(j_package, keys)
+    return CoberturaPackageSlim.construct(
+        name=j_package.attrib["name"].replace("/", "."),
+        classes=[build_class(each, lines_index) for each in j_classes],
+        **_counters(j_package),
+    )
+
+
+def iter_slim_packages(
+    jacoco_path, report_filter: ReportFilter = None, header=None
+) -> typing.Iterator[CoberturaPackageSlim]:
+    """
+    yield slim packages one by one, with incremental parsing
+    root level <sessioninfo> and <counter> will be copied into `header`
+    """
+    for _, element in ET.iterparse(
+        jacoco_path, tag=("sessioninfo", "counter", "package")
+    ):
+        if element.tag == "package":
+            package = build_package(element, report_filter)
+            release(element)
+            if report_filter is None or package.classes:
+                yield package
+        elif header is not None and element.getparent().getparent() is None:
+            header.append(copy.copy(element))
+
+
+def jacoco2slim(
+    jacoco_path, report_filter: ReportFilter = None
+) -> CoberturaStructureSlim:
+    """
+    build slim models from jacoco counters directly, without cobertura xml
+    same result as loading the output of `jacoco2cobertura`
+    packages are parsed incrementally and released after building
+    with `report_filter`, only accepted classes will be built,
+    and packages without them will be dropped
+    """
+    header = ET.Element("report")
+    packages = list(iter_slim_packages(jacoco_path, report_filter, header))
+
+    root = ET.Element("coverage")
+    convert_timestamp(header, root)
+    return CoberturaStructureSlim.construct(
+        sources=None,
+        packages=packages,
+        timestamp=float(root.attrib["timestamp"]),
+        **_counters(header),
+    )
@@ -2,37 +2,148 @@
 comes from:
 https://github.com/eriwen/lcov-to-cobertura-xml/blob/master/lcov_cobertura/lcov_cobertura.py
 """
+import io
+import locale
+import mmap
 import re
 import sys
 import os
 import time
-import subprocess
-from xml.dom import minidom
+import typing
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
 from optparse import OptionParser
 
-from distutils.spawn import find_executable
-
-CPPFILT = "c++filt"
-HAVE_CPPFILT = False
-
-if find_executable(CPPFILT) is not None:
-    HAVE_CPPFILT = True
+from cobertura_parser.ext.demangle import Demangler
+from cobertura_parser.models.builtin import (
+    CoberturaLineSlim,
+    CoberturaMethodSlim,
+    CoberturaKlassSlim,
+    CoberturaPackageSlim,
+    CoberturaStructureSlim,
+)
 
 VERSION = "1.6"
 __all__ = ["LcovCobertura"]
 
 
-class Demangler(object):
-    def __init__(self):
-        self.pipe = subprocess.Popen(
-            CPPFILT, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+def _escape(data):
+    """Same escaping as minidom."""
+    return (
+        data.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace('"', "&quot;")
+        .replace(">", "&gt;")
+    )
+
+
+class XmlWriter(object):
+    """
+    Minimal incremental XML writer, nothing is kept after being written.
+    With `pretty`, layout is the same as minidom's toprettyxml.
+    """
+
+    def __init__(self, output, pretty=True):
+        self.output = output
+        self.pretty = pretty
+        self.depth = 0
+
+    def _indent(self):
+        return "\t" * self.depth if self.pretty else ""
+
+    def _newline(self):
+        return "\n" if self.pretty else ""
+
+    def _tag(self, name, attrs):
+        return "<" + name + "".join(
+            ' %s="%s"' % (attr, _escape(val)) for attr, val in attrs.items()
         )
 
-    def demangle(self, name):
-        newname = name + "\n"
-        self.pipe.stdin.write(newname.encode("utf-8"))
-        res = self.pipe.stdout.readline()
-        return str(res.rstrip())
+    def declaration(self, root, system_id):
+        self.output.write('<?xml version="1.0" ?>' + self._newline())
+        if self.pretty:
+            self.output.write("<!DOCTYPE %s\n  SYSTEM '%s'>\n" % (root, system_id))
+        else:
+            self.output.write("<!DOCTYPE %s SYSTEM '%s'>" % (root, system_id))
+
+    def start(self, name, attrs, empty=False):
+        """Open an element, or write it as a whole if `empty`."""
+        self.output.write(self._indent() + self._tag(name, attrs))
+        if empty:
+            self.output.write("/>" + self._newline())
+            return
+        self.output.write(">" + self._newline())
+        self.depth += 1
+
+    def end(self, name, empty=False):
+        """Close an element. Nothing to do if it was written as `empty`."""
+        if empty:
+            return
+        self.depth -= 1
+        self.output.write(self._indent() + "</%s>" % name + self._newline())
+
+    def text_element(self, name, attrs, text):
+        self.output.write(
+            self._indent()
+            + self._tag(name, attrs)
+            + ">"
+            + _escape(text)
+            + "</%s>" % name
+            + self._newline()
+        )
+
+
+class DictWriter(object):
+    """
+    Same interface as XmlWriter, but builds the dict xmltodict would return
+    for the written XML: attributes are prefixed with `@`, repeated children
+    become a list, and elements without attributes or children become None.
+    """
+
+    def __init__(self):
+        self.result = {}
+        self.stack = [self.result]
+
+    def _add(self, name, value):
+        parent = self.stack[-1]
+        if name not in parent:
+            parent[name] = value
+        elif isinstance(parent[name], list):
+            parent[name].append(value)
+        else:
+            parent[name] = [parent[name], value]
+
+    def declaration(self, root, system_id):
+        pass
+
+    def start(self, name, attrs, empty=False):
+        node = {"@" + attr: val for attr, val in attrs.items()}
+        if empty:
+            self._add(name, node or None)
+            return
+        self.stack.append(node)
+
+    def end(self, name, empty=False):
+        if empty:
+            return
+        node = self.stack.pop()
+        self._add(name, node or None)
+
+    def text_element(self, name, attrs, text):
+        if attrs:
+            node = {"@" + attr: val for attr, val in attrs.items()}
+            node["#text"] = text
+            self._add(name, node)
+        else:
+            self._add(name, text)
+
+
+class LcovClass(typing.NamedTuple):
+    """attributes of a class, its methods and its lines, see `_iter_classes`"""
+
+    attrs: typing.Dict[str, str]
+    methods: typing.List[typing.Tuple[typing.Dict[str, str], typing.Dict[str, str]]]
+    lines: typing.List[typing.Dict[str, str]]
 
 
 class LcovCobertura(object):
@@ -48,19 +159,31 @@ class LcovCobertura(object):
     >>> print(cobertura_xml)
     """
 
-    def __init__(self, lcov_data, base_dir=".", excludes=None, demangle=False):
+    def __init__(
+        self,
+        lcov_data,
+        base_dir=".",
+        excludes=None,
+        demangle=False,
+        workers=None,
+        report_filter=None,
+    ):
         """
         Create a new :class:`LcovCobertura` object using the given `lcov_data`
         and `options`.
 
-        :param lcov_data: Path to LCOV data file
-        :type lcov_data: string
+        :param lcov_data: LCOV content, path of LCOV data file, or a text stream
+        :type lcov_data: string, pathlib.Path or file object
         :param base_dir: Path upon which to base all sources
         :type base_dir: string
         :param excludes: list of regexes to packages as excluded
         :type excludes: [string]
         :param demangle: whether to demangle function names using c++filt
         :type demangle: bool
+        :param workers: parse LCOV data file with processes, if more than 1
+        :type workers: int
+        :param report_filter: records of rejected files are skipped while parsing
+        :type report_filter: cobertura_parser.filters.ReportFilter
         """
 
         if not excludes:
@@ -68,25 +191,92 @@ class LcovCobertura(object):
         self.lcov_data = lcov_data
         self.base_dir = base_dir
         self.excludes = excludes
+        self.workers = workers
+        self.report_filter = report_filter
+        self.demangler = None
+        # demangled names of the last `parse`, not limited by the LRU cache
+        self.demangled = dict()
         if demangle:
-            demangler = Demangler()
-            self.format = demangler.demangle
+            self.demangler = Demangler()
+            self.format = self._demangle
         else:
             self.format = lambda x: x
 
-    def convert(self):
+    def _demangle(self, name):
+        if name in self.demangled:
+            return self.demangled[name]
+        return self.demangler.demangle(name)
+
+    def convert(self, output=None, pretty=True):
         """
         Convert lcov file to cobertura XML using options from this instance.
+        XML will be written to `output` if given, see `generate_cobertura_xml`.
         """
         coverage_data = self.parse()
-        return self.generate_cobertura_xml(coverage_data)
+        return self.generate_cobertura_xml(coverage_data, output, pretty)
 
     def parse(self):
         """
         Generate a data structure representing it that can be serialized in any
         logical format.
         """
+        if (
+            self.workers
+            and self.workers > 1
+            and isinstance(self.lcov_data, pathlib.PurePath)
+        ):
+            chunks = split_records(self.lcov_data, self.workers)
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                coverage_data = merge_records(
+                    pool.map(
+                        parse_chunk,
+                        [self.lcov_data] * len(chunks),
+                        chunks,
+                        [self.base_dir] * len(chunks),
+                        [self.report_filter] * len(chunks),
+                    )
+                )
+        else:
+            coverage_data = self._parse_lines(self._iter_lines())
+        coverage_data["timestamp"] = str(int(time.time()))
+
+        # Exclude packages
+        excluded = [
+            x
+            for x in coverage_data["packages"]
+            for e in self.excludes
+            if re.match(e, x)
+        ]
+        for package in excluded:
+            del coverage_data["packages"][package]
 
+        # Compute line coverage rates
+        for package_data in list(coverage_data["packages"].values()):
+            package_data["line-rate"] = self._percent(
+                package_data["lines-total"], package_data["lines-covered"]
+            )
+            package_data["branch-rate"] = self._percent(
+                package_data["branches-total"], package_data["branches-covered"]
+            )
+
+        if self.demangler:
+            # all names in one batch, kept for `self.format`
+            self.demangled = self.demangler.demangle_all(
+                method_name
+                for package_data in coverage_data["packages"].values()
+                for class_data in package_data["classes"].values()
+                for method_name in class_data["methods"]
+            )
+
+        return coverage_data
+
+    def _parse_lines(self, lines):
+        """
+        Run the state machine over LCOV lines, without excluding and rates.
+
+        :param lines: LCOV lines without line breaks
+        :type lines: iterable of string
+        """
         coverage_data = {
             "packages": {},
             "summary": {
@@ -95,7 +285,6 @@ class LcovCobertura(object):
                 "branches-total": 0,
                 "branches-covered": 0,
             },
-            "timestamp": str(int(time.time())),
         }
         package = None
         current_file = None
@@ -105,8 +294,11 @@ class LcovCobertura(object):
         file_methods = {}
         file_branches_total = 0
         file_branches_covered = 0
+        skipping = False
 
-        for line in self.lcov_data.split("\n"):
+        for line in lines:
+            if skipping and not line.startswith("SF:"):
+                continue
             if line.strip() == "end_of_record":
                 if current_file is not None:
                     package_dict = coverage_data["packages"][package]
@@ -136,6 +328,11 @@ class LcovCobertura(object):
                 file_name = line_parts[-1].strip()
                 relative_file_name = os.path.relpath(file_name, self.base_dir)
                 package = ".".join(relative_file_name.split(os.path.sep)[0:-1])
+                skipping = self.report_filter is not None and not (
+                    self.report_filter.accepts(package, relative_file_name)
+                )
+                if skipping:
+                    continue
                 class_name = ".".join(relative_file_name.split(os.path.sep))
                 if package not in coverage_data["packages"]:
                     coverage_data["packages"][package] = {
@@ -213,187 +410,265 @@ class LcovCobertura(object):
                     file_methods[function_name] = ["0", "0"]
                 file_methods[function_name][-1] = function_hits
 
-        # Exclude packages
-        excluded = [
-            x
-            for x in coverage_data["packages"]
-            for e in self.excludes
-            if re.match(e, x)
-        ]
-        for package in excluded:
-            del coverage_data["packages"][package]
+        return coverage_data
 
-        # Compute line coverage rates
-        for package_data in list(coverage_data["packages"].values()):
-            package_data["line-rate"] = self._percent(
-                package_data["lines-total"], package_data["lines-covered"]
-            )
-            package_data["branch-rate"] = self._percent(
-                package_data["branches-total"], package_data["branches-covered"]
-            )
+    def _iter_lines(self):
+        """
+        Iterate over input lazily, so huge files will never be held in memory.
+        str is treated as LCOV content, pathlib.Path as file path,
+        and others as text stream.
+        """
+        if isinstance(self.lcov_data, pathlib.PurePath):
+            with open(self.lcov_data) as f:
+                for line in f:
+                    yield line.rstrip("\n")
+            return
+        if isinstance(self.lcov_data, str):
+            source = io.StringIO(self.lcov_data)
+        else:
+            source = self.lcov_data
+        for line in source:
+            yield line.rstrip("\n")
 
-        return coverage_data
+    def generate_cobertura_xml(self, coverage_data, output=None, pretty=True):
+        """
+        Given parsed coverage data, write cobertura XML incrementally to `output`.
+        If `output` is None, return a String cobertura XML representation.
 
-    def generate_cobertura_xml(self, coverage_data):
+        :param coverage_data: Nested dict representing coverage information.
+        :type coverage_data: dict
+        :param output: text file-like object to write to
+        :type output: file object
+        :param pretty: indent elements, same layout as minidom's toprettyxml
+        :type pretty: bool
         """
-        Given parsed coverage data, return a String cobertura XML representation.
+        if output is None:
+            buffer = io.StringIO()
+            self.generate_cobertura_xml(coverage_data, buffer, pretty)
+            return buffer.getvalue()
+
+        self._write_cobertura(coverage_data, XmlWriter(output, pretty))
+
+    def generate_dict(self, coverage_data):
+        """
+        Given parsed coverage data, return the same dict as parsing its
+        cobertura XML with xmltodict, without generating XML.
 
         :param coverage_data: Nested dict representing coverage information.
         :type coverage_data: dict
         """
+        writer = DictWriter()
+        self._write_cobertura(coverage_data, writer)
+        return writer.result
+
+    def generate_slim(self, coverage_data):
+        """
+        Given parsed coverage data, return slim models directly,
+        same as loading its cobertura XML and calling `slim()`.
 
-        dom_impl = minidom.getDOMImplementation()
-        doctype = dom_impl.createDocumentType(
-            "coverage", None, "http://cobertura.sourceforge.net/xml/coverage-04.dtd"
+        :param coverage_data: Nested dict representing coverage information.
+        :type coverage_data: dict
+        """
+        packages = []
+        for package_attrs, classes in self._iter_packages(coverage_data):
+            packages.append(
+                CoberturaPackageSlim.construct(
+                    name=package_attrs["name"],
+                    line_rate=float(package_attrs["line-rate"]),
+                    branch_rate=float(package_attrs["branch-rate"]),
+                    complexity=float(package_attrs["complexity"]),
+                    classes=[
+                        self._slim_class(each) for each in self._iter_classes(classes)
+                    ],
+                )
+            )
+        attrs = self._coverage_attrs(coverage_data)
+        return CoberturaStructureSlim.construct(
+            sources={"source": self.base_dir},
+            packages=packages,
+            line_rate=float(attrs["line-rate"]),
+            branch_rate=float(attrs["branch-rate"]),
+            line_covered=int(attrs["lines-covered"]),
+            line_valid=int(attrs["lines-valid"]),
+            branches_covered=int(attrs["branches-covered"]),
+            branches_valid=int(attrs["branches-valid"]),
+            complexity=float(attrs["complexity"]),
+            version=float(attrs["version"]),
+            timestamp=float(attrs["timestamp"]),
         )
-        document = dom_impl.createDocument(None, "coverage", doctype)
-        root = document.documentElement
-        summary = coverage_data["summary"]
-        self._attrs(
-            root,
-            {
-                "branch-rate": self._percent(
-                    summary["branches-total"], summary["branches-covered"]
-                ),
-                "branches-covered": str(summary["branches-covered"]),
-                "branches-valid": str(summary["branches-total"]),
-                "complexity": "0",
-                "line-rate": self._percent(
-                    summary["lines-total"], summary["lines-covered"]
-                ),
-                "lines-covered": str(summary["lines-covered"]),
-                "lines-valid": str(summary["lines-total"]),
-                "timestamp": coverage_data["timestamp"],
-                "version": "1.0",
-            },
+
+    @staticmethod
+    def _slim_line(attrs):
+        return CoberturaLineSlim.construct(
+            number=int(attrs["number"]),
+            hits=int(attrs["hits"]),
+            branch=attrs["branch"],
+            condition_coverage=attrs.get("condition-coverage"),
+            conditions=None,
         )
 
-        sources = self._el(document, "sources", {})
-        source = self._el(document, "source", {})
-        source.appendChild(document.createTextNode(self.base_dir))
-        sources.appendChild(source)
+    def _slim_class(self, lcov_class):
+        attrs = lcov_class.attrs
+        return CoberturaKlassSlim.construct(
+            name=attrs["name"],
+            filename=attrs["filename"],
+            line_rate=float(attrs["line-rate"]),
+            branch_rate=float(attrs["branch-rate"]),
+            complexity=float(attrs["complexity"]),
+            methods=[
+                CoberturaMethodSlim.construct(
+                    name=method_attrs["name"],
+                    signature=method_attrs["signature"],
+                    line_rate=float(method_attrs["line-rate"]),
+                    branch_rate=float(method_attrs["branch-rate"]),
+                    complexity=None,
+                    lines=[self._slim_line(line_attrs)],
+                )
+                for method_attrs, line_attrs in lcov_class.methods
+            ],
+            lines=[self._slim_line(each) for each in lcov_class.lines],
+        )
 
-        root.appendChild(sources)
+    def _coverage_attrs(self, coverage_data):
+        """
+        Attributes of the root element, shared by all outputs.
 
-        packages_el = self._el(document, "packages", {})
+        :param coverage_data: Nested dict representing coverage information.
+        :type coverage_data: dict
+        """
+        summary = coverage_data["summary"]
+        return {
+            "branch-rate": self._percent(
+                summary["branches-total"], summary["branches-covered"]
+            ),
+            "branches-covered": str(summary["branches-covered"]),
+            "branches-valid": str(summary["branches-total"]),
+            "complexity": "0",
+            "line-rate": self._percent(
+                summary["lines-total"], summary["lines-covered"]
+            ),
+            "lines-covered": str(summary["lines-covered"]),
+            "lines-valid": str(summary["lines-total"]),
+            "timestamp": coverage_data["timestamp"],
+            "version": "1.0",
+        }
 
-        packages = coverage_data["packages"]
-        for package_name, package_data in list(packages.items()):
-            package_el = self._el(
-                document,
-                "package",
-                {
-                    "line-rate": package_data["line-rate"],
-                    "branch-rate": package_data["branch-rate"],
-                    "name": package_name,
-                    "complexity": "0",
-                },
-            )
-            classes_el = self._el(document, "classes", {})
-            for class_name, class_data in list(package_data["classes"].items()):
-                class_el = self._el(
-                    document,
-                    "class",
-                    {
-                        "branch-rate": self._percent(
-                            class_data["branches-total"], class_data["branches-covered"]
-                        ),
-                        "complexity": "0",
-                        "filename": class_name,
-                        "line-rate": self._percent(
-                            class_data["lines-total"], class_data["lines-covered"]
-                        ),
-                        "name": class_data["name"],
-                    },
-                )
+    def _iter_packages(self, coverage_data):
+        """
+        Yield (package attributes, classes data) of each package.
 
-                # Process methods
-                methods_el = self._el(document, "methods", {})
-                for method_name, (line, hits) in list(class_data["methods"].items()):
-                    method_el = self._el(
-                        document,
-                        "method",
+        :param coverage_data: Nested dict representing coverage information.
+        :type coverage_data: dict
+        """
+        for package_name, package_data in list(coverage_data["packages"].items()):
+            attrs = {
+                "line-rate": package_data["line-rate"],
+                "branch-rate": package_data["branch-rate"],
+                "name": package_name,
+                "complexity": "0",
+            }
+            yield attrs, package_data["classes"]
+
+    def _iter_classes(self, classes):
+        """
+        Yield `LcovClass` of each class: its attributes, (method attributes,
+        line attributes) of its methods, and attributes of its sorted lines.
+        Both cobertura XML and slim models are built from these.
+
+        :param classes: classes data of a package
+        :type classes: dict
+        """
+        for class_name, class_data in list(classes.items()):
+            attrs = {
+                "branch-rate": self._percent(
+                    class_data["branches-total"], class_data["branches-covered"]
+                ),
+                "complexity": "0",
+                "filename": class_name,
+                "line-rate": self._percent(
+                    class_data["lines-total"], class_data["lines-covered"]
+                ),
+                "name": class_data["name"],
+            }
+            methods = []
+            for method_name, (line, hits) in list(class_data["methods"].items()):
+                rate = "1.0" if int(hits) > 0 else "0.0"
+                methods.append(
+                    (
                         {
                             "name": self.format(method_name),
                             "signature": "",
-                            "line-rate": "1.0" if int(hits) > 0 else "0.0",
-                            "branch-rate": "1.0" if int(hits) > 0 else "0.0",
+                            "line-rate": rate,
+                            "branch-rate": rate,
                         },
+                        {"hits": hits, "number": line, "branch": "false"},
                     )
-                    method_lines_el = self._el(document, "lines", {})
-                    method_line_el = self._el(
-                        document,
-                        "line",
-                        {
-                            "hits": hits,
-                            "number": line,
-                            "branch": "false",
-                        },
+                )
+            lines = []
+            for line_number in sorted(class_data["lines"].keys()):
+                line_data = class_data["lines"][line_number]
+                line_attrs = {
+                    "branch": line_data["branch"],
+                    "hits": str(line_data["hits"]),
+                    "number": str(line_number),
+                }
+                if line_data["branch"] == "true":
+                    total = int(line_data["branches-total"])
+                    covered = int(line_data["branches-covered"])
+                    percentage = int((covered * 100.0) / total)
+                    line_attrs["condition-coverage"] = "{0}% ({1}/{2})".format(
+                        percentage, covered, total
                     )
-                    method_lines_el.appendChild(method_line_el)
-                    method_el.appendChild(method_lines_el)
-                    methods_el.appendChild(method_el)
+                lines.append(line_attrs)
+            yield LcovClass(attrs, methods, lines)
 
-                # Process lines
-                lines_el = self._el(document, "lines", {})
-                lines = list(class_data["lines"].keys())
-                lines.sort()
-                for line_number in lines:
-                    line_el = self._el(
-                        document,
-                        "line",
-                        {
-                            "branch": class_data["lines"][line_number]["branch"],
-                            "hits": str(class_data["lines"][line_number]["hits"]),
-                            "number": str(line_number),
-                        },
-                    )
-                    if class_data["lines"][line_number]["branch"] == "true":
-                        total = int(class_data["lines"][line_number]["branches-total"])
-                        covered = int(
-                            class_data["lines"][line_number]["branches-covered"]
-                        )
-                        percentage = int((covered * 100.0) / total)
-                        line_el.setAttribute(
-                            "condition-coverage",
-                            "{0}% ({1}/{2})".format(percentage, covered, total),
-                        )
-                    lines_el.appendChild(line_el)
-
-                class_el.appendChild(methods_el)
-                class_el.appendChild(lines_el)
-                classes_el.appendChild(class_el)
-            package_el.appendChild(classes_el)
-            packages_el.appendChild(package_el)
-        root.appendChild(packages_el)
-
-        return document.toprettyxml()
-
-    def _el(self, document, name, attrs):
-        """
-        Create an element within document with given name and attributes.
-
-        :param document: Document element
-        :type document: Document
-        :param name: Element name
-        :type name: string
-        :param attrs: Attributes for element
-        :type attrs: dict
+    def _write_cobertura(self, coverage_data, writer):
         """
-        return self._attrs(document.createElement(name), attrs)
+        Walk parsed coverage data and send cobertura elements to `writer`.
 
-    def _attrs(self, element, attrs):
+        :param coverage_data: Nested dict representing coverage information.
+        :type coverage_data: dict
+        :param writer: XmlWriter or DictWriter
         """
-        Set attributes on given element.
+        writer.declaration(
+            "coverage", "http://cobertura.sourceforge.net/xml/coverage-04.dtd"
+        )
+        writer.start("coverage", self._coverage_attrs(coverage_data))
 
-        :param element: DOM Element
-        :type element: Element
-        :param attrs: Attributes for element
-        :type attrs: dict
-        """
-        for attr, val in list(attrs.items()):
-            element.setAttribute(attr, val)
-        return element
+        writer.start("sources", {})
+        writer.text_element("source", {}, self.base_dir)
+        writer.end("sources")
+
+        packages = coverage_data["packages"]
+        writer.start("packages", {}, empty=not packages)
+        for package_attrs, classes in self._iter_packages(coverage_data):
+            writer.start("package", package_attrs)
+            writer.start("classes", {}, empty=not classes)
+            for lcov_class in self._iter_classes(classes):
+                writer.start("class", lcov_class.attrs)
+
+                # Process methods
+                methods = lcov_class.methods
+                writer.start("methods", {}, empty=not methods)
+                for method_attrs, line_attrs in methods:
+                    writer.start("method", method_attrs)
+                    writer.start("lines", {})
+                    writer.start("line", line_attrs, empty=True)
+                    writer.end("lines")
+                    writer.end("method")
+                writer.end("methods", empty=not methods)
+
+                # Process lines
+                lines = lcov_class.lines
+                writer.start("lines", {}, empty=not lines)
+                for line_attrs in lines:
+                    writer.start("line", line_attrs, empty=True)
+                writer.end("lines", empty=not lines)
+                writer.end("class")
+            writer.end("classes", empty=not classes)
+            writer.end("package")
+        writer.end("packages", empty=not packages)
+        writer.end("coverage")
 
     def _percent(self, lines_total, lines_covered):
         """
@@ -410,7 +685,122 @@ class LcovCobertura(object):
         return str(float(float(lines_covered) / float(lines_total)))
 
 
-def lcov2cobertura(data: str) -> str:
-    converter = LcovCobertura(data)
+def _record_start(data, pos):
+    """
+    Offset of the first line after `pos` which follows `end_of_record`,
+    with only `TN:` or blank lines between it and the next `SF:`.
+    -1 if not found.
+    """
+    while True:
+        pos = data.find(b"\nSF:", pos)
+        if pos < 0:
+            return -1
+        start = pos + 1
+        end = pos
+        # walk back over test names and blank lines
+        while end > 0:
+            prev = data.rfind(b"\n", 0, end) + 1
+            line = data[prev:end].strip()
+            if line == b"end_of_record":
+                return start
+            if line and not line.startswith(b"TN:"):
+                break
+            start = prev
+            end = prev - 1
+        pos += 1
+
+
+def split_records(path, parts):
+    """
+    Split LCOV data file into at most `parts` byte ranges.
+    Every range except the first one starts right after `end_of_record`
+    and reaches `SF:` with only `TN:` or blank lines, so the state machine
+    starts from scratch there, exactly as the serial parser does.
+
+    :param path: LCOV data file
+    :type path: pathlib.Path
+    :param parts: expected number of ranges
+    :type parts: int
+    :return: [(start, end)]
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return [(0, 0)]
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            bounds = [0]
+            for i in range(1, parts):
+                pos = _record_start(data, max(size * i // parts, bounds[-1]))
+                if pos < 0:
+                    break
+                if pos > bounds[-1]:
+                    bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def parse_chunk(path, chunk, base_dir=".", report_filter=None):
+    """
+    Parse one byte range of LCOV data file, see `split_records`.
+    Worker of the parallel mode, data will be read by mmap.
+    """
+    start, end = chunk
+    with open(path, "rb") as f:
+        if start == end:
+            content = b""
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                content = data[start:end]
+    # decode and translate newlines as `open` does in the serial mode
+    text = io.StringIO(
+        content.decode(locale.getpreferredencoding(False)), newline=None
+    )
+    lines = (line.rstrip("\n") for line in text)
+    converter = LcovCobertura(None, base_dir, report_filter=report_filter)
+    return converter._parse_lines(lines)
+
+
+def merge_records(results):
+    """
+    Reduce results of `parse_chunk` in file order, into the same dict as
+    parsing the whole file serially.
+    """
+    coverage_data = None
+    for each in results:
+        if coverage_data is None:
+            coverage_data = each
+            continue
+        for key, value in each["summary"].items():
+            coverage_data["summary"][key] += value
+        packages = coverage_data["packages"]
+        for name, package_data in each["packages"].items():
+            if name not in packages:
+                packages[name] = package_data
+                continue
+            target = packages[name]
+            for key in (
+                "lines-total",
+                "lines-covered",
+                "branches-total",
+                "branches-covered",
+            ):
+                target[key] += package_data[key]
+            # same file again replaces the old one, as the serial parser does
+            target["classes"].update(package_data["classes"])
+    return coverage_data
+
+
+def lcov2cobertura(data, workers=None, report_filter=None) -> str:
+    converter = LcovCobertura(data, workers=workers, report_filter=report_filter)
     cobertura_xml = converter.convert()
     return cobertura_xml
+
+
+def lcov2dict(data, workers=None, report_filter=None) -> dict:
+    converter = LcovCobertura(data, workers=workers, report_filter=report_filter)
+    return converter.generate_dict(converter.parse())
+
+
+def lcov2slim(data, workers=None, report_filter=None) -> CoberturaStructureSlim:
+    converter = LcovCobertura(data, workers=workers, report_filter=report_filter)
+    return converter.generate_slim(converter.parse())
@@ -0,0 +1,126 @@
+"""
+include/exclude packages and classes while parsing
+
+skipped packages and classes will never be converted into dicts or models
+"""
+
+import fnmatch
+import re
+import typing
+
+from lxml import etree
+
+TYPE_PATTERNS = typing.Optional[typing.Union[str, typing.Iterable[str]]]
+
+
+def _compile(patterns: TYPE_PATTERNS) -> typing.Optional[typing.Pattern]:
+    """globs (a list, or a comma separated str) in one regex"""
+    if not patterns:
+        return None
+    if isinstance(patterns, str):
+        patterns = patterns.split(",")
+    patterns = [each.strip() for each in patterns if each.strip()]
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(each) for each in patterns))
+
+
+class ReportFilter(object):
+    """
+    globs are matched against package names (`com.example.*`)
+    and file names of classes (`src/module/*`)
+
+    a class will be kept if its package or file name matches any include
+    (or there is no include), and neither of them matches any exclude.
+    `filename_filter` is an extra check of file names, e.g. files of a patch
+    """
+
+    def __init__(
+        self,
+        include: TYPE_PATTERNS = None,
+        exclude: TYPE_PATTERNS = None,
+        filename_filter: typing.Callable[[str], bool] = None,
+    ):
+        self.include = _compile(include)
+        self.exclude = _compile(exclude)
+        self.filename_filter = filename_filter
+
+    @classmethod
+    def create(
+        cls, include: TYPE_PATTERNS = None, exclude: TYPE_PATTERNS = None
+    ) -> typing.Optional["ReportFilter"]:
+        """None if nothing will be filtered, so the fast paths can be used"""
+        report_filter = cls(include, exclude)
+        if report_filter.include is None and report_filter.exclude is None:
+            return None
+        return report_filter
+
+    def accepts_package(self, name: str) -> bool:
+        """False if none of its classes can be kept"""
+        return self.exclude is None or not self.exclude.match(name or "")
+
+    def accepts(self, package_name: str, filename: str) -> bool:
+        package_name = package_name or ""
+        filename = filename or ""
+        if self.exclude is not None and (
+            self.exclude.match(package_name) or self.exclude.match(filename)
+        ):
+            return False
+        if self.include is not None and not (
+            self.include.match(package_name) or self.include.match(filename)
+        ):
+            return False
+        if self.filename_filter is not None:
+            return self.filename_filter(filename)
+        return True
+
+
+def parse_filtered(f: typing.BinaryIO, report_filter: ReportFilter):
+    """
+    parse cobertura xml incrementally, and drop rejected elements at once
+    packages without any kept class will be dropped too
+    """
+    package_name = None
+    context = etree.iterparse(f, events=("start", "end"), tag=("package", "class"))
+    for event, element in context:
+        if element.tag == "package":
+            if event == "start":
+                package_name = element.get("name")
+            elif not report_filter.accepts_package(package_name) or not len(
+                element.findall("classes/class")
+            ):
+                element.clear()
+                element.getparent().remove(element)
+        elif event == "end" and not report_filter.accepts(
+            package_name, element.get("filename")
+        ):
+            element.clear()
+            element.getparent().remove(element)
+    return context.root
+
+
+def element_to_dict(element) -> typing.Optional[typing.Union[dict, str]]:
+    """
+    same shape as `xmltodict.parse`: attributes as `@name`, repeated children
+    in lists, and text as `#text` (or the value itself if there is nothing else)
+    """
+    result = {f"@{k}": v for k, v in element.attrib.items()}
+    text = [element.text or ""]
+    for child in element:
+        text.append(child.tail or "")
+        if not isinstance(child.tag, str):
+            # comments and processing instructions
+            continue
+        value = element_to_dict(child)
+        if child.tag not in result:
+            result[child.tag] = value
+        elif isinstance(result[child.tag], list):
+            result[child.tag].append(value)
+        else:
+            result[child.tag] = [result[child.tag], value]
+    text = "".join(text).strip()
+    if not result:
+        return text or None
+    if text:
+        result["#text"] = text
+    return result
@@ -1,11 +1,40 @@
-import gzip
 import io
 import typing
 import pathlib
 import xmltodict
+from lxml import etree
 
-from cobertura_parser.models.builtin import CoberturaStructure
-from cobertura_parser.ext.jacoco import jacoco2cobertura
+from cobertura_parser.models.builtin import (
+    CoberturaStructure,
+    CoberturaStructureSlim,
+    CoberturaKlassSlim,
+    CoberturaPackageSlim,
+)
+from cobertura_parser.models.fast import FastStructure
+from cobertura_parser.builder import (
+    build_coverage,
+    build_klass,
+    build_package,
+)
+from cobertura_parser.utils import (
+    TYPE_XML_SOURCE,
+    decompress_if_needed,
+    looks_like_xml,
+    open_xml,
+    release,
+)
+from cobertura_parser.cache import ReportCache
+from cobertura_parser.filters import ReportFilter, element_to_dict, parse_filtered
+from cobertura_parser.ext.jacoco import (
+    iter_slim_packages,
+    jacoco2cobertura,
+    jacoco2slim,
+)
+from cobertura_parser.ext.lcov import lcov2dict, lcov2slim
+
+REPORT_COBERTURA = "cobertura"
+REPORT_JACOCO = "jacoco"
+REPORT_LCOV = "lcov"
 
 
 class CoberturaLoader(object):
@@ -18,22 +47,258 @@ class CoberturaLoader(object):
     def from_file(
         cls, file_path: typing.Union[str, pathlib.Path], *args, **kwargs
     ) -> typing.Union[CoberturaStructure, dict]:
-        with open(file_path, encoding="utf-8") as f:
-            return cls.from_str(f.read(), *args, **kwargs)
+        with open_xml(file_path) as f:
+            return cls.from_source(f, *args, **kwargs)
 
     @classmethod
     def from_str(
-        cls, xml_content: str, to_dict: bool = None
+        cls, xml_content: TYPE_XML_SOURCE, *args, **kwargs
     ) -> typing.Union[CoberturaStructure, dict]:
-        d = xmltodict.parse(
-            gzip.GzipFile(fileobj=io.BytesIO(gzip.compress(xml_content.encode())))
-        )
+        return cls.from_source(xml_content, *args, **kwargs)
+
+    @classmethod
+    def _filtered_root(cls, source: TYPE_XML_SOURCE, report_filter: ReportFilter):
+        source = decompress_if_needed(source)
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+        if not hasattr(source, "read"):
+            source = io.BytesIO(source)
+        return parse_filtered(source, report_filter)
+
+    @classmethod
+    def from_source(
+        cls,
+        source: TYPE_XML_SOURCE,
+        to_dict: bool = None,
+        report_filter: ReportFilter = None,
+    ) -> typing.Union[CoberturaStructure, dict]:
+        """
+        source can be str, bytes, memoryview or an opened binary file
+        gzip content will be detected and decompressed as a stream
+        with `report_filter`, rejected elements are dropped while parsing,
+        and the dict is built from the pruned tree directly
+        """
+        if report_filter is not None:
+            root = cls._filtered_root(source, report_filter)
+            d = {root.tag: element_to_dict(root)}
+        else:
+            d = xmltodict.parse(decompress_if_needed(source))
         if to_dict:
             return d
         return CoberturaStructure(**d)
 
     @classmethod
-    def from_jacoco_file(
+    def slim_from_file(
         cls, file_path: typing.Union[str, pathlib.Path], *args, **kwargs
-    ):
-        return cls.from_str(jacoco2cobertura(file_path), *args, **kwargs)
+    ) -> CoberturaStructureSlim:
+        with open_xml(file_path) as f:
+            return cls.slim_from_source(f, *args, **kwargs)
+
+    @classmethod
+    def slim_from_source(
+        cls,
+        source: TYPE_XML_SOURCE,
+        columnar: bool = None,
+        report_filter: ReportFilter = None,
+        fast: bool = None,
+    ) -> typing.Union[CoberturaStructureSlim, FastStructure]:
+        """
+        fast path: build slim models from lxml tree directly, without validation
+        same result as `from_source(source).slim()`
+        with `columnar`, lines will be stored in `LineTable` instead of objects
+        with `fast`, models will be `__slots__` classes of `models.fast`,
+        `to_pydantic()` of the result validates it
+        """
+        if report_filter is not None:
+            return build_coverage(
+                cls._filtered_root(source, report_filter), columnar, fast
+            )
+        source = decompress_if_needed(source)
+        if isinstance(source, str):
+            # lxml refuses str with encoding declaration
+            source = source.encode("utf-8")
+        if hasattr(source, "read"):
+            root = etree.parse(source).getroot()
+        else:
+            root = etree.fromstring(source)
+        return build_coverage(root, columnar, fast)
+
+    @classmethod
+    def detect_report(cls, file_path: typing.Union[str, pathlib.Path]) -> str:
+        """cobertura, jacoco or lcov, by the root element of xml"""
+        with open_xml(file_path) as f:
+            if not looks_like_xml(f):
+                return REPORT_LCOV
+            _, root = next(etree.iterparse(f, events=("start",)))
+            if root.tag == "report":
+                return REPORT_JACOCO
+            return REPORT_COBERTURA
+
+    @classmethod
+    def slim_from_report(
+        cls,
+        file_path: typing.Union[str, pathlib.Path],
+        columnar: bool = None,
+        report_filter: ReportFilter = None,
+        cache: ReportCache = None,
+    ) -> CoberturaStructureSlim:
+        """
+        load cobertura, jacoco or lcov report, see `detect_report`
+        jacoco and lcov will be converted directly, without cobertura xml
+        with `cache`, parsed result will be reused until the report changes
+        (filtered results are never cached)
+        """
+        if cache is not None and report_filter is None:
+            return cache.load(
+                file_path, lambda: cls.slim_from_report(file_path, columnar), columnar
+            )
+        kind = cls.detect_report(file_path)
+        if kind == REPORT_JACOCO:
+            return jacoco2slim(file_path, report_filter)
+        if kind == REPORT_LCOV:
+            return lcov2slim(pathlib.Path(file_path), report_filter=report_filter)
+        return cls.slim_from_file(file_path, columnar, report_filter)
+
+    @classmethod
+    def iter_report_classes(
+        cls,
+        file_path: typing.Union[str, pathlib.Path],
+        columnar: bool = None,
+        report_filter: ReportFilter = None,
+        workers: int = None,
+    ) -> typing.Iterator[typing.Tuple[str, CoberturaKlassSlim]]:
+        """
+        yield (package name, class) of any report, see `detect_report`
+        cobertura and jacoco xml will be parsed incrementally, in this process
+        lcov records are not grouped by package, so the whole report will be
+        loaded (by processes if `workers` > 1) before the first class is yielded
+        """
+        kind = cls.detect_report(file_path)
+        if kind != REPORT_LCOV and workers is not None:
+            raise TypeError("workers can only be used with lcov reports")
+        if kind == REPORT_COBERTURA:
+            yield from cls.iter_classes(file_path, columnar, report_filter)
+            return
+        if kind == REPORT_JACOCO:
+            packages = iter_slim_packages(file_path, report_filter)
+        else:
+            packages = lcov2slim(
+                pathlib.Path(file_path), workers, report_filter
+            ).packages
+        for package in packages:
+            for klass in package.classes:
+                yield package.name, klass
+
+    @classmethod
+    def from_jacoco_file(
+        cls,
+        file_path: typing.Union[str, pathlib.Path],
+        *args,
+        workers: int = None,
+        direct: bool = None,
+        report_filter: ReportFilter = None,
+        **kwargs,
+    ) -> typing.Union[CoberturaStructure, CoberturaStructureSlim, dict]:
+        """
+        with `direct`, slim models will be built from jacoco counters directly,
+        without the intermediate cobertura xml. it runs in one process and
+        returns slim models only, so `workers` and arguments of `from_str`
+        (e.g. `to_dict`) can not be used with it
+        """
+        if direct:
+            if args or kwargs or workers is not None:
+                raise TypeError(
+                    "direct does not accept workers or arguments of from_str"
+                )
+            return jacoco2slim(file_path, report_filter)
+        return cls.from_str(
+            jacoco2cobertura(file_path, workers, report_filter), *args, **kwargs
+        )
+
+    @classmethod
+    def from_lcov_file(
+        cls,
+        file_path: typing.Union[str, pathlib.Path],
+        to_dict: bool = None,
+        workers: int = None,
+        report_filter: ReportFilter = None,
+    ) -> typing.Union[CoberturaStructureSlim, dict]:
+        """
+        convert lcov data to slim models (or the dict xmltodict would return)
+        directly, without the intermediate cobertura xml
+        records will be parsed by processes if `workers` > 1
+        """
+        if to_dict:
+            return lcov2dict(pathlib.Path(file_path), workers, report_filter)
+        return lcov2slim(pathlib.Path(file_path), workers, report_filter)
+
+    @classmethod
+    def iter_packages(
+        cls,
+        source: typing.Union[str, pathlib.Path, typing.BinaryIO],
+        columnar: bool = None,
+        report_filter: ReportFilter = None,
+    ) -> typing.Iterator[CoberturaPackageSlim]:
+        """
+        yield packages one by one with incremental parsing
+        finished elements will be released, so memory depends on the largest package
+        """
+        if report_filter is not None:
+            for _, element in cls._iter_filtered(source, report_filter):
+                if element.tag == "package":
+                    if len(element.findall("classes/class")):
+                        yield build_package(element, columnar)
+                    release(element)
+            return
+        with open_xml(source) as f:
+            for _, element in etree.iterparse(f, tag="package"):
+                yield build_package(element, columnar)
+                release(element)
+
+    @classmethod
+    def iter_classes(
+        cls,
+        source: typing.Union[str, pathlib.Path, typing.BinaryIO],
+        columnar: bool = None,
+        report_filter: ReportFilter = None,
+    ) -> typing.Iterator[typing.Tuple[str, CoberturaKlassSlim]]:
+        """
+        yield (package name, class) one by one with incremental parsing
+        finished elements will be released, so memory depends on the largest class
+        with `report_filter`, rejected classes will be released without building
+        """
+        if report_filter is None:
+            report_filter = ReportFilter()
+        for package_name, element in cls._iter_filtered(source, report_filter):
+            if element.tag == "class":
+                yield package_name, build_klass(element, columnar)
+            release(element)
+
+    @classmethod
+    def _iter_filtered(
+        cls,
+        source: typing.Union[str, pathlib.Path, typing.BinaryIO],
+        report_filter: ReportFilter,
+    ) -> typing.Iterator[typing.Tuple[str, etree.ElementBase]]:
+        """
+        yield (package name, element) of finished packages and accepted classes
+        rejected classes are released here, others should be released by callers
+        """
+        package_name = None
+        with open_xml(source) as f:
+            for event, element in etree.iterparse(
+                f, events=("start", "end"), tag=("package", "class")
+            ):
+                if element.tag == "package":
+                    if event == "start":
+                        package_name = element.get("name")
+                    elif report_filter.accepts_package(package_name):
+                        yield package_name, element
+                    else:
+                        release(element)
+                elif event == "end":
+                    if report_filter.accepts(package_name, element.get("filename")):
+                        yield package_name, element
+                    else:
+                        element.clear()
+                        element.getparent().remove(element)
@@ -0,0 +1,277 @@
+"""
+merge reports of the same code base, e.g. from sharded test runs
+
+reports are folded into the result one by one. lines are kept in sorted
+columns (`LineTable`), so every report is merged by one linear walk over
+sorted columns. if reports are given lazily, only one input report and the
+output will be kept in memory.
+"""
+
+import heapq
+import itertools
+import operator
+import typing
+from array import array
+from operator import itemgetter
+
+from cobertura_parser.models.builtin import (
+    CoberturaCondition,
+    CoberturaLineSlim,
+    CoberturaMethodSlim,
+    CoberturaKlassSlim,
+    CoberturaPackageSlim,
+    CoberturaStructure,
+    CoberturaStructureSlim,
+)
+from cobertura_parser.models.columnar import (
+    LineTable,
+    coverage_rate,
+    format_condition_coverage,
+    parse_condition_coverage,
+)
+from cobertura_parser.models.fast import FastStructure
+from cobertura_parser.utils import unused_dict_to_list
+
+TYPE_REPORT = typing.Union[CoberturaStructure, CoberturaStructureSlim, FastStructure]
+
+# number, hits, branch, covered conditions, total conditions
+TYPE_ROW = typing.Tuple[int, int, int, int, int]
+
+
+def _rows(table: LineTable) -> typing.Iterator[TYPE_ROW]:
+    return zip(table.numbers, table.hits, table.branches, table.covered, table.total)
+
+
+def _coverage_percent(condition: CoberturaCondition) -> int:
+    try:
+        return int(condition.coverage.rstrip("%"))
+    except (AttributeError, ValueError):
+        return 0
+
+
+class MergedLines(object):
+    """
+    lines of one class (or method) from all reports
+    hits are summed, and conditions are unioned by their numbers
+    """
+
+    def __init__(self):
+        self.table = LineTable()
+        # line number -> condition number -> condition, only for lines having them
+        self.conditions: typing.Dict[int, typing.Dict[int, CoberturaCondition]] = {}
+
+    def _table(self, lines) -> typing.Tuple[LineTable, bool]:
+        """incoming lines in columns, and whether they are strictly sorted"""
+        if isinstance(lines, LineTable):
+            table = lines
+        else:
+            table = LineTable()
+            for each in lines:
+                covered, total = parse_condition_coverage(each.condition_coverage)
+                table.append(
+                    each.number, each.hits, each.is_in_branch(), covered, total
+                )
+                if each.conditions:
+                    self._add_conditions(each.number, each.conditions["condition"])
+        numbers = table.numbers
+        return table, all(a < b for a, b in zip(numbers, numbers[1:]))
+
+    def _add_conditions(self, number: int, conditions):
+        merged = self.conditions.setdefault(number, {})
+        for each in unused_dict_to_list({"condition": conditions}):
+            current = merged.get(each.number)
+            if current is None or _coverage_percent(each) > _coverage_percent(current):
+                merged[each.number] = each
+
+    def add(self, lines):
+        if not lines:
+            return
+        old = self.table
+        new, ordered = self._table(lines)
+        if not ordered:
+            # unsorted or duplicated lines, sort and coalesce them
+            self.table = self._merge_rows(old, new)
+        elif not len(old):
+            # tables are never modified in place, so it can be shared
+            self.table = new
+        elif new.numbers == old.numbers:
+            # same lines in every report mostly, merge column by column
+            table = LineTable()
+            table.numbers = old.numbers
+            table.hits = array("q", map(operator.add, old.hits, new.hits))
+            table.branches = array("b", map(max, old.branches, new.branches))
+            table.covered = array("i", map(max, old.covered, new.covered))
+            table.total = array("i", map(max, old.total, new.total))
+            self.table = table
+        else:
+            self.table = self._merge_rows(old, new)
+
+    def _merge_rows(self, old: LineTable, new: LineTable) -> LineTable:
+        rows = heapq.merge(
+            _rows(old),
+            # stable, so duplicated lines keep their order
+            sorted(_rows(new), key=itemgetter(0)),
+            key=itemgetter(0),
+        )
+        table = LineTable()
+        for number, group in itertools.groupby(rows, key=itemgetter(0)):
+            _, hits, branches, covered, total = zip(*group)
+            table.append(number, sum(hits), any(branches), max(covered), max(total))
+        return table
+
+    def line_rate(self) -> float:
+        return coverage_rate(self.table.hit_count(), len(self.table))
+
+    def branch_rate(self) -> float:
+        return coverage_rate(sum(self.table.covered), sum(self.table.total))
+
+    def lines(self, columnar: bool = None) -> typing.Union[list, LineTable]:
+        if columnar:
+            return self.table
+        result = []
+        for number, hits, branch, covered, total in _rows(self.table):
+            conditions = None
+            if number in self.conditions:
+                merged = [v for _, v in sorted(self.conditions[number].items())]
+                conditions = {"condition": merged[0] if len(merged) == 1 else merged}
+            result.append(
+                CoberturaLineSlim.construct(
+                    number=number,
+                    hits=hits,
+                    branch="true" if branch else "false",
+                    condition_coverage=format_condition_coverage(covered, total),
+                    conditions=conditions,
+                )
+            )
+        return result
+
+
+class ReportMerger(object):
+    """
+    fold reports into one
+    packages are matched by name, classes by name and filename,
+    and methods by name and signature. rates and totals are recomputed.
+    """
+
+    def __init__(self):
+        self.sources: typing.List[str] = []
+        self.packages: typing.Dict[str, dict] = {}
+        # attrs of the first report, which can not be recomputed
+        self.complexity = None
+        self.version = None
+        self.timestamp = -1.0
+
+    def add(self, report: TYPE_REPORT):
+        if isinstance(report, CoberturaStructure):
+            report = report.slim()
+        if self.version is None:
+            self.complexity = report.complexity
+            self.version = report.version
+        self.timestamp = max(self.timestamp, report.timestamp)
+        if report.sources:
+            for each in unused_dict_to_list(report.sources):
+                if each not in self.sources:
+                    self.sources.append(each)
+
+        for package in report.packages or []:
+            merged_package = self.packages.setdefault(
+                package.name, {"complexity": package.complexity, "classes": {}}
+            )
+            for klass in package.classes or []:
+                merged_klass = merged_package["classes"].setdefault(
+                    (klass.name, klass.filename),
+                    {
+                        "complexity": klass.complexity,
+                        "lines": MergedLines(),
+                        "methods": {},
+                    },
+                )
+                merged_klass["lines"].add(klass.lines)
+                for method in klass.methods or []:
+                    merged_method = merged_klass["methods"].setdefault(
+                        (method.name, method.signature),
+                        {"complexity": method.complexity, "lines": MergedLines()},
+                    )
+                    merged_method["lines"].add(method.lines)
+
+    def result(self, columnar: bool = None) -> CoberturaStructureSlim:
+        lines_total = lines_covered = branches_total = branches_covered = 0
+        packages = []
+        for package_name, merged_package in self.packages.items():
+            package_lines = package_covered = 0
+            package_branches = package_branches_covered = 0
+            classes = []
+            for (name, filename), merged_klass in merged_package["classes"].items():
+                lines: MergedLines = merged_klass["lines"]
+                methods = [
+                    CoberturaMethodSlim.construct(
+                        name=method_name,
+                        signature=signature,
+                        line_rate=each["lines"].line_rate(),
+                        branch_rate=each["lines"].branch_rate(),
+                        complexity=each["complexity"],
+                        lines=each["lines"].lines(columnar),
+                    )
+                    for (method_name, signature), each in merged_klass[
+                        "methods"
+                    ].items()
+                ]
+                classes.append(
+                    CoberturaKlassSlim.construct(
+                        name=name,
+                        filename=filename,
+                        line_rate=lines.line_rate(),
+                        branch_rate=lines.branch_rate(),
+                        complexity=merged_klass["complexity"],
+                        methods=methods,
+                        lines=lines.lines(columnar),
+                    )
+                )
+                package_lines += len(lines.table)
+                package_covered += lines.table.hit_count()
+                package_branches += sum(lines.table.total)
+                package_branches_covered += sum(lines.table.covered)
+
+            packages.append(
+                CoberturaPackageSlim.construct(
+                    name=package_name,
+                    line_rate=coverage_rate(package_covered, package_lines),
+                    branch_rate=coverage_rate(
+                        package_branches_covered, package_branches
+                    ),
+                    complexity=merged_package["complexity"],
+                    classes=classes,
+                )
+            )
+            lines_total += package_lines
+            lines_covered += package_covered
+            branches_total += package_branches
+            branches_covered += package_branches_covered
+
+        sources = None
+        if self.sources:
+            sources = {
+                "source": self.sources[0] if len(self.sources) == 1 else self.sources
+            }
+        return CoberturaStructureSlim.construct(
+            sources=sources,
+            packages=packages,
+            line_rate=coverage_rate(lines_covered, lines_total),
+            branch_rate=coverage_rate(branches_covered, branches_total),
+            line_covered=lines_covered,
+            line_valid=lines_total,
+            branches_covered=branches_covered,
+            branches_valid=branches_total,
+            complexity=self.complexity,
+            version=-1.0 if self.version is None else self.version,
+            timestamp=self.timestamp,
+        )
+
+
+def merge_reports(
+    reports: typing.Iterable[TYPE_REPORT], columnar: bool = None
+) -> CoberturaStructureSlim:
+    merger = ReportMerger()
+    for each in reports:
+        merger.add(each)
+    return merger.result(columnar)
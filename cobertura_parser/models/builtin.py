@@ -2,9 +2,29 @@
 these models have same structure as origin cobertura dtd
 see http://cobertura.sourceforge.net/xml/coverage-04.dtd
 """
+
 from pydantic import BaseModel
 import typing
 from cobertura_parser.utils import unused_dict_to_list
+from cobertura_parser.models.columnar import LineTable
+from cobertura_parser.models.fast import FastModel
+
+
+def copy_to(
+    target: typing.Type[BaseModel], source: typing.Union[BaseModel, FastModel], **update
+) -> BaseModel:
+    """
+    shallow copy without validation, values are shared with source
+    only fields of target will be kept
+    """
+    if isinstance(source, FastModel):
+        values = {k: getattr(source, k) for k in source.__slots__}
+    else:
+        values = source.__dict__
+    values = {k: v for k, v in values.items() if k in target.__fields__}
+    values.update(update)
+    return target.construct(**values)
+
 
 TYPE_ORIGIN_CONDITIONS = typing.Dict[
     str, typing.Union["CoberturaCondition", typing.List["CoberturaCondition"]]
@@ -170,16 +190,31 @@ class CoberturaCoverage(BaseModel):
         return unused_dict_to_list(self.packages)
 
     def slim(self) -> "CoberturaStructureSlim":
-        data = CoberturaCoverage(**self.dict())
-        for each_pkg in data.get_package_list():
-            for each_kls in each_pkg.get_class_list():
-                for each_method in each_kls.get_method_list():
-                    each_method.lines = each_method.get_line_list()
-                each_kls.methods = each_kls.get_method_list()
-                each_kls.lines = each_kls.get_line_list()
-            each_pkg.classes = each_pkg.get_class_list()
-        data.packages = data.get_package_list()
-        return CoberturaStructureSlim(**data.dict())
+        # new containers only, line objects are shared with origin data
+        packages = [
+            copy_to(
+                CoberturaPackageSlim,
+                each_pkg,
+                classes=[
+                    copy_to(
+                        CoberturaKlassSlim,
+                        each_kls,
+                        methods=[
+                            copy_to(
+                                CoberturaMethodSlim,
+                                each_method,
+                                lines=each_method.get_line_list(),
+                            )
+                            for each_method in each_kls.get_method_list()
+                        ],
+                        lines=each_kls.get_line_list(),
+                    )
+                    for each_kls in each_pkg.get_class_list()
+                ],
+            )
+            for each_pkg in self.get_package_list()
+        ]
+        return copy_to(CoberturaStructureSlim, self, packages=packages)
 
 
 class CoberturaLineSlim(CoberturaLine):
@@ -187,18 +222,21 @@ class CoberturaLineSlim(CoberturaLine):
 
 
 class CoberturaMethodSlim(CoberturaMethod):
-    lines: typing.List[CoberturaLine] = None
+    # lines can also be stored in columns, see `LineTable`
+    lines: typing.Union[typing.List[CoberturaLine], LineTable] = None
 
     def get_line_list(self) -> typing.List[CoberturaLine]:
         raise NotImplementedError
 
     def is_hit(self) -> bool:
+        if isinstance(self.lines, LineTable):
+            return self.lines.any_hit()
         return any((each.is_hit() for each in self.lines))
 
 
 class CoberturaKlassSlim(CoberturaKlass):
     methods: typing.List[CoberturaMethodSlim] = None
-    lines: typing.List[CoberturaLineSlim] = None
+    lines: typing.Union[typing.List[CoberturaLineSlim], LineTable] = None
 
     def get_method_list(self) -> typing.List[CoberturaMethod]:
         raise NotImplementedError
@@ -223,6 +261,9 @@ class CoberturaPackageSlim(CoberturaPackage):
 class CoberturaStructureSlim(CoberturaCoverage):
     packages: typing.List[CoberturaPackageSlim] = None
 
+    class Config:
+        json_encoders = {LineTable: LineTable.to_dicts, FastModel: FastModel.dict}
+
     def get_package_list(self) -> typing.List[CoberturaPackage]:
         raise NotImplementedError
 
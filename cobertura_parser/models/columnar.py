@@ -0,0 +1,223 @@
+"""
+compact, array-backed line data
+
+one `LineTable` stores all lines of a method/class in columns,
+instead of one pydantic object for each line.
+`LineView` keeps the same read API as `CoberturaLine`.
+"""
+
+import pickle
+import re
+import typing
+from array import array
+from itertools import compress
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CONDITION_PATTERN = re.compile(r"\((\d+)/(\d+)\)")
+
+
+def parse_condition_coverage(
+    condition_coverage: typing.Optional[str],
+) -> typing.Tuple[int, int]:
+    """'50% (1/2)' -> (1, 2)"""
+    if not condition_coverage:
+        return 0, 0
+    m = CONDITION_PATTERN.search(condition_coverage)
+    if not m:
+        return 0, 0
+    return int(m.group(1)), int(m.group(2))
+
+
+def format_condition_coverage(covered: int, total: int) -> typing.Optional[str]:
+    """(1, 2) -> '50% (1/2)', None if no condition"""
+    if not total:
+        return None
+    return f"{int(100 * covered / total)}% ({covered}/{total})"
+
+
+def coverage_rate(covered: int, total: int) -> float:
+    """covered / total, 1.0 if nothing to cover, as cobertura does"""
+    if not total:
+        return 1.0
+    return covered / total
+
+
+class LineView(object):
+    """read only view of one row, works like `CoberturaLine`"""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "LineTable", index: int):
+        self.table = table
+        self.index = index
+
+    @property
+    def number(self) -> int:
+        return self.table.numbers[self.index]
+
+    @property
+    def hits(self) -> int:
+        return self.table.hits[self.index]
+
+    @property
+    def branch(self) -> str:
+        return "true" if self.table.branches[self.index] else "false"
+
+    @property
+    def conditions_covered(self) -> int:
+        return self.table.covered[self.index]
+
+    @property
+    def conditions_total(self) -> int:
+        return self.table.total[self.index]
+
+    @property
+    def condition_coverage(self) -> typing.Optional[str]:
+        return format_condition_coverage(self.conditions_covered, self.conditions_total)
+
+    @property
+    def conditions(self) -> None:
+        # detail of conditions is not kept in columns
+        return None
+
+    def is_hit(self) -> bool:
+        return bool(self.hits)
+
+    def is_in_branch(self) -> bool:
+        return bool(self.table.branches[self.index])
+
+    def dict(self) -> dict:
+        return {
+            "number": self.number,
+            "hits": self.hits,
+            "branch": self.branch,
+            "condition_coverage": self.condition_coverage,
+        }
+
+
+class LineTable(object):
+    """
+    columns: line numbers, hits, branch flags, covered/total conditions
+    whole-table operations run on arrays instead of python objects
+    """
+
+    __slots__ = ("numbers", "hits", "branches", "covered", "total")
+
+    def __init__(self):
+        self.numbers = array("q")
+        self.hits = array("q")
+        self.branches = array("b")
+        self.covered = array("i")
+        self.total = array("i")
+
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value):
+        if not isinstance(value, cls):
+            raise TypeError("LineTable required")
+        return value
+
+    @classmethod
+    def from_buffers(cls, *columns: typing.Tuple[str, typing.Any]) -> "LineTable":
+        """(typecode, bytes-like) of each column, see `__reduce_ex__`"""
+        table = cls.__new__(cls)
+        for name, (typecode, buffer) in zip(cls.__slots__, columns):
+            column = array(typecode)
+            column.frombytes(buffer)
+            setattr(table, name, column)
+        return table
+
+    def __reduce_ex__(self, protocol):
+        # with protocol 5, columns can be pickled out-of-band (see `cache`)
+        wrap = pickle.PickleBuffer if protocol >= 5 else bytes
+        return (
+            LineTable.from_buffers,
+            tuple(
+                (getattr(self, name).typecode, wrap(getattr(self, name)))
+                for name in self.__slots__
+            ),
+        )
+
+    @classmethod
+    def from_lines(cls, lines: typing.Iterable) -> "LineTable":
+        table = cls()
+        for each in lines:
+            covered, total = parse_condition_coverage(each.condition_coverage)
+            table.append(each.number, each.hits, each.is_in_branch(), covered, total)
+        return table
+
+    def append(
+        self, number: int, hits: int, branch: bool, covered: int = 0, total: int = 0
+    ):
+        self.numbers.append(number)
+        self.hits.append(hits)
+        self.branches.append(1 if branch else 0)
+        self.covered.append(covered)
+        self.total.append(total)
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def __getitem__(self, index: int) -> LineView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return LineView(self, index)
+
+    def __iter__(self) -> typing.Iterator[LineView]:
+        for index in range(len(self)):
+            yield LineView(self, index)
+
+    def hit_count(self) -> int:
+        return len(self.hits) - self.hits.count(0)
+
+    def branch_count(self) -> int:
+        return len(self.branches) - self.branches.count(0)
+
+    def any_hit(self) -> bool:
+        return self.hits.count(0) != len(self.hits)
+
+    def filter(self, mask: typing.Iterable) -> "LineTable":
+        mask = list(mask)
+        table = LineTable()
+        table.numbers = array("q", compress(self.numbers, mask))
+        table.hits = array("q", compress(self.hits, mask))
+        table.branches = array("b", compress(self.branches, mask))
+        table.covered = array("i", compress(self.covered, mask))
+        table.total = array("i", compress(self.total, mask))
+        return table
+
+    def hit_only(self) -> "LineTable":
+        return self.filter(self.hits)
+
+    def number_list(self) -> typing.List[int]:
+        return self.numbers.tolist()
+
+    def to_lines(self) -> list:
+        """back to pydantic objects"""
+        from cobertura_parser.models.builtin import CoberturaLineSlim
+
+        return [CoberturaLineSlim.construct(**each.dict()) for each in self]
+
+    def to_dicts(self) -> typing.List[dict]:
+        return [each.dict() for each in self]
+
+    def to_numpy(self) -> typing.Dict[str, "numpy.ndarray"]:
+        """zero-copy numpy views of columns, numpy is optional"""
+        if numpy is None:
+            raise ImportError("numpy is required for `to_numpy`")
+        return {
+            "numbers": numpy.frombuffer(self.numbers, dtype=numpy.int64),
+            "hits": numpy.frombuffer(self.hits, dtype=numpy.int64),
+            "branches": numpy.frombuffer(self.branches, dtype=numpy.int8),
+            "covered": numpy.frombuffer(self.covered, dtype=numpy.int32),
+            "total": numpy.frombuffer(self.total, dtype=numpy.int32),
+        }
@@ -7,7 +7,9 @@ from cobertura_parser.models.builtin import (
     CoberturaStructureSlim,
     CoberturaStructure,
     CoberturaLineSlim,
+    copy_to,
 )
+from cobertura_parser.models.columnar import LineTable
 
 
 class CoverageMethod(CoberturaMethodSlim):
@@ -15,6 +17,11 @@ class CoverageMethod(CoberturaMethodSlim):
     valid_branches: int = -1
 
     def lazy_calc(self):
+        if isinstance(self.lines, LineTable):
+            self.valid_lines = len(self.lines)
+            self.valid_branches = self.lines.branch_count()
+            self.lines = self.lines.hit_only().to_lines()
+            return
         self.valid_lines = len(self.lines)
         self.valid_branches = len([each for each in self.lines if each.is_in_branch()])
         self.lines = [each for each in self.lines if each.is_hit()]
@@ -31,6 +38,18 @@ class CoverageKlass(CoberturaKlassSlim):
         for each in self.methods:
             each.lazy_calc()
 
+    @classmethod
+    def from_slim(cls, klass: CoberturaKlassSlim) -> typing.Optional["CoverageKlass"]:
+        """None if no method is hit, line data is shared with slim data"""
+        methods = [
+            copy_to(CoverageMethod, each_method)
+            for each_method in klass.methods
+            if each_method.is_hit()
+        ]
+        if not methods:
+            return None
+        return copy_to(cls, klass, methods=methods)
+
 
 class CoveragePackage(CoberturaPackageSlim):
     classes: typing.List[CoverageKlass]
@@ -53,7 +72,17 @@ class Coverage(CoberturaStructureSlim):
 
     @classmethod
     def from_slim(cls, slim_data: CoberturaStructureSlim) -> "Coverage":
-        return cls(**slim_data.dict())
+        # same as validators above, but line data is shared with slim data
+        packages = []
+        for each_pkg in slim_data.packages:
+            classes = []
+            for each_kls in each_pkg.classes:
+                klass = CoverageKlass.from_slim(each_kls)
+                if klass is not None:
+                    classes.append(klass)
+            if classes:
+                packages.append(copy_to(CoveragePackage, each_pkg, classes=classes))
+        return copy_to(cls, slim_data, packages=packages)
 
     @classmethod
     def from_normal(cls, data: CoberturaStructure) -> "Coverage":
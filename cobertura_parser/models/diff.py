@@ -0,0 +1,70 @@
+import typing
+from pydantic import BaseModel
+
+
+class LineChanges(object):
+    """
+    line numbers, grouped by how their coverage changed:
+    newly_covered, newly_uncovered, added, removed
+    """
+
+    newly_covered: typing.List[int]
+    newly_uncovered: typing.List[int]
+    added: typing.List[int]
+    removed: typing.List[int]
+
+    def is_changed(self) -> bool:
+        return bool(
+            self.newly_covered or self.newly_uncovered or self.added or self.removed
+        )
+
+
+class MethodDiff(BaseModel, LineChanges):
+    name: str
+    signature: str
+
+    newly_covered: typing.List[int] = []
+    newly_uncovered: typing.List[int] = []
+    added: typing.List[int] = []
+    removed: typing.List[int] = []
+
+
+class KlassDiff(BaseModel, LineChanges):
+    name: str
+    filename: str
+
+    newly_covered: typing.List[int] = []
+    newly_uncovered: typing.List[int] = []
+    added: typing.List[int] = []
+    removed: typing.List[int] = []
+
+    # changed methods only
+    methods: typing.List[MethodDiff] = []
+
+
+class CoverageDiff(BaseModel):
+    # changed classes only
+    classes: typing.List[KlassDiff] = []
+
+    newly_covered: int = 0
+    newly_uncovered: int = 0
+    added: int = 0
+    removed: int = 0
+
+
+class FileDiffCoverage(BaseModel):
+    # path in the patch
+    filename: str
+    # changed lines which can be covered, others are ignored
+    changed: int = 0
+    covered: int = 0
+    rate: float = 1.0
+    uncovered_lines: typing.List[int] = []
+
+
+class DiffCoverage(BaseModel):
+    files: typing.List[FileDiffCoverage] = []
+
+    changed: int = 0
+    covered: int = 0
+    rate: float = 1.0
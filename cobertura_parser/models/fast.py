@@ -0,0 +1,267 @@
+"""
+plain `__slots__` classes with the same fields and API as slim models
+
+no validation, no alias config and no per-object `__dict__`, so building
+them is much cheaper than pydantic models. see `build_coverage(fast=True)`.
+
+they can be used wherever slim models are accepted (processor, merge, diff,
+writer), and be converted to validated pydantic models by `to_pydantic`.
+"""
+
+import typing
+
+from cobertura_parser.models.columnar import LineTable
+
+
+def _to_dict(value):
+    if isinstance(value, FastModel):
+        return value.dict()
+    if isinstance(value, list):
+        return [_to_dict(each) for each in value]
+    if isinstance(value, dict):
+        return {k: _to_dict(v) for k, v in value.items()}
+    return value
+
+
+class FastModel(object):
+    __slots__ = ()
+    # name of the slim model in `models.builtin`, imported lazily
+    PYDANTIC_MODEL = ""
+
+    @classmethod
+    def construct(cls, **values) -> "FastModel":
+        """same as pydantic `construct`, so builders can create either kind"""
+        return cls(**values)
+
+    def dict(self) -> dict:
+        """same as pydantic `.dict()` of the slim model, `LineTable` is kept"""
+        return {name: _to_dict(getattr(self, name)) for name in self.__slots__}
+
+    def to_pydantic(self, validate: bool = True):
+        """
+        slim pydantic model of the same data, validated by default
+        without `validate`, it is a shallow copy by `construct`
+        """
+        from cobertura_parser.models import builtin
+
+        model = getattr(builtin, self.PYDANTIC_MODEL)
+        if validate:
+            return model.parse_obj(self.dict())
+        values = dict()
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, FastModel):
+                value = value.to_pydantic(False)
+            elif isinstance(value, list):
+                value = [
+                    each.to_pydantic(False) if isinstance(each, FastModel) else each
+                    for each in value
+                ]
+            elif isinstance(value, dict) and name == "conditions":
+                value = {
+                    k: (
+                        [each.to_pydantic(False) for each in v]
+                        if isinstance(v, list)
+                        else v.to_pydantic(False)
+                    )
+                    for k, v in value.items()
+                }
+            values[name] = value
+        return model.construct(**values)
+
+    def __eq__(self, other) -> bool:
+        if type(self) is not type(other):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class FastCondition(FastModel):
+    __slots__ = ("number", "type", "coverage")
+    PYDANTIC_MODEL = "CoberturaCondition"
+
+    def __init__(self, number: int, type: str, coverage: str):
+        self.number = number
+        self.type = type
+        self.coverage = coverage
+
+
+class FastLine(FastModel):
+    __slots__ = ("number", "hits", "branch", "condition_coverage", "conditions")
+    PYDANTIC_MODEL = "CoberturaLineSlim"
+
+    def __init__(
+        self,
+        number: int,
+        hits: int,
+        branch: str,
+        condition_coverage: str = None,
+        conditions: typing.Dict[
+            str, typing.Union[FastCondition, typing.List[FastCondition]]
+        ] = None,
+    ):
+        self.number = number
+        self.hits = hits
+        self.branch = branch
+        self.condition_coverage = condition_coverage
+        self.conditions = conditions
+
+    def is_hit(self) -> bool:
+        return bool(self.hits)
+
+    def is_in_branch(self) -> bool:
+        return self.branch == "true"
+
+
+TYPE_FAST_LINES = typing.Union[typing.List[FastLine], LineTable]
+
+
+def _line_list(lines: TYPE_FAST_LINES) -> list:
+    if isinstance(lines, LineTable):
+        return lines.to_lines()
+    return lines or []
+
+
+class FastMethod(FastModel):
+    __slots__ = ("name", "signature", "line_rate", "branch_rate", "complexity", "lines")
+    PYDANTIC_MODEL = "CoberturaMethodSlim"
+
+    def __init__(
+        self,
+        name: str,
+        signature: str,
+        line_rate: float,
+        branch_rate: float,
+        complexity: float = None,
+        lines: TYPE_FAST_LINES = None,
+    ):
+        self.name = name
+        self.signature = signature
+        self.line_rate = line_rate
+        self.branch_rate = branch_rate
+        self.complexity = complexity
+        self.lines = lines
+
+    def get_line_list(self) -> typing.List[FastLine]:
+        return _line_list(self.lines)
+
+    def is_hit(self) -> bool:
+        if isinstance(self.lines, LineTable):
+            return self.lines.any_hit()
+        return any((each.is_hit() for each in self.lines))
+
+
+class FastKlass(FastModel):
+    __slots__ = (
+        "name",
+        "filename",
+        "line_rate",
+        "branch_rate",
+        "complexity",
+        "methods",
+        "lines",
+    )
+    PYDANTIC_MODEL = "CoberturaKlassSlim"
+
+    def __init__(
+        self,
+        name: str,
+        filename: str,
+        line_rate: float,
+        branch_rate: float,
+        complexity: float = None,
+        methods: typing.List[FastMethod] = None,
+        lines: TYPE_FAST_LINES = None,
+    ):
+        self.name = name
+        self.filename = filename
+        self.line_rate = line_rate
+        self.branch_rate = branch_rate
+        self.complexity = complexity
+        self.methods = methods
+        self.lines = lines
+
+    def get_method_list(self) -> typing.List[FastMethod]:
+        return self.methods or []
+
+    def get_line_list(self) -> typing.List[FastLine]:
+        return _line_list(self.lines)
+
+    def is_hit(self) -> bool:
+        return any((each.is_hit() for each in self.methods))
+
+
+class FastPackage(FastModel):
+    __slots__ = ("name", "line_rate", "branch_rate", "complexity", "classes")
+    PYDANTIC_MODEL = "CoberturaPackageSlim"
+
+    def __init__(
+        self,
+        name: str,
+        line_rate: float,
+        branch_rate: float,
+        complexity: float = None,
+        classes: typing.List[FastKlass] = None,
+    ):
+        self.name = name
+        self.line_rate = line_rate
+        self.branch_rate = branch_rate
+        self.complexity = complexity
+        self.classes = classes
+
+    def get_class_list(self) -> typing.List[FastKlass]:
+        return self.classes or []
+
+    def is_hit(self) -> bool:
+        return any((each.is_hit() for each in self.classes))
+
+
+class FastStructure(FastModel):
+    __slots__ = (
+        "sources",
+        "packages",
+        "line_rate",
+        "branch_rate",
+        "line_covered",
+        "line_valid",
+        "branches_covered",
+        "branches_valid",
+        "complexity",
+        "version",
+        "timestamp",
+    )
+    PYDANTIC_MODEL = "CoberturaStructureSlim"
+
+    def __init__(
+        self,
+        line_rate: float,
+        branch_rate: float,
+        sources: typing.Dict[str, typing.Union[str, typing.List[str]]] = None,
+        packages: typing.List[FastPackage] = None,
+        line_covered: int = None,
+        line_valid: int = None,
+        branches_covered: int = None,
+        branches_valid: int = None,
+        complexity: float = None,
+        version: float = -1.0,
+        timestamp: float = -1.0,
+    ):
+        self.sources = sources
+        self.packages = packages
+        self.line_rate = line_rate
+        self.branch_rate = branch_rate
+        self.line_covered = line_covered
+        self.line_valid = line_valid
+        self.branches_covered = branches_covered
+        self.branches_valid = branches_valid
+        self.complexity = complexity
+        self.version = version
+        self.timestamp = timestamp
+
+    def get_package_list(self) -> typing.List[FastPackage]:
+        return self.packages or []
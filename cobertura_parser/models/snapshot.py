@@ -5,18 +5,33 @@ from cobertura_parser.models.builtin import (
     CoberturaKlass,
     CoberturaPackage,
     CoberturaLine,
+    CoberturaKlassSlim,
     CoberturaStructureSlim,
     CoberturaStructure,
+    copy_to,
 )
+from cobertura_parser.models.columnar import LineTable
+
+
+def _table_to_numbers(lines):
+    if isinstance(lines, LineTable):
+        return lines.number_list()
+    return lines
+
+
+def _lines_to_numbers(lines: typing.List[typing.Union[int, CoberturaLine]]):
+    return [each if isinstance(each, int) else each.number for each in lines]
 
 
 class CodeSnapshotMethod(CoberturaMethod):
     _TYPE_LINE_FINAL = typing.Union[typing.List[int], typing.List[CoberturaLine]]
     lines: _TYPE_LINE_FINAL = None
 
+    _table2int = validator("lines", pre=True, allow_reuse=True)(_table_to_numbers)
+
     @validator("lines")
     def line2int(cls, lines: typing.List[CoberturaLine]):
-        return [each.number for each in lines]
+        return _lines_to_numbers(lines)
 
 
 class CodeSnapshotKlass(CoberturaKlass):
@@ -24,9 +39,27 @@ class CodeSnapshotKlass(CoberturaKlass):
     lines: _TYPE_LINE_FINAL = None
     methods: typing.List[CodeSnapshotMethod]
 
+    _table2int = validator("lines", pre=True, allow_reuse=True)(_table_to_numbers)
+
     @validator("lines")
     def line2int(cls, lines: typing.List[CoberturaLine]):
-        return [each.number for each in lines]
+        return _lines_to_numbers(lines)
+
+    @classmethod
+    def from_slim(cls, klass: CoberturaKlassSlim) -> "CodeSnapshotKlass":
+        return copy_to(
+            cls,
+            klass,
+            methods=[
+                copy_to(
+                    CodeSnapshotMethod,
+                    each_method,
+                    lines=_lines_to_numbers(_table_to_numbers(each_method.lines)),
+                )
+                for each_method in klass.methods
+            ],
+            lines=_lines_to_numbers(_table_to_numbers(klass.lines)),
+        )
 
 
 class CodeSnapshotPackage(CoberturaPackage):
@@ -41,7 +74,18 @@ class CodeSnapshot(BaseModel):
 
     @classmethod
     def from_slim(cls, slim_data: CoberturaStructureSlim) -> "CodeSnapshot":
-        return cls(**slim_data.dict())
+        packages = [
+            copy_to(
+                CodeSnapshotPackage,
+                each_pkg,
+                classes=[
+                    CodeSnapshotKlass.from_slim(each_kls)
+                    for each_kls in each_pkg.classes
+                ],
+            )
+            for each_pkg in slim_data.packages
+        ]
+        return copy_to(cls, slim_data, packages=packages)
 
     @classmethod
     def from_normal(cls, data: CoberturaStructure) -> "CodeSnapshot":
@@ -59,7 +103,9 @@ class CodeSnapshotFat(BaseModel):
     @classmethod
     def from_slim(cls, slim_data: CoberturaStructureSlim) -> "CodeSnapshotFat":
         # todo: extras will be auto calculated inside
-        return cls(data=slim_data.dict())
+        return cls.construct(
+            data=CodeSnapshot.from_slim(slim_data), extras=CodeSnapshotExt()
+        )
 
     @classmethod
     def from_normal(cls, data: CoberturaStructure) -> "CodeSnapshotFat":
@@ -0,0 +1,153 @@
+"""
+changed lines of a unified diff (e.g. output of `git diff`), without git
+
+changed lines are kept as sorted, merged ranges of each file,
+so checking a line takes one bisect
+"""
+
+import bisect
+import pathlib
+import re
+import typing
+
+HUNK_PATTERN = re.compile(r"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+DEV_NULL = "/dev/null"
+
+
+def _normalize(path: str) -> str:
+    path = path.replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return path
+
+
+def _target_path(line: str) -> typing.Optional[str]:
+    """`+++ b/src/a.py<TAB>timestamp` -> `src/a.py`, None if file is deleted"""
+    path = line[4:].rstrip("\r\n").split("\t")[0].strip()
+    if path.startswith('"') and path.endswith('"'):
+        path = path[1:-1]
+    if path == DEV_NULL:
+        return None
+    if path.startswith("b/"):
+        path = path[2:]
+    return _normalize(path)
+
+
+class ChangedRanges(object):
+    """interval index of changed lines in one file"""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, ranges: typing.Iterable[typing.Tuple[int, int]] = ()):
+        self.starts: typing.List[int] = []
+        self.ends: typing.List[int] = []
+        for start, end in sorted(ranges):
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __contains__(self, number: int) -> bool:
+        index = bisect.bisect_right(self.starts, number) - 1
+        return index >= 0 and number <= self.ends[index]
+
+    def __len__(self) -> int:
+        return sum(end - start + 1 for start, end in zip(self.starts, self.ends))
+
+    def __iter__(self) -> typing.Iterator[int]:
+        for start, end in zip(self.starts, self.ends):
+            yield from range(start, end + 1)
+
+
+def parse_patch(lines: typing.Iterable[str]) -> typing.Dict[str, ChangedRanges]:
+    """added (or modified) lines of new files, by their paths in the patch"""
+    result: typing.Dict[str, typing.List[typing.Tuple[int, int]]] = dict()
+    current = None
+    new_line = old_left = new_left = 0
+    for line in lines:
+        if old_left > 0 or new_left > 0:
+            # inside a hunk, `+++` can be an added line too
+            tag = line[:1]
+            if tag == "+":
+                if current is not None:
+                    ranges = result[current]
+                    if ranges and ranges[-1][1] == new_line - 1:
+                        ranges[-1] = (ranges[-1][0], new_line)
+                    else:
+                        ranges.append((new_line, new_line))
+                new_line += 1
+                new_left -= 1
+            elif tag == "-":
+                old_left -= 1
+            elif tag == "\\":
+                # \ No newline at end of file
+                pass
+            else:
+                # context, some tools strip the leading space of empty lines
+                new_line += 1
+                new_left -= 1
+                old_left -= 1
+            continue
+
+        if line.startswith("+++ "):
+            current = _target_path(line)
+            if current is not None:
+                result.setdefault(current, [])
+        elif line.startswith("@@ "):
+            m = HUNK_PATTERN.match(line)
+            if m:
+                old_left = int(m.group(1) or 1)
+                new_line = int(m.group(2))
+                new_left = int(m.group(3) or 1)
+    return {k: ChangedRanges(v) for k, v in result.items() if v}
+
+
+class PatchIndex(object):
+    """
+    find changed lines by file names of reports
+    file names in reports are often relative to source roots,
+    so they are matched by path suffix
+    """
+
+    def __init__(self, files: typing.Dict[str, ChangedRanges]):
+        self.files = files
+        self._basenames: typing.Dict[str, typing.List[str]] = dict()
+        for each in files:
+            self._basenames.setdefault(each.rsplit("/", 1)[-1], []).append(each)
+        self._cache: typing.Dict[str, typing.Optional[str]] = dict()
+
+    @classmethod
+    def from_file(cls, patch_path: typing.Union[str, pathlib.Path]) -> "PatchIndex":
+        with open(patch_path, encoding="utf-8", errors="replace") as f:
+            return cls(parse_patch(f))
+
+    @classmethod
+    def from_str(cls, patch: str) -> "PatchIndex":
+        return cls(parse_patch(patch.splitlines()))
+
+    def match(self, filename: str) -> typing.Optional[str]:
+        """path in the patch of a report file name, None if not changed"""
+        if filename in self._cache:
+            return self._cache[filename]
+        result = None
+        normalized = _normalize(filename or "")
+        if normalized in self.files:
+            result = normalized
+        else:
+            for each in self._basenames.get(normalized.rsplit("/", 1)[-1], []):
+                if each.endswith("/" + normalized) or normalized.endswith("/" + each):
+                    result = each
+                    break
+        self._cache[filename] = result
+        return result
+
+    def accepts(self, filename: str) -> bool:
+        """works as `filename_filter` of `ReportFilter`"""
+        return self.match(filename) is not None
+
+    def __getstate__(self):
+        return self.files
+
+    def __setstate__(self, state):
+        self.__init__(state)
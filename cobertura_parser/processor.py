@@ -1,10 +1,24 @@
 import typing
 from cobertura_parser.models.builtin import (
+    CoberturaKlassSlim,
     CoberturaStructure,
     CoberturaStructureSlim,
 )
-from cobertura_parser.models.snapshot import CodeSnapshot, CodeSnapshotFat
-from cobertura_parser.models.coverage import Coverage
+from cobertura_parser.models.snapshot import (
+    CodeSnapshot,
+    CodeSnapshotFat,
+    CodeSnapshotKlass,
+)
+from cobertura_parser.models.coverage import Coverage, CoverageKlass
+from cobertura_parser.models.fast import FastKlass, FastStructure
+from cobertura_parser.models.diff import CoverageDiff, DiffCoverage
+from cobertura_parser.merge import merge_reports
+from cobertura_parser.diff import TYPE_CLASSES, diff_coverage, diff_reports
+from cobertura_parser.patch import PatchIndex
+
+# fast models (see `models.fast`) are accepted as slim ones
+TYPE_STRUCTURE = typing.Union[CoberturaStructure, CoberturaStructureSlim, FastStructure]
+TYPE_KLASS = typing.Union[CoberturaKlassSlim, FastKlass]
 
 
 class CoberturaProcessor(object):
@@ -14,25 +28,69 @@ class CoberturaProcessor(object):
     """
 
     @classmethod
-    def get_code_snapshot(
-        cls, data: typing.Union[CoberturaStructure, CoberturaStructureSlim]
-    ) -> CodeSnapshot:
+    def get_code_snapshot(cls, data: TYPE_STRUCTURE) -> CodeSnapshot:
         if isinstance(data, CoberturaStructure):
             return CodeSnapshot.from_normal(data)
         return CodeSnapshot.from_slim(data)
 
     @classmethod
-    def get_code_snapshot_fat(
-        cls, data: typing.Union[CoberturaStructure, CoberturaStructureSlim]
-    ) -> CodeSnapshotFat:
+    def get_code_snapshot_fat(cls, data: TYPE_STRUCTURE) -> CodeSnapshotFat:
         if isinstance(data, CoberturaStructure):
             return CodeSnapshotFat.from_normal(data)
         return CodeSnapshotFat.from_slim(data)
 
     @classmethod
-    def get_coverage(
-        cls, data: typing.Union[CoberturaStructure, CoberturaStructureSlim]
-    ) -> Coverage:
+    def get_coverage(cls, data: TYPE_STRUCTURE) -> Coverage:
         if isinstance(data, CoberturaStructure):
             return Coverage.from_normal(data)
         return Coverage.from_slim(data)
+
+    @classmethod
+    def iter_coverage(
+        cls, classes: typing.Iterable[typing.Tuple[str, TYPE_KLASS]]
+    ) -> typing.Iterator[typing.Tuple[str, CoverageKlass]]:
+        """
+        coverage of (package name, class) one by one, e.g. from
+        `CoberturaLoader.iter_report_classes`, classes without any hit are skipped
+        """
+        for package_name, klass in classes:
+            result = CoverageKlass.from_slim(klass)
+            if result is not None:
+                result.lazy_calc()
+                yield package_name, result
+
+    @classmethod
+    def iter_code_snapshot(
+        cls, classes: typing.Iterable[typing.Tuple[str, TYPE_KLASS]]
+    ) -> typing.Iterator[typing.Tuple[str, CodeSnapshotKlass]]:
+        for package_name, klass in classes:
+            yield package_name, CodeSnapshotKlass.from_slim(klass)
+
+    @classmethod
+    def merge(
+        cls,
+        reports: typing.Iterable[TYPE_STRUCTURE],
+        columnar: bool = None,
+    ) -> CoberturaStructureSlim:
+        """
+        merge reports of the same code, e.g. from sharded test runs
+        hits are summed per line, conditions are unioned, rates are recomputed
+        reports can be a generator, so only one of them will be loaded at a time
+        """
+        return merge_reports(reports, columnar)
+
+    @classmethod
+    def diff(cls, base: TYPE_CLASSES, head: TYPE_CLASSES) -> CoverageDiff:
+        """
+        coverage changes from base to head, per class and method
+        both sides can be structures, or streams from `CoberturaLoader.iter_classes`
+        """
+        return diff_reports(base, head)
+
+    @classmethod
+    def diff_cov(cls, patch: PatchIndex, data: TYPE_CLASSES) -> DiffCoverage:
+        """
+        coverage of lines changed by a unified diff, per file and in total
+        data can be filtered with `patch.accepts` while loading, to keep it small
+        """
+        return diff_coverage(patch, data)
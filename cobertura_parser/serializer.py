@@ -0,0 +1,245 @@
+"""
+write coverage/snapshot json straight to files
+
+pydantic `.json(exclude=...)` builds a filtered dict copy of the whole tree
+and encodes it with the stdlib `json`. here fields to write are decided once,
+by a `FieldPlan` of each model, and packages are encoded one by one.
+
+`orjson` will be used if installed. the stdlib fallback writes exactly what
+pydantic writes.
+
+ndjson output has one line for each class, with its package name.
+"""
+
+import json
+import typing
+
+from pydantic import BaseModel
+
+from cobertura_parser.models.columnar import LineTable
+from cobertura_parser.models.fast import FastModel
+from cobertura_parser.models.coverage import (
+    Coverage,
+    CoverageKlass,
+    CoverageMethod,
+    CoveragePackage,
+)
+from cobertura_parser.models.snapshot import (
+    CodeSnapshot,
+    CodeSnapshotFat,
+    CodeSnapshotKlass,
+    CodeSnapshotMethod,
+    CodeSnapshotPackage,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+RATES = ("line_rate", "branch_rate", "complexity")
+
+
+class FieldPlan(typing.NamedTuple):
+    """
+    fields: names to write, in the order of model fields
+    children: plans of nested models (or lists of them) by field name
+    stream: write fields one by one, instead of encoding the whole object
+    """
+
+    fields: typing.Tuple[str, ...]
+    children: typing.Dict[str, "FieldPlan"]
+    stream: bool = False
+
+
+def compile_plan(
+    model: typing.Type[BaseModel],
+    exclude: typing.Iterable[str] = (),
+    stream: bool = False,
+    **children: FieldPlan,
+) -> FieldPlan:
+    exclude = set(exclude)
+    fields = tuple(name for name in model.__fields__ if name not in exclude)
+    return FieldPlan(fields, children, stream)
+
+
+# same as `exclude` of `TerminalCli._cov` and `_snapshot` before
+COVERAGE_PLAN = compile_plan(
+    Coverage,
+    exclude=RATES
+    + (
+        "sources",
+        "line_covered",
+        "line_valid",
+        "branches_covered",
+        "branches_valid",
+        "version",
+    ),
+    stream=True,
+    packages=compile_plan(
+        CoveragePackage,
+        exclude=RATES,
+        classes=compile_plan(
+            CoverageKlass,
+            exclude=RATES + ("lines",),
+            methods=compile_plan(CoverageMethod, exclude=RATES),
+        ),
+    ),
+)
+COVERAGE_KLASS_PLAN = COVERAGE_PLAN.children["packages"].children["classes"]
+SNAPSHOT_PLAN = compile_plan(
+    CodeSnapshotFat,
+    stream=True,
+    data=compile_plan(
+        CodeSnapshot,
+        exclude=("sources",),
+        stream=True,
+        packages=compile_plan(
+            CodeSnapshotPackage,
+            exclude=RATES,
+            classes=compile_plan(
+                CodeSnapshotKlass,
+                exclude=RATES,
+                methods=compile_plan(CodeSnapshotMethod, exclude=RATES),
+            ),
+        ),
+    ),
+)
+
+SNAPSHOT_KLASS_PLAN = (
+    SNAPSHOT_PLAN.children["data"].children["packages"].children["classes"]
+)
+NDJSON_PACKAGE_KEY = "package"
+
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+# plans of models without one, all fields
+_FULL_PLANS: typing.Dict[typing.Type[BaseModel], FieldPlan] = dict()
+
+
+def _full_plan(model: typing.Type[BaseModel]) -> FieldPlan:
+    plan = _FULL_PLANS.get(model)
+    if plan is None:
+        plan = _FULL_PLANS[model] = compile_plan(model)
+    return plan
+
+
+def to_builtin(value, plan: FieldPlan = None):
+    """models to dicts of fields in `plan`, values are shared if possible"""
+    # checked by exact types first, isinstance of models is slow (ABCMeta)
+    if type(value) in SCALAR_TYPES:
+        return value
+    if type(value) is list:
+        return [to_builtin(each, plan) for each in value]
+    if type(value) is dict:
+        return {k: to_builtin(v) for k, v in value.items()}
+    if isinstance(value, LineTable):
+        # same as `json_encoders` of slim models
+        return value.to_dicts()
+    if isinstance(value, FastModel):
+        # lines of coverage built by the fast path
+        return to_builtin(value.dict(), plan)
+    if isinstance(value, BaseModel):
+        if plan is None:
+            plan = _full_plan(type(value))
+        values = value.__dict__
+        children = plan.children
+        result = dict()
+        for name in plan.fields:
+            each = values.get(name)
+            if type(each) in SCALAR_TYPES:
+                result[name] = each
+            else:
+                result[name] = to_builtin(each, children.get(name))
+        return result
+    return value
+
+
+class _Encoder(typing.NamedTuple):
+    encode: typing.Callable[[typing.Any], bytes]
+    item_separator: bytes
+    key_separator: bytes
+
+
+def _encoder(use_orjson: bool = None) -> _Encoder:
+    if use_orjson is None:
+        use_orjson = orjson is not None
+    if use_orjson:
+        if orjson is None:
+            raise ImportError("orjson is required")
+        return _Encoder(orjson.dumps, b",", b":")
+    # separators of `json.dumps`, as pydantic `.json()`
+    return _Encoder(lambda obj: json.dumps(obj).encode("utf-8"), b", ", b": ")
+
+
+def _write(value, plan: FieldPlan, f: typing.BinaryIO, encoder: _Encoder):
+    if not plan.stream or not isinstance(value, BaseModel):
+        f.write(encoder.encode(to_builtin(value, plan)))
+        return
+    f.write(b"{")
+    for index, name in enumerate(plan.fields):
+        if index:
+            f.write(encoder.item_separator)
+        f.write(encoder.encode(name))
+        f.write(encoder.key_separator)
+        field = getattr(value, name)
+        child = plan.children.get(name)
+        if child is None:
+            f.write(encoder.encode(to_builtin(field)))
+        elif isinstance(field, list):
+            f.write(b"[")
+            for i, each in enumerate(field):
+                if i:
+                    f.write(encoder.item_separator)
+                _write(each, child, f, encoder)
+            f.write(b"]")
+        else:
+            _write(field, child, f, encoder)
+    f.write(b"}")
+
+
+def dump(value: BaseModel, plan: FieldPlan, f: typing.BinaryIO, use_orjson=None):
+    """
+    write fields of `plan` to a binary file
+    with `use_orjson` (default: if installed), output is compact json
+    """
+    _write(value, plan, f, _encoder(use_orjson))
+
+
+def dump_coverage(coverage: Coverage, f: typing.BinaryIO, use_orjson=None):
+    dump(coverage, COVERAGE_PLAN, f, use_orjson)
+
+
+def dump_snapshot(snapshot: CodeSnapshotFat, f: typing.BinaryIO, use_orjson=None):
+    dump(snapshot, SNAPSHOT_PLAN, f, use_orjson)
+
+
+def dump_ndjson(
+    classes: typing.Iterable[typing.Tuple[str, BaseModel]],
+    plan: FieldPlan,
+    f: typing.BinaryIO,
+    use_orjson=None,
+):
+    """one line of `{"package": ..., **fields of plan}` for each (package name, class)"""
+    encoder = _encoder(use_orjson)
+    for package_name, klass in classes:
+        record = {NDJSON_PACKAGE_KEY: package_name}
+        record.update(to_builtin(klass, plan))
+        f.write(encoder.encode(record))
+        f.write(b"\n")
+
+
+def dump_coverage_ndjson(
+    classes: typing.Iterable[typing.Tuple[str, CoverageKlass]],
+    f: typing.BinaryIO,
+    use_orjson=None,
+):
+    dump_ndjson(classes, COVERAGE_KLASS_PLAN, f, use_orjson)
+
+
+def dump_snapshot_ndjson(
+    classes: typing.Iterable[typing.Tuple[str, CodeSnapshotKlass]],
+    f: typing.BinaryIO,
+    use_orjson=None,
+):
+    dump_ndjson(classes, SNAPSHOT_KLASS_PLAN, f, use_orjson)
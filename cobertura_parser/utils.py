@@ -1,5 +1,12 @@
 from contextlib import contextmanager
+import gzip
+import io
+import pathlib
 import time
+import typing
+
+GZIP_MAGIC = b"\x1f\x8b"
+TYPE_XML_SOURCE = typing.Union[str, bytes, bytearray, memoryview, typing.BinaryIO]
 
 
 @contextmanager
@@ -21,3 +28,59 @@ def unused_dict_to_list(cb_dict: dict) -> list:
     return [
         ret,
     ]
+
+
+def _peek(f: typing.BinaryIO, size: int) -> bytes:
+    if hasattr(f, "peek"):
+        return f.peek(size)[:size]
+    if f.seekable():
+        pos = f.tell()
+        head = f.read(size)
+        f.seek(pos)
+        return head
+    # can not look ahead without consuming, treat it as plain xml
+    return b""
+
+
+def decompress_if_needed(source: TYPE_XML_SOURCE) -> TYPE_XML_SOURCE:
+    """
+    gzip data (detected by magic bytes) will be wrapped with a decompressing stream
+    so it will be decompressed only once, while parsing
+    str is always treated as xml text, and others will be returned as is
+    """
+    if isinstance(source, str):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        head = bytes(source[:2])
+        if head == GZIP_MAGIC:
+            return gzip.GzipFile(fileobj=io.BytesIO(source))
+        return source
+    if _peek(source, 2) == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=source)
+    return source
+
+
+def looks_like_xml(f: typing.BinaryIO) -> bool:
+    """check the first bytes without consuming them"""
+    head = _peek(f, 1024).lstrip(b"\xef\xbb\xbf \t\r\n")
+    return head.startswith(b"<")
+
+
+@contextmanager
+def open_xml(source: typing.Union[str, pathlib.Path, typing.BinaryIO]):
+    """open a path (or use an opened binary file) as a binary xml stream"""
+    if isinstance(source, (str, pathlib.Path)):
+        with open(source, "rb") as f:
+            yield decompress_if_needed(f)
+    else:
+        yield decompress_if_needed(source)
+
+
+def release(element):
+    """free a finished element and its already handled siblings"""
+    element.clear()
+    parent = element.getparent()
+    if parent is None:
+        return
+    while element.getprevious() is not None:
+        del parent[0]
@@ -0,0 +1,118 @@
+"""
+write slim models back to cobertura xml
+
+elements are written incrementally, one package at a time
+"""
+
+import typing
+
+from lxml import etree
+
+from cobertura_parser.models.builtin import (
+    CoberturaLine,
+    CoberturaMethodSlim,
+    CoberturaKlassSlim,
+    CoberturaPackageSlim,
+    CoberturaStructureSlim,
+)
+from cobertura_parser.utils import unused_dict_to_list
+
+
+def _attrs(**kwargs) -> typing.Dict[str, str]:
+    # None will be skipped, same as `exclude_defaults` of origin data
+    return {k.replace("_", "-"): str(v) for k, v in kwargs.items() if v is not None}
+
+
+def _rate_attrs(item) -> typing.Dict[str, str]:
+    return _attrs(
+        line_rate=item.line_rate,
+        branch_rate=item.branch_rate,
+        complexity=item.complexity,
+    )
+
+
+def line_element(line: CoberturaLine) -> etree.Element:
+    element = etree.Element(
+        "line",
+        _attrs(
+            number=line.number,
+            hits=line.hits,
+            branch=line.branch,
+            condition_coverage=line.condition_coverage,
+        ),
+    )
+    conditions = unused_dict_to_list(line.conditions)
+    if conditions:
+        container = etree.SubElement(element, "conditions")
+        for each in conditions:
+            etree.SubElement(
+                container,
+                "condition",
+                _attrs(number=each.number, type=each.type, coverage=each.coverage),
+            )
+    return element
+
+
+def _lines_element(parent: etree.Element, lines) -> None:
+    container = etree.SubElement(parent, "lines")
+    for each in lines or []:
+        container.append(line_element(each))
+
+
+def method_element(method: CoberturaMethodSlim) -> etree.Element:
+    element = etree.Element(
+        "method",
+        _attrs(name=method.name, signature=method.signature),
+    )
+    element.attrib.update(_rate_attrs(method))
+    _lines_element(element, method.lines)
+    return element
+
+
+def klass_element(klass: CoberturaKlassSlim) -> etree.Element:
+    element = etree.Element(
+        "class",
+        _attrs(name=klass.name, filename=klass.filename),
+    )
+    element.attrib.update(_rate_attrs(klass))
+    methods = etree.SubElement(element, "methods")
+    for each in klass.methods or []:
+        methods.append(method_element(each))
+    _lines_element(element, klass.lines)
+    return element
+
+
+def package_element(package: CoberturaPackageSlim) -> etree.Element:
+    element = etree.Element("package", _attrs(name=package.name))
+    element.attrib.update(_rate_attrs(package))
+    classes = etree.SubElement(element, "classes")
+    for each in package.classes or []:
+        classes.append(klass_element(each))
+    return element
+
+
+def write_cobertura(structure: CoberturaStructureSlim, output: typing.BinaryIO):
+    """write cobertura xml to a binary file object"""
+    attrs = _attrs(
+        line_rate=structure.line_rate,
+        branch_rate=structure.branch_rate,
+        lines_covered=structure.line_covered,
+        lines_valid=structure.line_valid,
+        branches_covered=structure.branches_covered,
+        branches_valid=structure.branches_valid,
+        complexity=structure.complexity,
+        version=structure.version,
+        timestamp=structure.timestamp,
+    )
+    with etree.xmlfile(output, encoding="utf-8") as xf:
+        xf.write_declaration()
+        with xf.element("coverage", attrs):
+            sources = unused_dict_to_list(structure.sources)
+            if sources:
+                with xf.element("sources"):
+                    for each in sources:
+                        with xf.element("source"):
+                            xf.write(each)
+            with xf.element("packages"):
+                for each in structure.packages or []:
+                    xf.write(package_element(each))
@@ -0,0 +1,50 @@
+from cobertura_parser.binary import (
+    SnapshotFormatError,
+    SnapshotReader,
+    decode_lines,
+    encode_lines,
+)
+from cobertura_parser.cli import TerminalCli
+import json
+import pathlib
+import pytest
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+
+
+def test_lines_encoding():
+    numbers = [1, 2, 3, 300, 299, 0, 100000, 100000]
+    data = bytearray()
+    assert encode_lines(numbers, data) == len(numbers)
+    # small deltas take one byte each
+    assert len(data) < 2 * len(numbers)
+    assert decode_lines(data, 0, len(numbers)) == numbers
+
+
+@pytest.mark.parametrize("name", ["cobertura.xml", "jacoco.xml"])
+def test_snapshot_bin(tmp_path, name):
+    cli = TerminalCli()
+    command = cli.snapshot if name == "cobertura.xml" else cli.snapshot_from_jacoco
+    json_file = tmp_path / "snapshot.json"
+    bin_file = tmp_path / "snapshot.bin"
+    command(str(DATA_DIR / name), str(json_file))
+    command(str(DATA_DIR / name), str(bin_file), format="bin")
+    expected = json.loads(json_file.read_text())["data"]
+    assert bin_file.stat().st_size < json_file.stat().st_size
+
+    with SnapshotReader(bin_file) as reader:
+        assert reader.to_dict() == expected
+        for each_pkg in expected["packages"]:
+            for each_kls in each_pkg["classes"]:
+                assert reader.class_lines(each_kls["name"], each_kls["filename"]) == (
+                    each_kls["lines"]
+                )
+        assert reader.class_lines("not.Exist") == []
+
+
+def test_snapshot_bin_broken(tmp_path):
+    broken = tmp_path / "broken.bin"
+    for content in (b"", b"CPSN", b"{}" * 64):
+        broken.write_bytes(content)
+        with pytest.raises(SnapshotFormatError):
+            SnapshotReader(broken)
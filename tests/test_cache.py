@@ -0,0 +1,64 @@
+from cobertura_parser.cache import ReportCache
+from cobertura_parser.loader import CoberturaLoader
+import os
+import pathlib
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+
+
+def test_cache(tmp_path):
+    report = tmp_path / "cobertura.xml"
+    report.write_bytes((DATA_DIR / "cobertura.xml").read_bytes())
+    cache = ReportCache(tmp_path / "cache")
+
+    for columnar in (None, True):
+        expected = CoberturaLoader.slim_from_report(report, columnar)
+        for _ in range(2):
+            cached = CoberturaLoader.slim_from_report(report, columnar, cache=cache)
+            assert cached.json() == expected.json()
+    assert len(cache.entries()) == 2
+
+    # keyed by content, so a copy is a hit
+    copied = tmp_path / "copied.xml"
+    copied.write_bytes(report.read_bytes())
+    assert cache.key(copied, True) == cache.key(report, True)
+    assert cache.key(report, True) != cache.key(report, None)
+
+    # with `fast`, changed mtime or size is a miss
+    fast = ReportCache(tmp_path / "cache", fast=True)
+    key = fast.key(report)
+    os.utime(report, ns=(0, 0))
+    assert fast.key(report) != key
+
+    # broken entries are ignored
+    entry = cache.entries()[0]
+    entry.path.write_bytes(b"broken")
+    assert cache.get(entry.key) is None
+
+
+def test_cache_prune(tmp_path):
+    cache = ReportCache(tmp_path)
+    structure = CoberturaLoader.slim_from_report(DATA_DIR / "cobertura.xml", True)
+    for key in ("a", "b", "c"):
+        cache.put(key, structure)
+        os.utime(cache._path(key), (0, {"a": 1, "b": 3, "c": 2}[key]))
+    size = cache.entries()[0].size
+
+    # the least recently used one goes first
+    assert cache.get("a") is not None
+    evicted = cache.prune(size * 2)
+    assert [each.key for each in evicted] == ["c"]
+    assert [each.key for each in cache.entries()] == ["a", "b"]
+    assert len(cache.clear()) == 2 and cache.entries() == []
+
+
+def test_cache_prune_sizes(tmp_path):
+    cache = ReportCache(tmp_path)
+    for key, size, last_used in (("new", 10, 3), ("big", 100, 2), ("old", 10, 1)):
+        cache._path(key).write_bytes(b"x" * size)
+        os.utime(cache._path(key), (0, last_used))
+
+    # "old" fits beside "new", but it is older than "big"
+    evicted = cache.prune(50)
+    assert [each.key for each in evicted] == ["big", "old"]
+    assert [each.key for each in cache.entries()] == ["new"]
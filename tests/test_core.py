@@ -1,3 +1,5 @@
+from cobertura_parser.cli import TerminalCli
+from cobertura_parser.filters import ReportFilter, parse_filtered
 from cobertura_parser.loader import CoberturaLoader
 from cobertura_parser.models.builtin import (
     CoberturaStructure,
@@ -5,9 +7,17 @@ from cobertura_parser.models.builtin import (
 )
 from cobertura_parser.models.snapshot import CodeSnapshot
 from cobertura_parser.processor import CoberturaProcessor
+from cobertura_parser.serializer import dump_coverage, dump_snapshot
+from cobertura_parser.writer import write_cobertura
+from lxml import etree
 import xmltodict
+import gzip
+import io
+import json
 import pathlib
 
+import pytest
+
 
 DATA_FILE = pathlib.Path(__file__).parent / "data" / "cobertura.xml"
 
@@ -55,3 +65,268 @@ def test_slim():
     sub_slim = r.coverage.slim()
     assert isinstance(slim, CoberturaStructureSlim)
     assert slim.json() == sub_slim.json()
+
+
+def test_loader_iter_packages():
+    slim = CoberturaLoader.from_file(DATA_FILE).slim()
+    packages = list(CoberturaLoader.iter_packages(DATA_FILE))
+    assert [each.json() for each in packages] == [
+        each.json() for each in slim.packages
+    ]
+
+
+def test_loader_iter_classes():
+    slim = CoberturaLoader.from_file(DATA_FILE).slim()
+    expected = [
+        (each_pkg.name, each_kls.json())
+        for each_pkg in slim.packages
+        for each_kls in each_pkg.classes
+    ]
+    actual = [
+        (package_name, each_kls.json())
+        for package_name, each_kls in CoberturaLoader.iter_classes(DATA_FILE)
+    ]
+    assert actual == expected
+
+
+def test_loader_sources(tmp_path):
+    raw = DATA_FILE.read_bytes()
+    expected = CoberturaLoader.from_str(raw.decode(), to_dict=True)
+    compressed = gzip.compress(raw)
+    gz_file = tmp_path / "cobertura.xml.gz"
+    gz_file.write_bytes(compressed)
+
+    assert CoberturaLoader.from_str(raw, to_dict=True) == expected
+    assert CoberturaLoader.from_str(memoryview(raw), to_dict=True) == expected
+    assert CoberturaLoader.from_str(compressed, to_dict=True) == expected
+    assert CoberturaLoader.from_file(gz_file, to_dict=True) == expected
+    with open(DATA_FILE, "rb") as f:
+        assert CoberturaLoader.from_source(f, to_dict=True) == expected
+    assert len(list(CoberturaLoader.iter_packages(gz_file))) == len(
+        expected["coverage"]["packages"]["package"]
+    )
+
+
+def test_loader_slim_fast_path():
+    expected = CoberturaLoader.from_file(DATA_FILE).slim()
+    raw = DATA_FILE.read_bytes()
+    for each in (
+        CoberturaLoader.slim_from_file(DATA_FILE),
+        CoberturaLoader.slim_from_source(raw),
+        CoberturaLoader.slim_from_source(raw.decode()),
+        CoberturaLoader.slim_from_source(gzip.compress(raw)),
+    ):
+        assert isinstance(each, CoberturaStructureSlim)
+        assert each.json() == expected.json()
+
+
+def test_merge(tmp_path):
+    origin = CoberturaLoader.slim_from_file(DATA_FILE)
+    merged = CoberturaProcessor.merge(
+        [origin, CoberturaLoader.from_file(DATA_FILE), origin]
+    )
+    assert merged.line_valid == CoberturaProcessor.merge([origin]).line_valid
+    for merged_pkg, origin_pkg in zip(merged.packages, origin.packages):
+        for merged_kls, origin_kls in zip(merged_pkg.classes, origin_pkg.classes):
+            origin_lines = sorted(origin_kls.lines, key=lambda x: x.number)
+            assert [each.hits for each in merged_kls.lines] == [
+                3 * each.hits for each in origin_lines
+            ]
+
+    # shards cover different parts, conditions are unioned
+    shard_file = tmp_path / "shard.xml"
+    shard_file.write_text(
+        DATA_FILE.read_text()
+        .replace('hits="0"', 'hits="1"')
+        .replace("50% (1/2)", "100% (2/2)")
+    )
+    merged = CoberturaProcessor.merge(
+        CoberturaLoader.slim_from_report(each) for each in (DATA_FILE, shard_file)
+    )
+    assert merged.line_covered == merged.line_valid
+    assert merged.branches_covered == merged.branches_valid
+    assert merged.line_rate == merged.branch_rate == 1.0
+
+    # written and loaded back
+    merged_file = tmp_path / "merged.xml"
+    with open(merged_file, "wb") as f:
+        write_cobertura(merged, f)
+    assert CoberturaLoader.slim_from_file(merged_file).json() == merged.json()
+
+
+def test_diff(tmp_path):
+    base = CoberturaLoader.slim_from_file(DATA_FILE)
+    assert CoberturaProcessor.diff(base, base).classes == []
+
+    # line 16 of Main: 0 -> 1, line 10: 3 -> 0, line 30 removed, line 99 added
+    head_file = tmp_path / "head.xml"
+    head_file.write_text(
+        DATA_FILE.read_text()
+        .replace('<line number="16" hits="0"', '<line number="16" hits="1"')
+        .replace('<line number="10" hits="3"', '<line number="10" hits="0"')
+        .replace('<line number="30" hits="3"', '<line number="99" hits="3"')
+    )
+    for result in (
+        CoberturaProcessor.diff(base, CoberturaLoader.from_file(head_file)),
+        CoberturaProcessor.diff(
+            CoberturaLoader.iter_classes(DATA_FILE),
+            CoberturaLoader.iter_classes(head_file, columnar=True),
+        ),
+    ):
+        assert (result.newly_covered, result.newly_uncovered) == (1, 1)
+        assert (result.added, result.removed) == (1, 1)
+        (main,) = result.classes
+        assert main.name == "Main"
+        assert main.newly_covered == [16]
+        assert main.newly_uncovered == [10]
+        assert main.added == [99]
+        assert main.removed == [30]
+        methods = {each.name: each for each in main.methods}
+        assert methods["main"].newly_covered == [16]
+        assert methods["<init>"].newly_uncovered == [10]
+        assert methods["doSearch"].added == [99]
+        assert methods["doSearch"].removed == [30]
+
+
+def test_diff_cli(tmp_path):
+    cli = TerminalCli()
+    jacoco_file = DATA_FILE.parent / "jacoco.xml"
+    lcov_file = DATA_FILE.parent / "lcov.info"
+    for report in (jacoco_file, lcov_file):
+        result_file = tmp_path / "diff.json"
+        cli.diff(str(report), str(report), str(result_file))
+        assert json.loads(result_file.read_text())["classes"] == []
+
+    # mul() of lcov is covered in head
+    head_file = tmp_path / "head.info"
+    head_file.write_text(lcov_file.read_text().replace("DA:3,0", "DA:3,1"))
+    cli.diff(str(lcov_file), str(head_file), str(result_file))
+    (klass,) = json.loads(result_file.read_text())["classes"]
+    assert klass["newly_covered"] == [3]
+
+
+def test_report_filter():
+    def filenames(packages):
+        return [each.filename for p in packages for each in p.classes]
+
+    report_filter = ReportFilter(include="search", exclude="*/Linear*")
+    expected = ["search/BinarySearch.java", "search/ISortedArraySearch.java"]
+    assert (
+        filenames(
+            CoberturaLoader.slim_from_file(
+                DATA_FILE, report_filter=report_filter
+            ).packages
+        )
+        == expected
+    )
+    assert (
+        filenames(
+            CoberturaLoader.from_file(DATA_FILE, report_filter=report_filter)
+            .slim()
+            .packages
+        )
+        == expected
+    )
+    assert filenames(CoberturaLoader.iter_packages(DATA_FILE, None, report_filter)) == (
+        expected
+    )
+    assert [
+        each.filename
+        for _, each in CoberturaLoader.iter_classes(DATA_FILE, None, report_filter)
+    ] == expected
+
+    # empty packages are dropped, and nothing to filter means no filter
+    main_only = ReportFilter(include="Main.java, other/*")
+    (package,) = CoberturaLoader.slim_from_file(DATA_FILE, None, main_only).packages
+    assert package.name == ""
+    assert ReportFilter.create(" , ") is None
+
+    # same dict as parsing the pruned xml again
+    with open(DATA_FILE, "rb") as f:
+        pruned = etree.tostring(parse_filtered(f, report_filter))
+    assert CoberturaLoader.from_file(
+        DATA_FILE, to_dict=True, report_filter=report_filter
+    ) == xmltodict.parse(pruned)
+
+
+def test_serializer():
+    rates = {"line_rate": ..., "branch_rate": ..., "complexity": ...}
+    methods = {"methods": {"__all__": rates}}
+    coverage = CoberturaProcessor.get_coverage(CoberturaLoader.from_file(DATA_FILE))
+    coverage.lazy_calc()
+    expected = coverage.json(
+        exclude={
+            **rates,
+            **{k: ... for k in ("sources", "line_covered", "line_valid")},
+            **{k: ... for k in ("branches_covered", "branches_valid", "version")},
+            "packages": {
+                "__all__": {
+                    **rates,
+                    "classes": {"__all__": {**rates, **methods, "lines": ...}},
+                }
+            },
+        }
+    )
+    snapshot = CoberturaProcessor.get_code_snapshot_fat(
+        CoberturaLoader.slim_from_file(DATA_FILE, columnar=True)
+    )
+    expected_snapshot = snapshot.json(
+        exclude={
+            "data": {
+                "sources": ...,
+                "packages": {
+                    "__all__": {**rates, "classes": {"__all__": {**rates, **methods}}}
+                },
+            }
+        }
+    )
+
+    for use_orjson in (False, None):
+        f = io.BytesIO()
+        dump_coverage(coverage, f, use_orjson)
+        s = io.BytesIO()
+        dump_snapshot(snapshot, s, use_orjson)
+        if use_orjson is False:
+            # the stdlib writes exactly what pydantic writes
+            assert f.getvalue().decode() == expected
+            assert s.getvalue().decode() == expected_snapshot
+        assert json.loads(f.getvalue()) == json.loads(expected)
+        assert json.loads(s.getvalue()) == json.loads(expected_snapshot)
+
+
+def test_ndjson(tmp_path):
+    cli = TerminalCli()
+    jacoco_file = DATA_FILE.parent / "jacoco.xml"
+    lcov_file = DATA_FILE.parent / "lcov.info"
+    cases = (
+        (cli.cov, DATA_FILE, "coverage", {}),
+        (cli.snapshot, DATA_FILE, "snapshot", {}),
+        (cli.cov_from_jacoco, jacoco_file, "coverage", {}),
+        (cli.snapshot_from_jacoco, jacoco_file, "snapshot", {}),
+        (cli.data_from_lcov_to_cov, lcov_file, "coverage", {"workers": 2}),
+    )
+    for command, from_file, name, kwargs in cases:
+        json_file = tmp_path / f"{name}.json"
+        ndjson_file = tmp_path / f"{name}.ndjson"
+        command(str(from_file), str(json_file), **kwargs)
+        command(str(from_file), str(ndjson_file), format="ndjson", **kwargs)
+
+        data = json.loads(json_file.read_text())
+        packages = data["data"]["packages"] if name == "snapshot" else data["packages"]
+        expected = [
+            {"package": each_pkg["name"], **each_kls}
+            for each_pkg in packages
+            for each_kls in each_pkg["classes"]
+        ]
+        lines = ndjson_file.read_text().splitlines()
+        assert lines
+        assert [json.loads(each) for each in lines] == expected
+
+    # jacoco is converted in this process
+    with pytest.raises(TypeError):
+        cli.cov_from_jacoco(
+            str(jacoco_file), str(tmp_path / "x.ndjson"), workers=2, format="ndjson"
+        )
+    # bin is for snapshots only
+    with pytest.raises(ValueError):
+        cli.cov(str(DATA_FILE), str(tmp_path / "x.bin"), format="bin")
@@ -0,0 +1,98 @@
+from cobertura_parser.export import (
+    FORMAT_NPZ,
+    detect_format,
+    export_lines,
+    parquet,
+    pyarrow,
+    read_npz,
+)
+from cobertura_parser.loader import CoberturaLoader
+import pathlib
+import pytest
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+
+
+def expected_rows(report: pathlib.Path) -> list:
+    rows = []
+    for package_name, klass in CoberturaLoader.iter_report_classes(report):
+        method_of = dict()
+        for method in klass.methods:
+            for line in method.lines:
+                method_of.setdefault(line.number, method.name)
+        for line in klass.lines:
+            covered, total = 0, 0
+            if line.condition_coverage:
+                covered, total = map(
+                    int, line.condition_coverage.split("(")[1][:-1].split("/")
+                )
+            rows.append(
+                (
+                    package_name,
+                    klass.name,
+                    klass.filename,
+                    method_of.get(line.number),
+                    line.number,
+                    line.hits,
+                    line.is_in_branch(),
+                    covered,
+                    total,
+                )
+            )
+    return rows
+
+
+@pytest.mark.parametrize("name", ["cobertura.xml", "jacoco.xml", "lcov.info"])
+def test_export_npz(tmp_path, name):
+    report = DATA_DIR / name
+    output = tmp_path / "lines.npz"
+    # small batches, so columns are built from many of them
+    rows = export_lines(
+        CoberturaLoader.iter_report_classes(report, columnar=True),
+        output,
+        batch_size=4,
+    )
+    assert detect_format(output) == FORMAT_NPZ
+
+    columns, strings = read_npz(output)
+    assert {len(each) for each in columns.values()} == {rows}
+
+    def text(code):
+        return strings[code] if code >= 0 else None
+
+    assert [
+        (
+            text(columns["package"][i]),
+            text(columns["class"][i]),
+            text(columns["filename"][i]),
+            text(columns["method"][i]),
+            columns["line"][i],
+            columns["hits"][i],
+            bool(columns["branch"][i]),
+            columns["covered"][i],
+            columns["total"][i],
+        )
+        for i in range(rows)
+    ] == expected_rows(report)
+
+
+@pytest.mark.skipif(pyarrow is None, reason="pyarrow is not installed")
+@pytest.mark.parametrize("name", ["cobertura.xml", "jacoco.xml", "lcov.info"])
+@pytest.mark.parametrize("suffix", [".arrow", ".parquet"])
+def test_export_arrow(tmp_path, name, suffix):
+    report = DATA_DIR / name
+    output = tmp_path / f"lines{suffix}"
+    if suffix == ".parquet" and parquet is None:
+        pytest.skip("pyarrow is built without parquet")
+    # small batches, so dictionaries of many batches are involved
+    rows = export_lines(
+        CoberturaLoader.iter_report_classes(report, columnar=True),
+        output,
+        batch_size=4,
+    )
+    if suffix == ".parquet":
+        table = parquet.read_table(output)
+    else:
+        table = pyarrow.ipc.open_file(output).read_all()
+    assert table.num_rows == rows
+    assert [tuple(each.values()) for each in table.to_pylist()] == expected_rows(report)
@@ -0,0 +1,122 @@
+from cobertura_parser.ext.jacoco import (
+    index_lines,
+    jacoco2cobertura,
+    jacoco2cobertura_file,
+    jacoco2slim,
+)
+from cobertura_parser.cli import TerminalCli
+from cobertura_parser.filters import ReportFilter
+from cobertura_parser.loader import CoberturaLoader
+from cobertura_parser.models.builtin import CoberturaStructureSlim
+from cobertura_parser.processor import CoberturaProcessor
+from lxml import etree as ET
+import io
+import pathlib
+
+import pytest
+
+DATA_FILE = pathlib.Path(__file__).parent / "data" / "jacoco.xml"
+
+
+def test_jacoco_to_cobertura():
+    r = CoberturaLoader.from_jacoco_file(DATA_FILE)
+    packages = r.coverage.get_package_list()
+    assert [each.name for each in packages] == ["com.example", "com.example.util"]
+    coverage = CoberturaProcessor.get_coverage(r)
+    assert coverage.packages
+
+
+def test_jacoco_parallel():
+    assert jacoco2cobertura(DATA_FILE, workers=2) == jacoco2cobertura(DATA_FILE)
+
+
+def test_jacoco_large_class(tmp_path):
+    methods = "".join(
+        f'<method name="m{i}" desc="()V" line="{i * 1000 + 1}"></method>'
+        for i in range(9)
+    )
+    lines = "".join(
+        f'<line nr="{i}" mi="0" ci="{i % 2}" mb="0" cb="0"/>' for i in range(1, 9001)
+    )
+    report = tmp_path / "jacoco.xml"
+    report.write_text(
+        '<report name="large"><package name="p">'
+        f'<class name="p/Large" sourcefilename="Large.java">{methods}</class>'
+        f'<sourcefile name="Large.java">{lines}</sourcefile>'
+        "</package></report>"
+    )
+    kls = CoberturaLoader.from_jacoco_file(report).slim().packages[0].classes[0]
+    assert len(kls.lines) == 9000
+    assert [len(each.lines) for each in kls.methods] == [1000] * 9
+
+
+def test_jacoco_index_lines():
+    j_package = ET.parse(str(DATA_FILE)).getroot().find("package")
+    index = index_lines(j_package)
+    numbers = [each.nr for each in index["Calculator"]]
+    assert numbers == [3, 5, 9, 10, 12, 16, 17, 22, 23]
+    assert index_lines(j_package, {"Calculator"}) == {"Calculator": index["Calculator"]}
+
+
+def test_jacoco_streaming_writer():
+    output = io.BytesIO()
+    jacoco2cobertura_file(str(DATA_FILE), output)
+    streamed = CoberturaLoader.from_str(output.getvalue()).slim()
+    expected = CoberturaLoader.from_jacoco_file(DATA_FILE).slim()
+    assert streamed.json() == expected.json()
+
+
+def test_jacoco_direct():
+    expected = CoberturaLoader.from_jacoco_file(DATA_FILE).slim()
+    direct = CoberturaLoader.from_jacoco_file(DATA_FILE, direct=True)
+    assert isinstance(direct, CoberturaStructureSlim)
+    assert direct.json() == expected.json()
+    assert (
+        CoberturaProcessor.get_coverage(direct).json()
+        == CoberturaProcessor.get_coverage(expected).json()
+    )
+    # arguments which direct can not use are rejected, not ignored
+    for kwargs in ({"to_dict": True}, {"workers": 2}):
+        with pytest.raises(TypeError):
+            CoberturaLoader.from_jacoco_file(DATA_FILE, direct=True, **kwargs)
+
+
+def test_jacoco_filename_filter():
+    expected = CoberturaLoader.from_jacoco_file(DATA_FILE, direct=True)
+    filtered = jacoco2slim(DATA_FILE, ReportFilter(include="*.kt"))
+    assert [each.filename for p in filtered.packages for each in p.classes] == [
+        "com/example/util/StringsKt.kt"
+    ]
+    (package,) = filtered.packages
+    (klass,) = package.classes
+    origin = next(
+        each
+        for p in expected.packages
+        for each in p.classes
+        if each.filename == klass.filename
+    )
+    assert klass.json() == origin.json()
+
+
+def test_jacoco_report_filter():
+    report_filter = ReportFilter(exclude="com.example.util")
+    direct = jacoco2slim(DATA_FILE, report_filter)
+    converted = CoberturaLoader.from_jacoco_file(
+        DATA_FILE, report_filter=report_filter
+    ).slim()
+    assert direct.json() == converted.json()
+    assert "com.example.util" not in [each.name for each in direct.packages]
+    assert direct.packages
+
+
+def test_jacoco_stream_cli(tmp_path):
+    to_file = tmp_path / "cobertura.xml"
+    TerminalCli().xml_from_jacoco(str(DATA_FILE), str(to_file), stream=True)
+    assert (
+        CoberturaLoader.from_file(to_file).json()
+        == CoberturaLoader.from_jacoco_file(DATA_FILE).json()
+    )
+    with pytest.raises(ValueError):
+        TerminalCli().xml_from_jacoco(
+            str(DATA_FILE), str(to_file), workers=2, stream=True
+        )
@@ -0,0 +1,184 @@
+from cobertura_parser.ext.lcov import LcovCobertura, split_records
+from cobertura_parser.ext import demangle
+from cobertura_parser.ext.demangle import Demangler, demangle_python
+from cobertura_parser.filters import ReportFilter
+from cobertura_parser.loader import CoberturaLoader
+import io
+import pathlib
+
+DATA_FILE = pathlib.Path(__file__).parent / "data" / "lcov.info"
+
+
+def _parse(lcov_data) -> dict:
+    coverage_data = LcovCobertura(lcov_data).parse()
+    coverage_data.pop("timestamp")
+    return coverage_data
+
+
+def test_lcov_parse():
+    coverage_data = _parse(DATA_FILE.read_text())
+    assert list(coverage_data["packages"]) == ["src.math", "src"]
+    assert coverage_data["summary"] == {
+        "lines-total": 11,
+        "lines-covered": 8,
+        "branches-total": 6,
+        "branches-covered": 3,
+    }
+    add = coverage_data["packages"]["src.math"]["classes"]["src/math/add.cpp"]
+    assert add["lines"][4] == {
+        "branch": "true",
+        "branches-total": 2,
+        "branches-covered": 2,
+        "hits": "5",
+    }
+    assert add["methods"]["_Z3addii"] == ["3", "5"]
+
+
+def test_lcov_parse_sources():
+    expected = _parse(DATA_FILE.read_text())
+    assert _parse(DATA_FILE) == expected
+    with open(DATA_FILE) as f:
+        assert _parse(f) == expected
+
+
+def test_lcov_xml_writer():
+    converter = LcovCobertura(DATA_FILE)
+    coverage_data = converter.parse()
+    pretty = converter.generate_cobertura_xml(coverage_data)
+    output = io.StringIO()
+    converter.generate_cobertura_xml(coverage_data, output, pretty=False)
+    compact = output.getvalue()
+    assert "\n" not in compact
+    assert len(compact) < len(pretty)
+    assert CoberturaLoader.from_str(compact).slim().json() == (
+        CoberturaLoader.from_str(pretty).slim().json()
+    )
+
+
+def test_lcov_direct():
+    converter = LcovCobertura(DATA_FILE)
+    coverage_data = converter.parse()
+    xml = converter.generate_cobertura_xml(coverage_data)
+    assert converter.generate_dict(coverage_data) == CoberturaLoader.from_str(
+        xml, to_dict=True
+    )
+    assert (
+        converter.generate_slim(coverage_data).json()
+        == CoberturaLoader.from_str(xml).slim().json()
+    )
+
+
+def test_lcov_parallel(tmp_path):
+    # records of the same file split across chunks, and a stray end_of_record
+    lcov_file = tmp_path / "lcov.info"
+    content = DATA_FILE.read_text()
+    lcov_file.write_text(content * 3 + "end_of_record\n" + content)
+
+    chunks = split_records(lcov_file, 4)
+    assert len(chunks) > 1
+    assert chunks[0][0] == 0 and chunks[-1][1] == lcov_file.stat().st_size
+
+    serial = LcovCobertura(lcov_file).parse()
+    serial.pop("timestamp")
+    for workers in (2, 4, 16):
+        parallel = LcovCobertura(lcov_file, workers=workers).parse()
+        parallel.pop("timestamp")
+        assert parallel == serial
+        assert list(parallel["packages"]) == list(serial["packages"])
+
+
+def test_lcov_filter():
+    report_filter = ReportFilter(include="src.math", exclude="*/mul.cpp")
+    for workers in (None, 2):
+        structure = CoberturaLoader.from_lcov_file(
+            DATA_FILE, workers=workers, report_filter=report_filter
+        )
+        (package,) = structure.packages
+        assert [each.filename for each in package.classes] == ["src/math/add.cpp"]
+        # totals of rejected records are not counted
+        assert package.line_rate == package.classes[0].line_rate
+
+
+def test_lcov_demangle():
+    converter = LcovCobertura(DATA_FILE, demangle=True)
+    slim = converter.generate_slim(converter.parse())
+    names = {
+        method.name
+        for package in slim.packages
+        for klass in package.classes
+        for method in klass.methods
+    }
+    assert names == {
+        "add(int, int)",
+        "math::Calc::sub(int, int)",
+        "mul(int, int)",
+        "main",
+    }
+
+
+def test_lcov_demangle_batch(monkeypatch):
+    # names evicted from a tiny cache are still formatted from the batch
+    monkeypatch.setattr(demangle, "CACHE_SIZE", 1)
+    monkeypatch.setattr(Demangler, "_cache", demangle.OrderedDict())
+    batches = []
+
+    def run_cppfilt(self, names):
+        batches.append(names)
+        return [demangle_python(each) for each in names]
+
+    monkeypatch.setattr(Demangler, "_run_cppfilt", run_cppfilt)
+    converter = LcovCobertura(DATA_FILE, demangle=True)
+    converter.demangler.use_cppfilt = True
+    xml = converter.generate_cobertura_xml(converter.parse())
+    assert len(batches) == 1
+    assert "math::Calc::sub(int, int)" in xml and "add(int, int)" in xml
+
+
+def test_demangle_python():
+    demangler = Demangler(use_cppfilt=False)
+    assert demangler.demangle_all(["_Z3addii", "main", "_Z3addii"]) == {
+        "_Z3addii": "add(int, int)",
+        "main": "main",
+    }
+    assert (
+        demangle_python("_ZNKSt6vectorIiSaIiEE4sizeEv")
+        == "std::vector<int, std::allocator<int> >::size() const"
+    )
+    assert demangle_python("_Z3maxIiET_S0_S0_") == "int max<int>(int, int)"
+    assert demangle_python("_ZN4math4CalcD1Ev") == "math::Calc::~Calc()"
+    # not supported, kept as is
+    assert demangle_python("_Z4funcPFviE") == "_Z4funcPFviE"
+
+
+def test_demangle_python_like_cppfilt():
+    # outputs of c++filt
+    expected = {
+        "_ZNSt6vectorIiSaIiEEC2Ev": "std::vector<int, std::allocator<int> >::vector()",
+        "_ZN3FooIN2ns3BarEEC1Ev": "Foo<ns::Bar>::Foo()",
+        "_ZN3FooIN2ns3BarEED0Ev": "Foo<ns::Bar>::~Foo()",
+        "_ZNSt7__cxx1112basic_stringIcSt11char_traitsIcESaIcEED1Ev": (
+            "std::__cxx11::basic_string<char, std::char_traits<char>, "
+            "std::allocator<char> >::~basic_string()"
+        ),
+        "_ZN12_GLOBAL__N_13fooEv": "(anonymous namespace)::foo()",
+        "_ZNSsC1Ev": (
+            "std::basic_string<char, std::char_traits<char>, "
+            "std::allocator<char> >::basic_string()"
+        ),
+        "_Z2f4RSo": "f4(std::basic_ostream<char, std::char_traits<char> >&)",
+        "_Z3f12IRiEOT_S2_": "int& f12<int&>(int&)",
+        "_ZdlPvm": "operator delete(void*, unsigned long)",
+    }
+    for name, result in expected.items():
+        assert demangle_python(name) == result
+    assert demangle_python("_ZN1AC1ERKS_") == "A::A(A const&)"
+    assert demangle_python("_ZN1A1BIS_EC1Ev") == "A::B<A>::B()"
+
+
+def test_demangle_without_cppfilt(monkeypatch):
+    demangler = Demangler(use_cppfilt=True)
+    # missing, then failing c++filt
+    monkeypatch.setattr(demangle, "CPPFILT", "/nonexistent/c++filt")
+    assert demangler.demangle("_Z3subii") == "sub(int, int)"
+    monkeypatch.setattr(demangle, "CPPFILT", "false")
+    assert demangler.demangle("_Z3divii") == "div(int, int)"
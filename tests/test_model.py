@@ -1,8 +1,27 @@
 from cobertura_parser.loader import CoberturaLoader
+from cobertura_parser.models.builtin import CoberturaStructureSlim
+from cobertura_parser.models.columnar import LineTable
+from cobertura_parser.models.fast import FastStructure
+from cobertura_parser.processor import CoberturaProcessor
 import pathlib
 
+import pytest
+from pydantic import ValidationError
 
 DATA_FILE = pathlib.Path(__file__).parent / "data" / "cobertura.xml"
+# columns do not keep the detail of conditions
+_EXCLUDE_CONDITIONS = {
+    "packages": {
+        "__all__": {
+            "classes": {
+                "__all__": {
+                    "lines": {"__all__": {"conditions"}},
+                    "methods": {"__all__": {"lines": {"__all__": {"conditions"}}}},
+                }
+            }
+        }
+    }
+}
 
 
 def test_builtin_model_api_hit():
@@ -15,3 +34,98 @@ def test_builtin_model_api_hit():
             if not each_kls.is_hit():
                 some_kls_not_hit = True
     assert some_kls_not_hit
+
+
+def test_columnar_line_table():
+    s = CoberturaLoader.slim_from_file(DATA_FILE)
+    c = CoberturaLoader.slim_from_file(DATA_FILE, columnar=True)
+    for each_pkg, each_pkg_c in zip(s.packages, c.packages):
+        assert each_pkg.is_hit() == each_pkg_c.is_hit()
+        for each_kls, each_kls_c in zip(each_pkg.classes, each_pkg_c.classes):
+            assert isinstance(each_kls_c.lines, LineTable)
+            assert len(each_kls.lines) == len(each_kls_c.lines)
+            for line, view in zip(each_kls.lines, each_kls_c.lines):
+                assert line.number == view.number
+                assert line.hits == view.hits
+                assert line.branch == view.branch
+                assert line.condition_coverage == view.condition_coverage
+                assert line.is_hit() == view.is_hit()
+                assert line.is_in_branch() == view.is_in_branch()
+    assert s.json(exclude=_EXCLUDE_CONDITIONS) == c.json()
+
+
+def test_columnar_coverage_and_snapshot():
+    s = CoberturaLoader.slim_from_file(DATA_FILE)
+    c = CoberturaLoader.slim_from_file(DATA_FILE, columnar=True)
+    cov = CoberturaProcessor.get_coverage(s)
+    cov.lazy_calc()
+    cov_c = CoberturaProcessor.get_coverage(c)
+    cov_c.lazy_calc()
+    assert cov.json(exclude=_EXCLUDE_CONDITIONS) == cov_c.json(
+        exclude=_EXCLUDE_CONDITIONS
+    )
+    assert (
+        CoberturaProcessor.get_code_snapshot(s).json()
+        == CoberturaProcessor.get_code_snapshot(c).json()
+    )
+
+
+def test_slim_pipeline_shares_lines():
+    d = CoberturaLoader.from_file(DATA_FILE)
+    s = d.slim()
+    origin_lines = {
+        id(each)
+        for each in d.coverage.get_package_list()[0].get_class_list()[0].get_line_list()
+    }
+    assert {id(each) for each in s.packages[0].classes[0].lines} == origin_lines
+
+    cov = CoberturaProcessor.get_coverage(s)
+    cov_lines = [
+        each_line
+        for each_pkg in cov.packages
+        for each_kls in each_pkg.classes
+        for each_line in each_kls.lines
+    ]
+    slim_lines = {
+        id(each_line)
+        for each_pkg in s.packages
+        for each_kls in each_pkg.classes
+        for each_line in each_kls.lines
+    }
+    assert cov_lines
+    assert all(id(each) in slim_lines for each in cov_lines)
+
+
+def test_fast_models():
+    s = CoberturaLoader.slim_from_file(DATA_FILE)
+    f = CoberturaLoader.slim_from_file(DATA_FILE, fast=True)
+    assert isinstance(f, FastStructure)
+    assert f.dict() == s.dict()
+    for each_pkg, each_pkg_f in zip(s.packages, f.get_package_list()):
+        assert each_pkg.is_hit() == each_pkg_f.is_hit()
+        for each_kls, each_kls_f in zip(each_pkg.classes, each_pkg_f.get_class_list()):
+            assert each_kls.is_hit() == each_kls_f.is_hit()
+            for line, line_f in zip(each_kls.lines, each_kls_f.get_line_list()):
+                assert line.is_hit() == line_f.is_hit()
+                assert line.is_in_branch() == line_f.is_in_branch()
+
+    # processor accepts either kind
+    cov = CoberturaProcessor.get_coverage(s)
+    cov.lazy_calc()
+    cov_f = CoberturaProcessor.get_coverage(f)
+    cov_f.lazy_calc()
+    assert cov.json() == cov_f.json()
+    assert (
+        CoberturaProcessor.get_code_snapshot(s).json()
+        == CoberturaProcessor.get_code_snapshot(f).json()
+    )
+    assert CoberturaProcessor.merge([s]).json() == CoberturaProcessor.merge([f]).json()
+
+    p = f.to_pydantic()
+    assert isinstance(p, CoberturaStructureSlim)
+    assert p.json() == s.json()
+    assert f.to_pydantic(validate=False).json() == s.json()
+
+    f.packages[0].classes[0].lines[0].hits = "not a number"
+    with pytest.raises(ValidationError):
+        f.to_pydantic()
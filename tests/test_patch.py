@@ -0,0 +1,99 @@
+from cobertura_parser.filters import ReportFilter
+from cobertura_parser.loader import CoberturaLoader
+from cobertura_parser.patch import PatchIndex
+from cobertura_parser.processor import CoberturaProcessor
+import pathlib
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+
+PATCH = """\
+diff --git a/src/math/add.cpp b/src/math/add.cpp
+index 1111111..2222222 100644
+--- a/src/math/add.cpp
++++ b/src/math/add.cpp
+@@ -2,3 +2,4 @@ int x;
+ 
+-int add(int a, int b) {
++int add(int a, int b) {
++    // comment
+     return a + b;
+@@ -8,2 +9,2 @@
+-int old;
++++ looks like a header, but added
+ }
+diff --git a/src/main/java/search/LinearSearch.java b/src/main/java/search/LinearSearch.java
+--- a/src/main/java/search/LinearSearch.java
++++ b/src/main/java/search/LinearSearch.java
+@@ -10,0 +11,10 @@
++a
++b
++c
++d
++e
++f
++g
++h
++i
++j
+diff --git a/docs/readme.md b/docs/readme.md
+deleted file mode 100644
+--- a/docs/readme.md
++++ /dev/null
+@@ -1 +0,0 @@
+-gone
+"""
+
+
+def test_patch_parse():
+    patch = PatchIndex.from_str(PATCH)
+    assert list(patch.files) == [
+        "src/math/add.cpp",
+        "src/main/java/search/LinearSearch.java",
+    ]
+    assert list(patch.files["src/math/add.cpp"]) == [3, 4, 9]
+    assert 4 in patch.files["src/math/add.cpp"]
+    assert 5 not in patch.files["src/math/add.cpp"]
+    assert len(patch.files["src/main/java/search/LinearSearch.java"]) == 10
+
+    # file names of reports are matched by path suffix
+    assert patch.match("search/LinearSearch.java") == (
+        "src/main/java/search/LinearSearch.java"
+    )
+    assert patch.match("/work/repo/src/math/add.cpp") == "src/math/add.cpp"
+    assert not patch.accepts("LinearSearch.java.bak")
+    assert not patch.accepts("src/math/mul.cpp")
+
+
+def test_diff_cov():
+    patch = PatchIndex.from_str(PATCH)
+
+    lcov = CoberturaProcessor.diff_cov(
+        patch,
+        CoberturaLoader.iter_report_classes(
+            DATA_DIR / "lcov.info",
+            report_filter=ReportFilter(filename_filter=patch.accepts),
+        ),
+    )
+    (add,) = lcov.files
+    assert add.filename == "src/math/add.cpp"
+    assert (add.changed, add.covered, add.uncovered_lines) == (3, 2, [9])
+    assert (lcov.changed, lcov.covered) == (3, 2)
+
+    cobertura = CoberturaProcessor.diff_cov(
+        patch,
+        CoberturaLoader.iter_report_classes(
+            DATA_DIR / "cobertura.xml",
+            columnar=True,
+            report_filter=ReportFilter(filename_filter=patch.accepts),
+        ),
+    )
+    (linear,) = cobertura.files
+    assert linear.filename == "src/main/java/search/LinearSearch.java"
+    assert linear.changed == cobertura.changed > 0
+    assert cobertura.rate == linear.rate
+
+    # nothing changed in the report
+    empty = CoberturaProcessor.diff_cov(
+        patch, CoberturaLoader.slim_from_report(DATA_DIR / "jacoco.xml")
+    )
+    assert empty.files == [] and empty.rate == 1.0